@@ -8,6 +8,8 @@ import re
 import time
 from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+from ml_policy import FeatureSchema
+
 
 def _parse_env_float(key: str) -> Optional[float]:
     raw = os.getenv(key)
@@ -520,6 +522,7 @@ class PostmortemLearning:
             "postmortem_learning",
             {"symbols": {}, "global": {"features": {}, "updated": 0.0}},
         )
+        self._schema = FeatureSchema(tuple(dict.fromkeys(self.feature_keys)))
 
     @property
     def feature_keys(self) -> Iterable[str]:
@@ -547,15 +550,16 @@ class PostmortemLearning:
         self._blend(self._store.setdefault("global", {"features": {}, "updated": 0.0}).setdefault("features", {}), normalized, now)
         self._store.setdefault("global", {})["updated"] = now
 
+    @property
+    def schema(self) -> FeatureSchema:
+        return self._schema
+
     def context_features(self, symbol: str) -> Dict[str, float]:
-        features: Dict[str, float] = {key: 0.0 for key in self.feature_keys}
         if not symbol:
             symbol = "*"
         global_store = self._store.get("global", {})
         global_features = global_store.get("features", {}) if isinstance(global_store, dict) else {}
-        for key in features:
-            if key in global_features:
-                features[key] = float(global_features.get(key, 0.0) or 0.0)
+        features = self._schema.as_dict(global_features if isinstance(global_features, dict) else {})
         sym_store = self._store.get("symbols", {})
         sym_features = (
             sym_store.get(symbol, {}).get("features", {}) if isinstance(sym_store, dict) else {}
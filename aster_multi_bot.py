@@ -17,7 +17,9 @@ Beibehaltener Funktionsumfang + robuste Optimierungen:
 """
 
 import os
+import sys
 import time
+import time as _real_time
 import math
 import statistics
 import json
@@ -31,10 +33,11 @@ import re
 import copy
 import threading
 import random
+import itertools
 from pathlib import Path
 from datetime import datetime, timezone, date
 from urllib.parse import urlencode, urlparse
-from typing import Dict, List, Tuple, Optional, Any, Callable, Sequence, Set, Iterable, Mapping, Deque
+from typing import Dict, List, Tuple, Optional, Any, Callable, Sequence, Set, Iterable, Mapping, Deque, NamedTuple
 
 from collections import Counter, OrderedDict, defaultdict, deque
 from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
@@ -54,7 +57,7 @@ try:
 except Exception:
     raise RuntimeError("Dieses Modul benötigt numpy. Bitte: pip install numpy")
 
-from ml_policy import BanditPolicy, FEATURES as POLICY_FEATURES
+from ml_policy import BanditPolicy, FEATURES as POLICY_FEATURES, training_samples
 from ai_extensions import (
     BudgetLearner,
     ParameterTuner,
@@ -65,6 +68,9 @@ from ai_extensions import (
     advisor_register_persona,
 )
 from brackets_guard import BracketGuard, replace_tp_for_open_position as _bg_replace_tp
+from exchange_metadata import ExchangeMetadata, parse_symbol_filters, shared_metadata
+import http_client
+import indicators
 
 # ========= Logging =========
 LOGFMT = "%(asctime)s │ %(levelname)-5s │ %(name)s │ %(message)s"
@@ -300,9 +306,25 @@ ORDERBOOK_DEPTH_LIMIT = max(5, min(1000, int(os.getenv("ASTER_ORDERBOOK_DEPTH_LI
 ORDERBOOK_PREFETCH = max(0, int(os.getenv("ASTER_ORDERBOOK_PREFETCH", "14") or 14))
 ORDERBOOK_TTL = max(0.5, float(os.getenv("ASTER_ORDERBOOK_TTL", "2.5") or 2.5))
 ORDERBOOK_ON_DEMAND = max(0, int(os.getenv("ASTER_ORDERBOOK_ON_DEMAND", "6") or 6))
+PREFETCH_WORKERS = max(0, int(os.getenv("ASTER_PREFETCH_WORKERS", "6") or 0))
+PREFETCH_LOOKAHEAD = max(1, int(os.getenv("ASTER_PREFETCH_LOOKAHEAD", "12") or 12))
+PREFETCH_WEIGHT_BUDGET = max(0, int(os.getenv("ASTER_PREFETCH_WEIGHT_BUDGET", "600") or 0))
 
 
 USER_STREAM_ENABLED = os.getenv("ASTER_USER_STREAM", "true").lower() in ("1", "true", "yes", "on")
+# Wie lange await_order_fill auf Stream-Fills wartet, bevor auf REST-Polling zurückgefallen wird
+FILL_STREAM_WAIT = max(0.1, float(os.getenv("ASTER_FILL_STREAM_WAIT", "3.0") or 3.0))
+MARKET_STREAM_ENABLED = os.getenv("ASTER_MARKET_STREAM", "true").lower() in ("1", "true", "yes", "on")
+MARKET_STREAM_STALE_SEC = max(2.0, float(os.getenv("ASTER_MARKET_STREAM_STALE_SEC", "15") or 15.0))
+# Kline-Streams (INTERVAL + HTF_INTERVAL) für die ersten N ausgewerteten Symbole; 0 = aus
+KLINE_STREAM_SYMBOLS = max(0, int(os.getenv("ASTER_KLINE_STREAM_SYMBOLS", "40") or 0))
+# Lokale Orderbücher aus dem Diff-Depth-Stream für die zuletzt ausgewerteten Symbole
+DEPTH_STREAM_ENABLED = os.getenv("ASTER_DEPTH_STREAM", "true").lower() in ("1", "true", "yes", "on")
+DEPTH_STREAM_SYMBOLS = max(1, int(os.getenv("ASTER_DEPTH_STREAM_SYMBOLS", "40") or 40))
+# Tiefe des REST-Snapshots, mit dem ein Stream-Buch (neu) initialisiert wird
+DEPTH_SNAPSHOT_LIMIT = max(5, min(1000, int(os.getenv("ASTER_DEPTH_SNAPSHOT_LIMIT", "1000") or 1000)))
+# Offline-Replay: Capture-Datei (ASTER_CAPTURE_FILE) statt Netzwerk abspielen
+REPLAY_FILE = os.getenv("ASTER_REPLAY_FILE", "").strip()
 
 
 def _int_env(name: str, default: int) -> int:
@@ -861,6 +883,8 @@ ALPHA_L2 = float(os.getenv("ASTER_ALPHA_L2", "0.0005"))
 ALPHA_MIN_CONF = float(os.getenv("ASTER_ALPHA_MIN_CONF", "0.2"))
 ALPHA_PROMOTE_DELTA = float(os.getenv("ASTER_ALPHA_PROMOTE_DELTA", "0.15"))
 ALPHA_REWARD_MARGIN = float(os.getenv("ASTER_ALPHA_REWARD_MARGIN", "0.05"))
+# Policy beim Start aus trade_history vortrainieren, wenn sie frisch ist oder sich FEATURES geändert hat
+POLICY_WARM_START = os.getenv("ASTER_POLICY_WARM_START", "true").lower() in ("1", "true", "yes", "on")
 
 _default_notional_fallback = float(
     _active_sizing_defaults.get("default_notional", _PRESET_SIZING_FALLBACK["default_notional"])
@@ -1111,7 +1135,26 @@ NON_ARB_SKIP_GAP = abs(
 HTTP_RETRIES = max(0, int(os.getenv("ASTER_HTTP_RETRIES", "2")))
 HTTP_BACKOFF = max(0.0, float(os.getenv("ASTER_HTTP_BACKOFF", "0.6")))
 HTTP_TIMEOUT = max(5.0, float(os.getenv("ASTER_HTTP_TIMEOUT", "20")))
+REQUEST_WEIGHT_LIMIT = max(1, int(os.getenv("ASTER_REQUEST_WEIGHT_LIMIT", "2400") or 2400))
+REQUEST_WEIGHT_SOFT_RATIO = min(0.99, max(0.1, float(os.getenv("ASTER_REQUEST_WEIGHT_SOFT_RATIO", "0.8") or 0.8)))
+REQUEST_WEIGHT_MAX_WAIT = max(0.0, float(os.getenv("ASTER_REQUEST_WEIGHT_MAX_WAIT", "8") or 0.0))
+ORDER_RATE_LIMIT_10S = max(1, int(os.getenv("ASTER_ORDER_RATE_LIMIT_10S", "300") or 300))
+ORDER_RATE_LIMIT_1M = max(1, int(os.getenv("ASTER_ORDER_RATE_LIMIT_1M", "1200") or 1200))
 KLINE_CACHE_SEC = max(5.0, float(os.getenv("ASTER_KLINE_CACHE_SEC", "9")))
+KLINE_CLOSE_GRACE_SEC = max(0.0, float(os.getenv("ASTER_KLINE_CLOSE_GRACE_SEC", "1.5")))
+HTF_TAIL_REFRESH_SEC = max(KLINE_CACHE_SEC, float(os.getenv("ASTER_HTF_TAIL_REFRESH_SEC", "60")))
+# Speicherbudget des Kline-Caches; am längsten ungenutzte Serien werden zuerst verdrängt (0 = unbegrenzt)
+KLINE_CACHE_MAX_BYTES = max(0, int(float(os.getenv("ASTER_KLINE_CACHE_MAX_MB", "64") or 0) * 1024 * 1024))
+KLINE_CACHE_IDLE_SEC = max(0.0, float(os.getenv("ASTER_KLINE_CACHE_IDLE_SEC", "3600") or 0.0))
+# Indikatoren pro (Symbol, Intervall) inkrementell fortschreiben statt das ganze Fenster neu zu rechnen
+STREAMING_INDICATORS = os.getenv("ASTER_STREAMING_INDICATORS", "true").lower() in ("1", "true", "yes", "on")
+INDICATOR_STATE_MAX = max(16, int(os.getenv("ASTER_INDICATOR_STATE_MAX", "1024") or 1024))
+# Zu Zyklusbeginn die Indikatoren aller gescannten Symbole in einem vektorisierten Durchlauf rechnen
+BATCH_INDICATORS = os.getenv("ASTER_BATCH_INDICATORS", "true").lower() in ("1", "true", "yes", "on")
+# ADX-Variante: "legacy" (Mittel der DX-Fenster, bisheriges Verhalten) oder "wilder" (Standard-ADX)
+ADX_MODE = os.getenv("ASTER_ADX_MODE", "legacy").strip().lower()
+if ADX_MODE not in indicators.ADX_MODES:
+    ADX_MODE = "legacy"
 
 MAX_OPEN_GLOBAL = _int_env("ASTER_MAX_OPEN_GLOBAL", 0)
 MAX_OPEN_PER_SYMBOL = _int_env("ASTER_MAX_OPEN_PER_SYMBOL", 1)
@@ -1119,6 +1162,17 @@ MAX_OPEN_PER_SYMBOL = _int_env("ASTER_MAX_OPEN_PER_SYMBOL", 1)
 _ROOT_DIR = Path(__file__).resolve().parent
 _STATE_FILE_ENV = os.getenv("ASTER_STATE_FILE", "aster_state.json")
 STATE_FILE = _ROOT_DIR / _STATE_FILE_ENV
+# Sidecar für die ML-Policy-Matrizen (.npz); leer = "<state>.policy.npz" neben dem State
+_POLICY_FILE_ENV = os.getenv("ASTER_POLICY_FILE", "").strip()
+
+
+def _policy_file() -> str:
+    if _POLICY_FILE_ENV:
+        return str(_ROOT_DIR / _POLICY_FILE_ENV)
+    state_path = Path(STATE_FILE)
+    return str(state_path.with_name(f"{state_path.stem}.policy.npz"))
+
+
 PAPER = os.getenv("ASTER_PAPER", "false").lower() in ("1", "true", "yes", "on")
 
 LOOP_SLEEP = int(os.getenv("ASTER_LOOP_SLEEP", "10"))  # Sekunden
@@ -1307,6 +1361,46 @@ def ema(data: List[float], period: int) -> List[float]:
     return out
 
 
+def _interval_ms(interval: str) -> int:
+    """Milliseconds per bar for an exchange interval such as ``5m`` or ``4h``."""
+
+    token = str(interval or "").strip()
+    if len(token) < 2:
+        return 0
+    scale = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000, "M": 2_592_000_000}.get(token[-1])
+    try:
+        count = int(token[:-1])
+    except ValueError:
+        return 0
+    return count * scale if scale and count > 0 else 0
+
+
+def _kline_request_weight(limit: int) -> int:
+    """Request weight the exchange charges for ``/klines`` at ``limit`` bars."""
+
+    limit = int(limit)
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def _depth_request_weight(limit: int) -> int:
+    """Request weight the exchange charges for ``/depth`` at ``limit`` levels."""
+
+    limit = int(limit)
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
 def _sma_series(values: List[float], period: int) -> List[float]:
     if not values:
         return []
@@ -1350,7 +1444,7 @@ def _rolling_std(values: List[float], period: int) -> List[float]:
 
 
 def _consecutive_true(flags: Sequence[bool], limit: Optional[int] = None) -> int:
-    if not flags:
+    if len(flags) == 0:
         return 0
     if limit is not None and limit > 0:
         flags = list(flags[-limit:])
@@ -1916,6 +2010,8 @@ class NewsTrendSentinel:
         self.exchange = exchange
         self.state = state
         self.enabled = bool(enabled)
+        # Externer News-Feed; Capture/Replay schalten ihn ab
+        self.news_enabled = True
         self._ticker_cache: Dict[str, Dict[str, Any]] = {}
         self._last_payload: Dict[str, Dict[str, Any]] = {}
         self._decay = max(60.0, float(decay_minutes or 0) * 60.0)
@@ -1972,7 +2068,7 @@ class NewsTrendSentinel:
         return payload or {}
 
     def _news_events(self, symbol: str) -> List[Dict[str, Any]]:
-        if not self.enabled or not SENTINEL_NEWS_ENDPOINT:
+        if not self.enabled or not self.news_enabled or not SENTINEL_NEWS_ENDPOINT:
             return []
         try:
             headers = {}
@@ -4516,7 +4612,7 @@ class AITradeAdvisor:
                 self._chat_connect_timeout,
                 self._playbook_read_timeout if kind == "playbook" else self._chat_read_timeout,
             )
-            return requests.post(
+            return http_client.post(
                 "https://api.openai.com/v1/chat/completions",
                 headers=headers,
                 json=p,
@@ -6608,18 +6704,226 @@ class PaperBroker:
         return trades[:capped]
 
 
+class RateLimitDeferred(RequestException):
+    """Raised when a low-priority request would push past the weight budget."""
+
+
+class RequestWeightGovernor:
+    """Client-side view of the exchange's request-weight and order-rate limits.
+
+    Every REST call is charged against the current one-minute window using a
+    per-endpoint weight table before it is sent, and the estimate is corrected
+    from the ``X-MBX-USED-WEIGHT-1M`` / ``X-MBX-ORDER-COUNT-*`` response
+    headers afterwards. Market-data callers are held back once the soft limit
+    is reached, so signed account and order traffic keeps the remaining
+    headroom. A 429/418 response blocks everyone until ``Retry-After`` passes.
+    """
+
+    WINDOW_SEC = 60.0
+    ORDER_WINDOW_SEC = 10.0
+    ORDER_PATHS = frozenset({"/fapi/v1/order", "/fapi/v1/batchOrders"})
+
+    ENDPOINT_WEIGHTS: Dict[str, Any] = {
+        "/fapi/v1/klines": lambda params: _kline_request_weight(params.get("limit", 500)),
+        "/fapi/v1/depth": lambda params: _depth_request_weight(params.get("limit", 500)),
+        "/fapi/v1/ticker/24hr": lambda params: 1 if params.get("symbol") else 40,
+        "/fapi/v1/ticker/bookTicker": lambda params: 2 if params.get("symbol") else 5,
+        "/fapi/v1/ticker/price": lambda params: 1 if params.get("symbol") else 2,
+        "/fapi/v1/premiumIndex": 1,
+        "/fapi/v1/fundingRate": 1,
+        "/fapi/v1/exchangeInfo": 1,
+        "/fapi/v1/openOrders": lambda params: 1 if params.get("symbol") else 40,
+        "/fapi/v1/allOrders": 5,
+        "/fapi/v1/userTrades": 5,
+        "/fapi/v1/income": 30,
+        "/fapi/v2/account": 5,
+        "/fapi/v2/balance": 5,
+        "/fapi/v2/positionRisk": 5,
+        "/fapi/v1/batchOrders": 5,
+    }
+
+    def __init__(
+        self,
+        *,
+        weight_limit: int = REQUEST_WEIGHT_LIMIT,
+        soft_ratio: float = REQUEST_WEIGHT_SOFT_RATIO,
+        order_limit_10s: int = ORDER_RATE_LIMIT_10S,
+        order_limit_1m: int = ORDER_RATE_LIMIT_1M,
+        max_wait: float = REQUEST_WEIGHT_MAX_WAIT,
+    ) -> None:
+        self.weight_limit = max(1, int(weight_limit))
+        self.soft_limit = max(1, int(self.weight_limit * float(soft_ratio)))
+        self.order_limit_10s = max(1, int(order_limit_10s))
+        self.order_limit_1m = max(1, int(order_limit_1m))
+        self.max_wait = max(0.0, float(max_wait))
+        self._cond = threading.Condition()
+        self._window = -1
+        self._order_window = -1
+        self.used_weight = 0
+        self.orders_10s = 0
+        self.orders_1m = 0
+        self.banned_until = 0.0
+        self.throttled = 0
+        self.deferred = 0
+
+    def weight_for(self, path: str, params: Optional[Mapping[str, Any]] = None) -> int:
+        rule = self.ENDPOINT_WEIGHTS.get(path, 1)
+        if callable(rule):
+            try:
+                return max(1, int(rule(params or {})))
+            except (TypeError, ValueError):
+                return 1
+        return int(rule)
+
+    def _roll(self, now: float) -> None:
+        window = int(now // self.WINDOW_SEC)
+        if window != self._window:
+            self._window = window
+            self.used_weight = 0
+            self.orders_1m = 0
+        order_window = int(now // self.ORDER_WINDOW_SEC)
+        if order_window != self._order_window:
+            self._order_window = order_window
+            self.orders_10s = 0
+
+    def headroom(self, *, critical: bool = False) -> int:
+        """Weight that can still be spent in the current window."""
+
+        with self._cond:
+            now = time.time()
+            self._roll(now)
+            if self.banned_until > now:
+                return 0
+            cap = self.weight_limit if critical else self.soft_limit
+            return max(0, cap - self.used_weight)
+
+    def _wait_needed(self, now: float, weight: int, critical: bool, order: bool) -> float:
+        if self.banned_until > now:
+            return self.banned_until - now
+        cap = self.weight_limit if critical else self.soft_limit
+        if self.used_weight > 0 and self.used_weight + weight > cap:
+            return (self._window + 1) * self.WINDOW_SEC - now
+        if order and self.orders_1m >= self.order_limit_1m:
+            return (self._window + 1) * self.WINDOW_SEC - now
+        if order and self.orders_10s >= self.order_limit_10s:
+            return (self._order_window + 1) * self.ORDER_WINDOW_SEC - now
+        return 0.0
+
+    def acquire(
+        self,
+        path: str,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        critical: bool = False,
+        order: bool = False,
+    ) -> int:
+        """Charge ``path`` against the budget, waiting for room if necessary.
+
+        Non-critical callers raise :class:`RateLimitDeferred` when the wait
+        would exceed ``max_wait``; critical callers go through after it, but
+        never while a 418/429 ban (``banned_until``) is still running.
+        """
+
+        weight = self.weight_for(path, params)
+        deadline = time.time() + self.max_wait
+        with self._cond:
+            while True:
+                now = time.time()
+                self._roll(now)
+                wait = self._wait_needed(now, weight, critical, order)
+                if wait <= 0:
+                    break
+                remaining = deadline - now
+                if not critical and wait > remaining:
+                    self.deferred += 1
+                    raise RateLimitDeferred(f"request weight budget exhausted for {path}")
+                banned = self.banned_until > now
+                if remaining <= 0 and not banned:
+                    # Account and order traffic goes out anyway; the exchange has the final say.
+                    break
+                self.throttled += 1
+                # Während eines Banns warten auch kritische Aufrufe bis Retry-After
+                self._cond.wait(wait if banned and remaining <= 0 else min(wait, remaining))
+            self.used_weight += weight
+            if order:
+                self.orders_10s += 1
+                self.orders_1m += 1
+        return weight
+
+    def observe(self, response: Any) -> None:
+        """Sync counters with the limit headers of ``response``."""
+
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return
+        with self._cond:
+            now = time.time()
+            self._roll(now)
+            used = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("X-MBX-USED-WEIGHT")
+            if used is not None:
+                try:
+                    self.used_weight = max(self.used_weight, int(used))
+                except (TypeError, ValueError):
+                    pass
+            for header, attr in (("X-MBX-ORDER-COUNT-10S", "orders_10s"), ("X-MBX-ORDER-COUNT-1M", "orders_1m")):
+                value = headers.get(header)
+                if value is None:
+                    continue
+                try:
+                    setattr(self, attr, max(getattr(self, attr), int(value)))
+                except (TypeError, ValueError):
+                    pass
+            status = getattr(response, "status_code", 200)
+            if status in (418, 429):
+                try:
+                    retry_after = float(headers.get("Retry-After") or 0.0)
+                except (TypeError, ValueError):
+                    retry_after = 0.0
+                if retry_after <= 0:
+                    retry_after = (self._window + 1) * self.WINDOW_SEC - now
+                self.banned_until = max(self.banned_until, now + retry_after)
+                log.warning(f"exchange rate limit hit (HTTP {status}); pausing requests for {retry_after:.0f}s")
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            self._roll(time.time())
+            return {
+                "used_weight": self.used_weight,
+                "weight_limit": self.weight_limit,
+                "soft_limit": self.soft_limit,
+                "orders_10s": self.orders_10s,
+                "orders_1m": self.orders_1m,
+                "banned_until": self.banned_until,
+                "throttled": self.throttled,
+                "deferred": self.deferred,
+            }
+
+
 class Exchange:
     def __init__(self, base: str, api_key: str, api_secret: str, recv_window: int = 10000):
         self.base = base.rstrip("/")
         self.api_key = api_key
         self.api_secret = api_secret
         self.recv_window = recv_window
-        self.s = requests.Session()
+        self.s = http_client.new_session()
         self._ts_skew_ms = 0
         self.timeout = HTTP_TIMEOUT
         self._max_retries = HTTP_RETRIES
         self._backoff = HTTP_BACKOFF
+        self.governor = RequestWeightGovernor()
+        # exchangeInfo is shared with BracketGuard and persisted for restarts/the dashboard.
+        if http_client.capture_log() is not None:
+            # Capture: exchangeInfo must come over REST so the replay finds it in the capture.
+            self.metadata = ExchangeMetadata(self._fetch_exchange_info, base_url=self.base, cache_file=None)
+        else:
+            self.metadata = shared_metadata(self.base, self._fetch_exchange_info)
         self._paper: Optional[PaperBroker] = PaperBroker(self) if PAPER else None
+        # Optional websocket quote table; REST is only used when it is cold or stale.
+        self.market_stream: Optional["MarketDataStream"] = None
+        # Fills arrive via the user stream when it is connected; polling is the fallback.
+        self.user_stream: Optional["UserDataStream"] = None
+        self.fill_waiters = FillWaiterRegistry()
         ws_env = os.getenv("ASTER_WS_BASE", "").strip()
         if ws_env:
             self.ws_base = ws_env.rstrip("/")
@@ -6668,13 +6972,40 @@ class Exchange:
     def _ts(self) -> int:
         return int(time.time() * 1000 + self._ts_skew_ms)
 
-    def _request_with_retry(self, func, *args, **kwargs):
+    def weight_headroom(self, *, critical: bool = False) -> int:
+        """Request weight left in the current window for market-data callers."""
+
+        return self.governor.headroom(critical=critical)
+
+    def _request_with_retry(
+        self,
+        func,
+        *args,
+        rate_path: Optional[str] = None,
+        rate_params: Optional[Mapping[str, Any]] = None,
+        critical: bool = False,
+        order: bool = False,
+        **kwargs,
+    ):
         attempt = 0
         delay = self._backoff
         while True:
             try:
                 kwargs.setdefault("timeout", self.timeout)
-                return func(*args, **kwargs)
+                if rate_path:
+                    self.governor.acquire(rate_path, rate_params, critical=critical, order=order)
+                response = func(*args, **kwargs)
+                self.governor.observe(response)
+                if getattr(response, "status_code", 200) == 429 and attempt < max(0, self._max_retries):
+                    # The governor now holds every caller until Retry-After has passed.
+                    attempt += 1
+                    close = getattr(response, "close", None)
+                    if callable(close):
+                        close()
+                    continue
+                return response
+            except RateLimitDeferred:
+                raise
             except RequestException as exc:
                 attempt += 1
                 if attempt > max(0, self._max_retries):
@@ -6693,9 +7024,11 @@ class Exchange:
 
     def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         url = f"{self.base}{path}"
-        r = self._request_with_retry(self.s.get, url, params=params or {})
+        r = self._request_with_retry(
+            self.s.get, url, params=params or {}, rate_path=path, rate_params=params
+        )
         r.raise_for_status()
-        return r.json()
+        return self._captured("rest", "GET", path, params, r.json())
 
     def signed(self, method: str, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         if not self.api_key or not self.api_secret:
@@ -6708,32 +7041,76 @@ class Exchange:
         sig = self._sign(qs)
         url = f"{self.base}{path}?{qs}&signature={sig}"
         req = {"get": self.s.get, "post": self.s.post, "delete": self.s.delete}[method.lower()]
-        r = self._request_with_retry(req, url, headers=self._headers())
+        r = self._request_with_retry(
+            req,
+            url,
+            headers=self._headers(),
+            rate_path=path,
+            rate_params=params,
+            critical=True,
+            order=method.lower() != "get" and path in RequestWeightGovernor.ORDER_PATHS,
+        )
         r.raise_for_status()
-        return r.json()
+        return self._captured("signed", method, path, params, r.json())
+
+    @staticmethod
+    def _captured(source: str, method: str, path: str, params: Optional[Mapping[str, Any]], body: Any) -> Any:
+        capture = http_client.capture_log()
+        if capture is not None:
+            try:
+                capture.record(source, method, path, params, body)
+            except Exception as exc:
+                log.debug(f"capture write failed for {path}: {exc}")
+        return body
 
     # Convenience
-    def get_exchange_info(self) -> Any:
+    def _fetch_exchange_info(self) -> Any:
         return self.get("/fapi/v1/exchangeInfo")
 
+    def get_exchange_info(self) -> Any:
+        return self.metadata.info()
+
     def get_ticker_24hr(self, symbol: Optional[str] = None) -> Any:
+        stream = self.market_stream
         if symbol:
+            cached = stream.ticker_24hr(symbol) if stream else None
+            if cached:
+                return cached
             return self.get("/fapi/v1/ticker/24hr", {"symbol": symbol})
-        return self.get("/fapi/v1/ticker/24hr")
+        streamed = stream.tickers_24hr() if stream else []
+        if streamed:
+            return streamed
+        requested_at = time.time()
+        payload = self.get("/fapi/v1/ticker/24hr")
+        if stream:
+            stream.seed("ticker", payload, requested_at)
+        return payload
 
-    def get_klines(self, symbol: str, interval: str, limit: int) -> List[List[float]]:
-        ks = self.get("/fapi/v1/klines", {"symbol": symbol, "interval": interval, "limit": limit})
-        out = []
-        for k in ks:
-            out.append([float(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]), float(k[7])])
-        return out
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        *,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> indicators.KlineFrame:
+        params: Dict[str, Any] = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = int(start_time)
+        if end_time is not None:
+            params["endTime"] = int(end_time)
+        return indicators.KlineFrame.from_payload(self.get("/fapi/v1/klines", params))
 
     def _raw_get_book_ticker(self, symbol: str) -> Any:
         return self.get("/fapi/v1/ticker/bookTicker", {"symbol": symbol})
 
     def get_book_ticker(self, symbol: Optional[str] = None) -> Any:
+        stream = self.market_stream
         if symbol:
-            data = self._raw_get_book_ticker(symbol)
+            data = stream.book_ticker(symbol) if stream else None
+            if not data:
+                data = self._raw_get_book_ticker(symbol)
             if PAPER and self._paper and isinstance(data, dict):
                 try:
                     bid = float(data.get("bidPrice", 0.0) or 0.0)
@@ -6745,7 +7122,12 @@ class Exchange:
                     ask = 0.0
                 self._paper.update_quote(symbol, bid, ask)
             return data
-        payload = self.get("/fapi/v1/ticker/bookTicker")
+        payload = stream.book_tickers() if stream else []
+        if not payload:
+            requested_at = time.time()
+            payload = self.get("/fapi/v1/ticker/bookTicker")
+            if stream:
+                stream.seed("book", payload, requested_at)
         if PAPER and self._paper and isinstance(payload, list):
             for entry in payload:
                 if not isinstance(entry, dict):
@@ -6771,10 +7153,21 @@ class Exchange:
         return self.get("/fapi/v1/depth", payload)
 
     def get_premium_index(self, symbol: Optional[str] = None) -> Any:
+        stream = self.market_stream
         params = {"symbol": symbol} if symbol else None
         if params:
+            cached = stream.premium_index(symbol) if stream else None
+            if cached:
+                return cached
             return self.get("/fapi/v1/premiumIndex", params)
-        return self.get("/fapi/v1/premiumIndex")
+        streamed = stream.premium_indices() if stream else []
+        if streamed:
+            return streamed
+        requested_at = time.time()
+        payload = self.get("/fapi/v1/premiumIndex")
+        if stream:
+            stream.seed("mark", payload, requested_at)
+        return payload
 
     def get_position_risk(self) -> Any:
         if PAPER and self._paper:
@@ -6948,7 +7341,9 @@ class Exchange:
         if PAPER and self._paper:
             return f"paper-{uuid.uuid4().hex}"
         url = f"{self.base}/fapi/v1/listenKey"
-        r = self._request_with_retry(self.s.post, url, headers=self._headers())
+        r = self._request_with_retry(
+            self.s.post, url, headers=self._headers(), rate_path="/fapi/v1/listenKey", critical=True
+        )
         r.raise_for_status()
         data = r.json()
         return data.get("listenKey")
@@ -6962,6 +7357,8 @@ class Exchange:
             url,
             headers=self._headers(),
             data={"listenKey": listen_key},
+            rate_path="/fapi/v1/listenKey",
+            critical=True,
         )
 
     def close_listen_key(self, listen_key: str) -> None:
@@ -6973,6 +7370,8 @@ class Exchange:
             url,
             headers=self._headers(),
             data={"listenKey": listen_key},
+            rate_path="/fapi/v1/listenKey",
+            critical=True,
         )
 
     def await_order_fill(
@@ -6992,6 +7391,18 @@ class Exchange:
             return order_info, trades
         deadline = time.time() + max(0.5, timeout)
         latest = dict(order_info)
+        stream = self.user_stream
+        if stream is not None and stream.is_connected():
+            streamed = self.fill_waiters.wait(
+                order_id,
+                client_order_id,
+                timeout=min(FILL_STREAM_WAIT, max(0.5, timeout)),
+            )
+            if streamed is not None:
+                streamed_order, streamed_trades = streamed
+                if FillWaiterRegistry.is_complete(streamed_order, streamed_trades):
+                    return streamed_order, streamed_trades
+                latest.update({k: v for k, v in streamed_order.items() if v is not None})
         while time.time() < deadline:
             status = str(latest.get("status") or "").upper()
             executed = _coerce_float(latest.get("executedQty")) or 0.0
@@ -7014,6 +7425,271 @@ class Exchange:
         return latest, trades
 
 
+class ReplayMiss(RequestException):
+    """Raised when a replayed run asks for a request the capture never saw."""
+
+
+class ReplayClock:
+    """Stand-in for the ``time`` module driven by capture timestamps.
+
+    ``time()`` returns the simulated clock, ``sleep()`` advances it instead of
+    blocking, everything else is delegated to the real module.
+    """
+
+    def __init__(self, start: float) -> None:
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self._now += max(0.0, float(seconds or 0.0))
+
+    def advance_to(self, ts: float) -> None:
+        with self._lock:
+            if ts > self._now:
+                self._now = float(ts)
+
+    def __getattr__(self, name: str) -> Any:
+        # install_clock() biegt das Modul-``time`` auf uns um -> echtes Modul nehmen
+        return getattr(_real_time, name)
+
+
+class ReplayExchange(Exchange):
+    """Drop-in Exchange that serves responses from a capture file.
+
+    Responses are matched on ``(source, method, path, params)`` with the
+    volatile signing parameters stripped and served in capture order; once a
+    key is exhausted its last response is repeated. Serving a response moves
+    the simulated clock to the time it was captured, so ``Bot.run_once`` sees
+    the same timestamps and cache expiries as the recorded run.
+    """
+
+    def __init__(self, capture_file: str, base: str = "https://replay.invalid", recv_window: int = 10000):
+        self._responses: Dict[Tuple[str, str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+        self._replay_lock = threading.Lock()
+        first_ts: Optional[float] = None
+        count = 0
+        self.seed: Optional[int] = None
+        for record in http_client.CaptureLog.read(capture_file):
+            if record.get("source") == "header":
+                body = record.get("body") if isinstance(record.get("body"), dict) else {}
+                if self.seed is None and body.get("seed") is not None:
+                    self.seed = int(body["seed"])
+                continue
+            key = self._replay_key(record["source"], record["method"], record["path"], record.get("params"))
+            self._responses[key].append(record)
+            ts = _coerce_float(record.get("t"))
+            if ts is not None and (first_ts is None or ts < first_ts):
+                first_ts = ts
+            count += 1
+        self.records = count
+        self.misses = 0
+        self.clock = ReplayClock(first_ts if first_ts is not None else time.time())
+        if self.seed is None:
+            # Ältere Captures ohne Header: Seed aus dem ersten Zeitstempel
+            self.seed = int(first_ts or 0.0)
+        super().__init__(base, "replay", "replay", recv_window)
+        self._paper = None
+        # Eigene Metadaten ohne Disk-Cache – der Replay soll nur die Capture sehen
+        self.metadata = ExchangeMetadata(self._fetch_exchange_info, base_url=self.base, cache_file=None)
+
+    @staticmethod
+    def _replay_key(source: str, method: str, path: str, params: Any) -> Tuple[str, str, str, str]:
+        if not isinstance(params, str):
+            params = http_client.canonical_params(params)
+        return (str(source), str(method).upper(), str(path), params)
+
+    def _replay(self, source: str, method: str, path: str, params: Optional[Mapping[str, Any]]) -> Any:
+        key = self._replay_key(source, method, path, params)
+        with self._replay_lock:
+            queue = self._responses.get(key)
+            if queue:
+                record = queue.popleft()
+                self._last[key] = record
+            else:
+                record = self._last.get(key)
+            if record is None:
+                self.misses += 1
+                raise ReplayMiss(f"no captured response for {method.upper()} {path} {key[3]}")
+        ts = _coerce_float(record.get("t"))
+        if ts is not None:
+            self.clock.advance_to(ts)
+        return copy.deepcopy(record.get("body"))
+
+    def remaining(self) -> int:
+        with self._replay_lock:
+            return sum(len(queue) for queue in self._responses.values())
+
+    def install_clock(self, *modules: Any) -> None:
+        """Point the ``time`` attribute of ``modules`` at the simulated clock."""
+
+        for module in modules:
+            setattr(module, "time", self.clock)
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return self._replay("rest", "GET", path, params)
+
+    def signed(self, method: str, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return self._replay("signed", method, path, params)
+
+    def create_listen_key(self) -> Optional[str]:
+        return None
+
+    def keepalive_listen_key(self, listen_key: str) -> None:
+        return None
+
+    def close_listen_key(self, listen_key: str) -> None:
+        return None
+
+    def guard_exchange(self) -> Any:
+        """A BracketGuard exchange that replays the captured ``guard`` requests."""
+
+        from brackets_guard import _LiteExchange
+
+        replay = self
+
+        class _ReplayLiteExchange(_LiteExchange):
+            metadata = replay.metadata
+
+            def _req(self, method: str, path: str, params: Dict[str, str], signed: bool) -> dict:
+                return replay._replay("guard", method, path, params)
+
+        return _ReplayLiteExchange(self.base, "", "", recv_window=self.recv_window)
+
+
+class FillWaiterRegistry:
+    """Order updates from the user stream, keyed by orderId and clientOrderId.
+
+    ``UserDataStream`` resolves entries from ORDER_TRADE_UPDATE events and
+    :meth:`wait` wakes the caller as soon as the order is filled, so brackets
+    can be placed without a ``query_order``/``userTrades`` round trip. Events
+    are kept for ``retention`` seconds so a fill that arrives before the
+    waiter registers is not lost.
+    """
+
+    TERMINAL = frozenset({"FILLED", "CANCELED", "EXPIRED", "REJECTED"})
+
+    def __init__(self, retention: float = 120.0) -> None:
+        self.retention = float(retention)
+        self._cond = threading.Condition()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self.resolved = 0
+
+    @staticmethod
+    def _keys(order_id: Any, client_order_id: Any) -> List[str]:
+        keys: List[str] = []
+        oid = _coerce_int(order_id)
+        if oid is not None:
+            keys.append(f"id:{oid}")
+        if client_order_id:
+            keys.append(f"cid:{client_order_id}")
+        return keys
+
+    @classmethod
+    def is_complete(cls, order: Mapping[str, Any], trades: Sequence[Mapping[str, Any]]) -> bool:
+        """True when ``order`` is filled and ``trades`` account for all of it."""
+
+        if str(order.get("status") or "").upper() != "FILLED":
+            return False
+        executed = _coerce_float(order.get("executedQty")) or 0.0
+        traded = sum(_coerce_float(trade.get("qty")) or 0.0 for trade in trades)
+        return executed > 0 and traded >= executed * (1.0 - 1e-9)
+
+    def resolve(self, event: Mapping[str, Any]) -> None:
+        """Apply one normalized ORDER_TRADE_UPDATE event."""
+
+        keys = self._keys(event.get("orderId"), event.get("clientOrderId"))
+        if not keys:
+            return
+        now = time.time()
+        with self._cond:
+            record = next((self._records[key] for key in keys if key in self._records), None)
+            if record is None:
+                record = {"order": {}, "trades": [], "trade_ids": set(), "updated": now}
+            order = record["order"]
+            order.update(
+                {
+                    "symbol": event.get("symbol"),
+                    "orderId": event.get("orderId"),
+                    "clientOrderId": event.get("clientOrderId"),
+                    "side": event.get("side"),
+                    "status": event.get("status"),
+                    "executedQty": event.get("executedQty"),
+                    "avgPrice": event.get("avgPrice"),
+                    "updateTime": event.get("tradeTime") or event.get("event_time"),
+                }
+            )
+            last_qty = _coerce_float(event.get("lastQty")) or 0.0
+            trade_id = _coerce_int(event.get("tradeId"))
+            if last_qty > 0 and trade_id is not None and trade_id not in record["trade_ids"]:
+                record["trade_ids"].add(trade_id)
+                record["trades"].append(
+                    {
+                        "id": trade_id,
+                        "orderId": event.get("orderId"),
+                        "symbol": event.get("symbol"),
+                        "side": event.get("side"),
+                        "price": event.get("lastPrice"),
+                        "qty": event.get("lastQty"),
+                        "commission": event.get("commission") or 0.0,
+                        "realizedPnl": event.get("realizedPnl"),
+                        "time": event.get("tradeTime"),
+                    }
+                )
+            record["updated"] = now
+            for key in keys:
+                self._records[key] = record
+            self.resolved += 1
+            cutoff = now - self.retention
+            for key in [k for k, rec in self._records.items() if rec["updated"] < cutoff]:
+                del self._records[key]
+            self._cond.notify_all()
+
+    def _snapshot(self, keys: List[str]) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        record = next((self._records[key] for key in keys if key in self._records), None)
+        if record is None:
+            return None
+        return dict(record["order"]), [dict(trade) for trade in record["trades"]]
+
+    def peek(self, order_id: Any, client_order_id: Any = None) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        with self._cond:
+            return self._snapshot(self._keys(order_id, client_order_id))
+
+    def wait(
+        self,
+        order_id: Any,
+        client_order_id: Any = None,
+        *,
+        timeout: float = FILL_STREAM_WAIT,
+    ) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Block until the order reaches a terminal state or ``timeout`` passes.
+
+        Returns the latest ``(order, trades)`` seen for the order (possibly a
+        partial fill), or ``None`` if the stream never reported it.
+        """
+
+        keys = self._keys(order_id, client_order_id)
+        if not keys:
+            return None
+        deadline = time.time() + max(0.0, timeout)
+        with self._cond:
+            while True:
+                snapshot = self._snapshot(keys)
+                if snapshot is not None:
+                    status = str(snapshot[0].get("status") or "").upper()
+                    if status in self.TERMINAL:
+                        return snapshot
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return snapshot
+                self._cond.wait(remaining)
+
+
 class UserDataStream:
     def __init__(
         self,
@@ -7033,6 +7709,7 @@ class UserDataStream:
         self._last_keepalive = 0.0
         self._keepalive_interval = float(os.getenv("ASTER_WS_KEEPALIVE", "1200") or 1200)
         self._reconnect_delay = 5.0
+        self._connected = threading.Event()
         path = os.getenv("ASTER_WS_USER_PATH", "/ws/")
         self._ws_path = path if path.startswith("/") else f"/{path}"
 
@@ -7101,14 +7778,19 @@ class UserDataStream:
                 return
             self._handle_payload(payload)
 
+        def _on_open(_ws) -> None:
+            self._connected.set()
+
         def _on_error(_ws, error: Any) -> None:
             log.debug(f"user stream error: {error}")
 
         def _on_close(_ws, *_args) -> None:
+            self._connected.clear()
             log.debug("user stream closed")
 
         self._ws_app = websocket.WebSocketApp(
             url,
+            on_open=_on_open,
             on_message=_on_message,
             on_error=_on_error,
             on_close=_on_close,
@@ -7133,6 +7815,9 @@ class UserDataStream:
                     log.debug(f"user stream keepalive failed: {exc}")
             time.sleep(5.0)
 
+    def is_connected(self) -> bool:
+        return self._connected.is_set() and bool(self._ws_thread and self._ws_thread.is_alive())
+
     def _handle_payload(self, payload: Dict[str, Any]) -> None:
         event_type = str(payload.get("e") or "").upper()
         event_time = payload.get("E")
@@ -7154,6 +7839,10 @@ class UserDataStream:
                 "tradeTime": order.get("T"),
                 "event_time": event_time,
             }
+            waiters = getattr(self.exchange, "fill_waiters", None)
+            if waiters is not None:
+                # Wake await_order_fill first; brackets must not wait on bookkeeping callbacks.
+                waiters.resolve(data)
             if self._on_execution:
                 try:
                     self._on_execution(data)
@@ -7171,6 +7860,648 @@ class UserDataStream:
                     self._on_account(data)
                 except Exception as exc:
                     log.debug(f"account callback failed: {exc}")
+
+
+class MarketDataStream:
+    """Latest-quote table fed by the combined all-market websocket streams.
+
+    Subscribes to ``!bookTicker``, ``!miniTicker@arr`` and ``!markPrice@arr``
+    and keeps the most recent record per symbol in memory. Records are shaped
+    like the corresponding REST payloads (bookTicker, 24hr ticker,
+    premiumIndex) so callers can consume either source interchangeably. A
+    feed counts as live while it has delivered a message within
+    ``stale_after`` seconds; otherwise callers fall back to REST.
+
+    The array streams only carry symbols that changed, so a fresh table
+    covers part of the market. Whole-table reads therefore stay empty until a
+    full REST payload has been merged in via :meth:`seed`.
+
+    Per-symbol kline streams are (un)subscribed on the same connection via
+    :meth:`watch_klines`; their events are handed to :attr:`on_kline`.
+    """
+
+    STREAMS = ("!bookTicker", "!miniTicker@arr", "!markPrice@arr@1s")
+
+    def __init__(self, exchange: "Exchange", *, stale_after: float = MARKET_STREAM_STALE_SEC) -> None:
+        self.exchange = exchange
+        self.stale_after = max(1.0, float(stale_after))
+        self._lock = threading.Lock()
+        self._book: Dict[str, Dict[str, Any]] = {}
+        self._ticker: Dict[str, Dict[str, Any]] = {}
+        self._mark: Dict[str, Dict[str, Any]] = {}
+        self._tables = {"book": self._book, "ticker": self._ticker, "mark": self._mark}
+        self._seeded: Set[str] = set()
+        self._last_event: Dict[str, float] = {}
+        self._messages = 0
+        # Receives kline events (e.g. KlineStore.apply_stream_kline) for streams added via watch_klines().
+        self.on_kline: Optional[Callable[[Dict[str, Any]], Any]] = None
+        self._kline_streams: Set[str] = set()
+        self._request_id = 0
+        self._connected = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ws_app: Any = None
+        self._reconnect_delay = 5.0
+        path = os.getenv("ASTER_WS_MARKET_PATH", "/stream")
+        self._ws_path = path if path.startswith("/") else f"/{path}"
+
+    def start(self) -> None:
+        if websocket is None:
+            log.debug("websocket-client package not available; market stream disabled")
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="market-data-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._ws_app is not None:
+            try:
+                self._ws_app.close()
+            except Exception:
+                pass
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def _build_url(self) -> str:
+        base = self.exchange.ws_base.rstrip("/")
+        return f"{base}{self._ws_path.rstrip('/')}?streams={'/'.join(self.STREAMS)}"
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._run_socket(self._build_url())
+            except Exception as exc:
+                log.debug(f"market stream failure: {exc}")
+            self._connected.clear()
+            if self._stop.is_set():
+                break
+            time.sleep(self._reconnect_delay)
+
+    def _run_socket(self, url: str) -> None:
+        if websocket is None:
+            return
+
+        def _on_open(_ws) -> None:
+            self._connected.set()
+            with self._lock:
+                streams = sorted(self._kline_streams)
+            self._send("SUBSCRIBE", streams)
+
+        def _on_message(_ws, message: str) -> None:
+            if self._stop.is_set():
+                return
+            try:
+                payload = json.loads(message)
+            except ValueError:
+                return
+            self._handle_payload(payload)
+
+        def _on_error(_ws, error: Any) -> None:
+            log.debug(f"market stream error: {error}")
+
+        def _on_close(_ws, *_args) -> None:
+            log.debug("market stream closed")
+
+        self._ws_app = websocket.WebSocketApp(
+            url,
+            on_open=_on_open,
+            on_message=_on_message,
+            on_error=_on_error,
+            on_close=_on_close,
+        )
+        self._ws_app.run_forever(ping_interval=30, ping_timeout=10)
+
+    def _send(self, method: str, streams: Sequence[str]) -> None:
+        if not streams or not self._connected.is_set() or self._ws_app is None:
+            return
+        self._request_id += 1
+        message = {"method": method, "params": list(streams), "id": self._request_id}
+        try:
+            self._ws_app.send(json.dumps(message))
+        except Exception as exc:
+            log.debug(f"market stream {method.lower()} failed: {exc}")
+
+    @staticmethod
+    def _kline_stream(symbol: str, interval: str) -> str:
+        return f"{symbol.lower()}@kline_{interval}"
+
+    def watch_klines(self, symbols: Iterable[str], intervals: Sequence[str]) -> None:
+        """Stream klines for exactly ``symbols`` x ``intervals``; others are unsubscribed."""
+
+        wanted = {
+            self._kline_stream(str(sym).strip(), interval)
+            for sym in symbols
+            if sym and str(sym).strip()
+            for interval in intervals
+        }
+        with self._lock:
+            added = sorted(wanted - self._kline_streams)
+            removed = sorted(self._kline_streams - wanted)
+            self._kline_streams = wanted
+        # Not connected yet: _on_open subscribes the whole set.
+        self._send("UNSUBSCRIBE", removed)
+        self._send("SUBSCRIBE", added)
+
+    def _handle_payload(self, payload: Any) -> None:
+        if isinstance(payload, dict) and "data" in payload and "stream" in payload:
+            payload = payload.get("data")
+        events = payload if isinstance(payload, list) else [payload]
+        now = time.time()
+        klines: List[Dict[str, Any]] = []
+        with self._lock:
+            self._messages += 1
+            for event in events:
+                if not isinstance(event, dict):
+                    continue
+                symbol = str(event.get("s") or "").upper()
+                if not symbol:
+                    continue
+                event_type = str(event.get("e") or "")
+                if event_type == "kline":
+                    klines.append(event)
+                elif event_type == "bookTicker" or (not event_type and "b" in event and "a" in event):
+                    self._book[symbol] = {
+                        "symbol": symbol,
+                        "bidPrice": event.get("b"),
+                        "bidQty": event.get("B"),
+                        "askPrice": event.get("a"),
+                        "askQty": event.get("A"),
+                        "time": event.get("T") or event.get("E"),
+                        "updateId": event.get("u"),
+                        "received_at": now,
+                    }
+                    self._last_event["book"] = now
+                elif event_type == "24hrMiniTicker":
+                    close = _coerce_float(event.get("c"), 0.0) or 0.0
+                    open_ = _coerce_float(event.get("o"), 0.0) or 0.0
+                    change = close - open_
+                    change_pct = (change / open_ * 100.0) if open_ > 0 else 0.0
+                    self._ticker[symbol] = {
+                        "symbol": symbol,
+                        "lastPrice": event.get("c"),
+                        "openPrice": event.get("o"),
+                        "highPrice": event.get("h"),
+                        "lowPrice": event.get("l"),
+                        "volume": event.get("v"),
+                        "quoteVolume": event.get("q"),
+                        "priceChange": f"{change:.10f}",
+                        "priceChangePercent": f"{change_pct:.4f}",
+                        "closeTime": event.get("E"),
+                        "received_at": now,
+                    }
+                    self._last_event["ticker"] = now
+                elif event_type == "markPriceUpdate":
+                    self._mark[symbol] = {
+                        "symbol": symbol,
+                        "markPrice": event.get("p"),
+                        "indexPrice": event.get("i"),
+                        "estimatedSettlePrice": event.get("P"),
+                        "lastFundingRate": event.get("r"),
+                        "nextFundingTime": event.get("T"),
+                        "time": event.get("E"),
+                        "received_at": now,
+                    }
+                    self._last_event["mark"] = now
+        if klines and self.on_kline:
+            for event in klines:
+                try:
+                    self.on_kline(event)
+                except Exception as exc:
+                    log.debug(f"kline stream callback failed: {exc}")
+
+    def is_live(self, feed: str = "book") -> bool:
+        ts = self._last_event.get(feed)
+        return bool(ts) and (time.time() - float(ts)) <= self.stale_after
+
+    def _lookup(self, feed: str, table: Dict[str, Dict[str, Any]], symbol: str) -> Optional[Dict[str, Any]]:
+        if not self.is_live(feed):
+            return None
+        with self._lock:
+            record = table.get(str(symbol or "").upper())
+            return dict(record) if record else None
+
+    def seed(self, feed: str, records: Any, as_of: float) -> None:
+        """Merge a full REST table for ``feed`` requested at ``as_of``.
+
+        Stream records received after ``as_of`` are newer and are kept.
+        """
+
+        if not isinstance(records, list):
+            return
+        table = self._tables[feed]
+        with self._lock:
+            for record in records:
+                if not isinstance(record, dict):
+                    continue
+                symbol = str(record.get("symbol") or "").upper()
+                current = table.get(symbol)
+                if not symbol or (current and float(current.get("received_at") or 0.0) > as_of):
+                    continue
+                table[symbol] = dict(record, symbol=symbol, received_at=as_of)
+            self._seeded.add(feed)
+
+    def _snapshot(self, feed: str, table: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not self.is_live(feed) or feed not in self._seeded:
+            return []
+        with self._lock:
+            return [dict(record) for record in table.values()]
+
+    def book_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self._lookup("book", self._book, symbol)
+
+    def book_tickers(self) -> List[Dict[str, Any]]:
+        return self._snapshot("book", self._book)
+
+    def ticker_24hr(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self._lookup("ticker", self._ticker, symbol)
+
+    def tickers_24hr(self) -> List[Dict[str, Any]]:
+        return self._snapshot("ticker", self._ticker)
+
+    def premium_index(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self._lookup("mark", self._mark, symbol)
+
+    def premium_indices(self) -> List[Dict[str, Any]]:
+        return self._snapshot("mark", self._mark)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            return {
+                "messages": self._messages,
+                "symbols": {"book": len(self._book), "ticker": len(self._ticker), "mark": len(self._mark)},
+                "kline_streams": len(self._kline_streams),
+                "age": {feed: round(now - ts, 3) for feed, ts in self._last_event.items()},
+                "live": {feed: self.is_live(feed) for feed in ("book", "ticker", "mark")},
+            }
+
+
+class DepthBookStream:
+    """Local order books kept in sync from the diff-depth websocket stream.
+
+    Symbols are subscribed on demand via :meth:`watch`, at most
+    ``max_symbols`` at a time; the least recently read one is unsubscribed
+    when the cap is hit. A book is initialised from a REST depth snapshot
+    handed to :meth:`seed` and then advanced by ``depthUpdate`` events:
+    events older than the snapshot's ``lastUpdateId`` are dropped, the first
+    applied event must straddle it and every later one must continue the
+    previous one (``pu`` equals the last ``u``). On a gap the book falls back
+    to buffering until the next snapshot. :meth:`book` returns the same shape
+    as :meth:`Strategy._normalize_order_book` while the connection is live.
+
+    Levels beyond the deepest one of a truncated snapshot are unknown, so only
+    levels inside the seeded price range are served. Once the price has run
+    so far that fewer than ``depth`` of them are left, the book is dropped and
+    re-seeded from the next snapshot.
+    """
+
+    BUFFER_EVENTS = 1000
+
+    def __init__(
+        self,
+        exchange: "Exchange",
+        *,
+        depth: int = ORDERBOOK_DEPTH_LIMIT,
+        max_symbols: int = DEPTH_STREAM_SYMBOLS,
+        stale_after: float = MARKET_STREAM_STALE_SEC,
+        snapshot_limit: int = DEPTH_SNAPSHOT_LIMIT,
+    ) -> None:
+        self.exchange = exchange
+        self.depth = max(5, int(depth))
+        self.snapshot_limit = max(self.depth, min(1000, int(snapshot_limit)))
+        self.max_symbols = max(1, int(max_symbols))
+        self.stale_after = max(1.0, float(stale_after))
+        self._lock = threading.RLock()
+        # LRU order: reads move a symbol to the end, evictions pop from the front.
+        self._books: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._url_symbols: Set[str] = set()
+        self._last_message = 0.0
+        self._request_id = 0
+        self.stats_counters: Dict[str, int] = {"events": 0, "snapshots": 0, "resyncs": 0, "reseeds": 0, "served": 0}
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._connected = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ws_app: Any = None
+        self._reconnect_delay = 5.0
+        path = os.getenv("ASTER_WS_MARKET_PATH", "/stream")
+        self._ws_path = path if path.startswith("/") else f"/{path}"
+
+    # ------------------------------------------------------------ connection
+    def start(self) -> None:
+        if websocket is None:
+            log.debug("websocket-client package not available; depth stream disabled")
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="depth-book-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._ws_app is not None:
+            try:
+                self._ws_app.close()
+            except Exception:
+                pass
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    @staticmethod
+    def _stream_name(symbol: str) -> str:
+        return f"{symbol.lower()}@depth"
+
+    def _build_url(self, symbols: Iterable[str]) -> str:
+        base = self.exchange.ws_base.rstrip("/")
+        streams = "/".join(self._stream_name(sym) for sym in symbols)
+        return f"{base}{self._ws_path.rstrip('/')}?streams={streams}"
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                symbols = list(self._books)
+            if not symbols:
+                # Nothing to stream until the strategy asks for a book.
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            try:
+                self._run_socket(symbols)
+            except Exception as exc:
+                log.debug(f"depth stream failure: {exc}")
+            self._connected.clear()
+            with self._lock:
+                # Events were missed while disconnected: every book needs a new snapshot.
+                for state in self._books.values():
+                    self._reset(state)
+                self._url_symbols = set()
+            if self._stop.is_set():
+                break
+            time.sleep(self._reconnect_delay)
+
+    def _run_socket(self, symbols: List[str]) -> None:
+        if websocket is None:
+            return
+
+        def _on_open(_ws) -> None:
+            self._connected.set()
+            with self._lock:
+                missing = [sym for sym in self._books if sym not in self._url_symbols]
+            if missing:
+                self._send("SUBSCRIBE", missing)
+
+        def _on_message(_ws, message: str) -> None:
+            if self._stop.is_set():
+                return
+            try:
+                payload = json.loads(message)
+            except ValueError:
+                return
+            self._handle_payload(payload)
+
+        def _on_error(_ws, error: Any) -> None:
+            log.debug(f"depth stream error: {error}")
+
+        def _on_close(_ws, *_args) -> None:
+            log.debug("depth stream closed")
+
+        with self._lock:
+            self._url_symbols = set(symbols)
+        self._ws_app = websocket.WebSocketApp(
+            self._build_url(symbols),
+            on_open=_on_open,
+            on_message=_on_message,
+            on_error=_on_error,
+            on_close=_on_close,
+        )
+        self._ws_app.run_forever(ping_interval=30, ping_timeout=10)
+
+    def _send(self, method: str, symbols: Sequence[str]) -> None:
+        if not symbols or not self._connected.is_set() or self._ws_app is None:
+            return
+        self._request_id += 1
+        message = {"method": method, "params": [self._stream_name(sym) for sym in symbols], "id": self._request_id}
+        try:
+            self._ws_app.send(json.dumps(message))
+        except Exception as exc:
+            log.debug(f"depth stream {method.lower()} failed: {exc}")
+
+    def is_live(self) -> bool:
+        return self._connected.is_set() and (time.time() - self._last_message) <= self.stale_after
+
+    # ---------------------------------------------------------- subscriptions
+    def _reset(self, state: Dict[str, Any]) -> None:
+        state["bids"] = {}
+        state["asks"] = {}
+        # Deepest price per side that is still known to be complete (None: whole side).
+        state["bounds"] = {"bids": None, "asks": None}
+        state["snapshot_id"] = None
+        state["last_u"] = None
+        state["synced"] = False
+        state["view"] = None
+
+    def watch(self, symbol: str) -> bool:
+        """Subscribe ``symbol``; returns ``True`` if it already was."""
+
+        token = str(symbol or "").strip().upper()
+        if not token:
+            return False
+        evicted: List[str] = []
+        with self._lock:
+            state = self._books.get(token)
+            if state is not None:
+                self._books.move_to_end(token)
+                return True
+            state = {"buffer": deque(maxlen=self.BUFFER_EVENTS)}
+            self._reset(state)
+            self._books[token] = state
+            while len(self._books) > self.max_symbols:
+                old, _ = self._books.popitem(last=False)
+                evicted.append(old)
+        self._send("UNSUBSCRIBE", evicted)
+        self._send("SUBSCRIBE", [token])
+        self._wake.set()
+        return False
+
+    def seed(self, symbol: str, payload: Any, *, limit: Optional[int] = None) -> bool:
+        """Initialise ``symbol`` from a REST depth snapshot.
+
+        Unwatched symbols are subscribed first; their snapshot is ignored
+        because no diff events have been buffered against it yet. ``limit``
+        is the depth the snapshot was requested with: a side that came back
+        full is truncated and bounds the served range. Returns ``True`` once
+        the book is in sync.
+        """
+
+        token = str(symbol or "").strip().upper()
+        if not isinstance(payload, Mapping) or not self.watch(token):
+            return False
+        try:
+            snapshot_id = int(payload["lastUpdateId"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        with self._lock:
+            state = self._books.get(token)
+            if state is None or state["synced"]:
+                return bool(state and state["synced"])
+            self._reset(state)
+            for key in ("bids", "asks"):
+                levels = list(payload.get(key) or ())
+                self._apply_levels(state[key], levels)
+                if limit and len(levels) >= int(limit) and state[key]:
+                    state["bounds"][key] = (min if key == "bids" else max)(state[key])
+            state["snapshot_id"] = snapshot_id
+            self.stats_counters["snapshots"] += 1
+            pending = list(state["buffer"])
+            state["buffer"].clear()
+            for event in pending:
+                self._apply_event(state, event)
+            return state["synced"]
+
+    def needs_snapshot(self, symbol: str) -> bool:
+        with self._lock:
+            state = self._books.get(str(symbol or "").strip().upper())
+            return state is not None and not state["synced"]
+
+    # ----------------------------------------------------------------- events
+    @staticmethod
+    def _apply_levels(side: Dict[float, float], levels: Iterable[Any]) -> None:
+        for level in levels:
+            try:
+                price = float(level[0])
+                qty = float(level[1])
+            except (TypeError, ValueError, IndexError):
+                continue
+            if qty > 0:
+                side[price] = qty
+            else:
+                side.pop(price, None)
+
+    def _prune(self, state: Dict[str, Any]) -> None:
+        # Keep both sides bounded; whatever is cut off narrows the range that may be served.
+        keep = max(self.snapshot_limit, self.depth * 2)
+        for key, reverse in (("bids", True), ("asks", False)):
+            side = state[key]
+            if len(side) > keep * 2:
+                ordered = sorted(side, reverse=reverse)
+                for price in ordered[keep:]:
+                    del side[price]
+                bound = state["bounds"][key]
+                edge = ordered[keep - 1]
+                state["bounds"][key] = edge if bound is None else (max if reverse else min)(bound, edge)
+
+    def _apply_event(self, state: Dict[str, Any], event: Mapping[str, Any]) -> None:
+        try:
+            first = int(event["U"])
+            last = int(event["u"])
+        except (KeyError, TypeError, ValueError):
+            return
+        prev = event.get("pu")
+        snapshot_id = state["snapshot_id"]
+        if snapshot_id is None:
+            state["buffer"].append(event)
+            return
+        if not state["synced"]:
+            if last < snapshot_id:
+                return
+            if first > snapshot_id and (prev is None or int(prev) != snapshot_id):
+                # The snapshot is older than the first event we still have.
+                self._reset(state)
+                state["buffer"].append(event)
+                self.stats_counters["resyncs"] += 1
+                return
+        elif (int(prev) != state["last_u"]) if prev is not None else (first > state["last_u"] + 1):
+            self._reset(state)
+            state["buffer"].append(event)
+            self.stats_counters["resyncs"] += 1
+            return
+        self._apply_levels(state["bids"], event.get("b") or ())
+        self._apply_levels(state["asks"], event.get("a") or ())
+        self._prune(state)
+        state["last_u"] = last
+        state["synced"] = True
+        state["view"] = None
+
+    def _handle_payload(self, payload: Any) -> None:
+        if isinstance(payload, dict) and "data" in payload and "stream" in payload:
+            payload = payload.get("data")
+        events = payload if isinstance(payload, list) else [payload]
+        with self._lock:
+            self._last_message = time.time()
+            for event in events:
+                if not isinstance(event, dict) or event.get("e") != "depthUpdate":
+                    continue
+                state = self._books.get(str(event.get("s") or "").upper())
+                if state is None:
+                    continue
+                self.stats_counters["events"] += 1
+                self._apply_event(state, event)
+
+    # ------------------------------------------------------------------ reads
+    @staticmethod
+    def _side_array(levels: List[Tuple[float, float]]) -> np.ndarray:
+        side = np.array(levels, dtype=np.float64).reshape(-1, 2)
+        side.flags.writeable = False
+        return side
+
+    def _served_levels(self, state: Dict[str, Any], key: str) -> Optional[List[Tuple[float, float]]]:
+        side = state[key]
+        bound = state["bounds"][key]
+        if key == "bids":
+            levels = sorted(((p, q) for p, q in side.items() if bound is None or p >= bound), reverse=True)
+        else:
+            levels = sorted((p, q) for p, q in side.items() if bound is None or p <= bound)
+        if bound is not None and len(levels) < self.depth:
+            return None
+        return levels[: self.depth]
+
+    def book(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Top ``depth`` levels of a synced book, or ``None``."""
+
+        if not self.is_live():
+            return None
+        token = str(symbol or "").strip().upper()
+        with self._lock:
+            state = self._books.get(token)
+            if state is None or not state["synced"]:
+                return None
+            self._books.move_to_end(token)
+            view = state["view"]
+            if view is None:
+                bid_levels = self._served_levels(state, "bids")
+                ask_levels = self._served_levels(state, "asks")
+                if bid_levels is None or ask_levels is None:
+                    # The price ran past the seeded range: wait for a fresh deep snapshot.
+                    self._reset(state)
+                    self.stats_counters["reseeds"] += 1
+                    return None
+                bids = self._side_array(bid_levels)
+                asks = self._side_array(ask_levels)
+                if not len(bids) or not len(asks) or bids[0, 0] >= asks[0, 0]:
+                    return None
+                view = state["view"] = {"bids": bids, "asks": asks, "lastUpdateId": state["last_u"]}
+            self.stats_counters["served"] += 1
+        snapshot = dict(view)
+        # Valid as of the newest message on the connection, not the last change of this book.
+        snapshot["captured_at"] = self._last_message
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            synced = sum(1 for state in self._books.values() if state["synced"])
+            return {
+                "symbols": len(self._books),
+                "synced": synced,
+                "live": self.is_live(),
+                **self.stats_counters,
+            }
+
+
 # ========= Universe =========
 class SymbolUniverse:
     def __init__(
@@ -7191,6 +8522,8 @@ class SymbolUniverse:
         self.exclude: Set[str] = {str(sym).upper() for sym in (exclude or set())}
         self._cursor = 0
         self._universe_snapshot: List[str] = []
+        self._listing_key: Optional[Tuple[Any, ...]] = None
+        self._listing: List[str] = []
 
     def _normalize_symbols(self, symbols: Sequence[Dict[str, Any]]) -> List[str]:
         normalized: List[str] = []
@@ -7205,13 +8538,22 @@ class SymbolUniverse:
                 continue
         return normalized
 
-    def refresh(self) -> List[str]:
-        try:
+    def _listing_symbols(self) -> List[str]:
+        metadata: Optional[ExchangeMetadata] = getattr(self.exchange, "metadata", None)
+        if metadata is not None:
+            info = metadata.info()
+            listing_key: Optional[Tuple[Any, ...]] = (
+                metadata.digest,
+                tuple(self.include),
+                tuple(sorted(self.exclude)),
+            )
+            # Same payload and filters as last cycle: nothing to re-diff.
+            if listing_key == self._listing_key:
+                return list(self._listing)
+        else:
             info = self.exchange.get_exchange_info()
-            syms = self._normalize_symbols(info.get("symbols", [])) if isinstance(info, dict) else []
-        except Exception:
-            syms = []
-
+            listing_key = None
+        syms = self._normalize_symbols(info.get("symbols", [])) if isinstance(info, dict) else []
         if not syms:
             return []
 
@@ -7226,6 +8568,19 @@ class SymbolUniverse:
         if self.exclude:
             exclude_normalized = {str(sym).upper() for sym in self.exclude}
             syms = [s for s in syms if s not in exclude_normalized]
+        if listing_key is not None:
+            self._listing_key = listing_key
+            self._listing = list(syms)
+        return syms
+
+    def refresh(self) -> List[str]:
+        try:
+            syms = self._listing_symbols()
+        except Exception:
+            syms = []
+
+        if not syms:
+            return []
 
         if syms != self._universe_snapshot:
             self._universe_snapshot = list(syms)
@@ -7294,7 +8649,15 @@ class RiskManager:
 
     def load_filters(self) -> None:
         try:
-            info = self.exchange.get_exchange_info()
+            metadata: Optional[ExchangeMetadata] = getattr(self.exchange, "metadata", None)
+            if metadata is not None:
+                parsed_filters = metadata.filters()
+            else:
+                info = self.exchange.get_exchange_info()
+                parsed_filters = {
+                    str(entry.get("symbol", "")): parse_symbol_filters(entry)
+                    for entry in info.get("symbols", [])
+                }
             filt: Dict[str, Dict[str, Any]] = {}
             bracket_caps: Dict[str, float] = {}
             bracket_details: Dict[str, List[Tuple[float, Optional[float]]]] = {}
@@ -7335,31 +8698,22 @@ class RiskManager:
                             if processed:
                                 bracket_caps[symbol_key] = max(lev for lev, _ in processed)
                                 bracket_details[symbol_key] = processed
-            for s in info.get("symbols", []):
-                sym = s.get("symbol", "")
-                fdict = {f.get("filterType"): f for f in s.get("filters", [])}
-                lot = fdict.get("LOT_SIZE", {})
-                market_lot = fdict.get("MARKET_LOT_SIZE", {})
-                price = fdict.get("PRICE_FILTER", {})
-                max_leverage = _coerce_positive_float(s.get("maxLeverage"))
-                if max_leverage <= 0:
-                    lev_filter = fdict.get("LEVERAGE") or fdict.get("LEVERAGE_FILTER")
-                    if isinstance(lev_filter, dict):
-                        max_leverage = _coerce_positive_float(lev_filter.get("maxLeverage"))
+            for sym, parsed in parsed_filters.items():
+                max_leverage = parsed["maxLeverage"]
                 if max_leverage <= 0 and sym and sym in bracket_caps:
                     max_leverage = bracket_caps.get(sym, 0.0)
                 filt[sym] = {
-                    "minQty": float(lot.get("minQty", "0") or 0),
-                    "maxQty": float(lot.get("maxQty", "0") or 0),
-                    "stepSize": float(lot.get("stepSize", "0.0001") or 0.0001),
-                    "marketMinQty": float(market_lot.get("minQty", "0") or 0),
-                    "marketMaxQty": float(market_lot.get("maxQty", "0") or 0),
-                    "marketStepSize": float(market_lot.get("stepSize", "0") or 0),
-                    "minPrice": float(price.get("minPrice", "0") or 0),
-                    "maxPrice": float(price.get("maxPrice", "0") or 0),
-                    "tickSize": float(price.get("tickSize", "0.0001") or 0.0001),
+                    "minQty": parsed["minQty"],
+                    "maxQty": parsed["maxQty"],
+                    "stepSize": parsed["stepSize"],
+                    "marketMinQty": parsed["marketMinQty"],
+                    "marketMaxQty": parsed["marketMaxQty"],
+                    "marketStepSize": parsed["marketStepSize"],
+                    "minPrice": parsed["minPrice"],
+                    "maxPrice": parsed["maxPrice"],
+                    "tickSize": parsed["tickSize"],
                     "maxLeverage": max_leverage,
-                    "defaultLeverage": _coerce_positive_float(s.get("defaultLeverage")),
+                    "defaultLeverage": parsed["defaultLeverage"],
                 }
                 details = bracket_details.get(sym)
                 if details:
@@ -7922,21 +9276,482 @@ class RiskManager:
                 pass
         return qty
 
-    def step_size(self, symbol: str) -> float:
-        filters = self.symbol_filters.get(symbol, {}) if isinstance(self.symbol_filters, dict) else {}
-        step = float(filters.get("stepSize", 0.0001) or 0.0001)
-        market_step = float(filters.get("marketStepSize", 0.0) or 0.0)
-        if market_step > 0:
-            if step <= 0:
-                step = market_step
-            elif not math.isclose(step, market_step):
-                step = max(step, market_step)
-        if step <= 0:
-            step = 0.0001
-        return step
+    def step_size(self, symbol: str) -> float:
+        filters = self.symbol_filters.get(symbol, {}) if isinstance(self.symbol_filters, dict) else {}
+        step = float(filters.get("stepSize", 0.0001) or 0.0001)
+        market_step = float(filters.get("marketStepSize", 0.0) or 0.0)
+        if market_step > 0:
+            if step <= 0:
+                step = market_step
+            elif not math.isclose(step, market_step):
+                step = max(step, market_step)
+        if step <= 0:
+            step = 0.0001
+        return step
+
+# ========= Klines =========
+class KlineTailStats(NamedTuple):
+    """Volatility and drift of the newest bars of one stored series."""
+
+    bars: int
+    price: float
+    atr_ratio: float
+    momentum: Optional[float]
+
+
+class KlineStore:
+    """Append-only kline history per ``(symbol, interval)``.
+
+    Each series is kept once, as a columnar :class:`indicators.KlineFrame`,
+    at the longest window any caller asked for.
+    Shorter requests are served as zero-copy tail slices, longer
+    ones only download the missing older bars, and refreshes only ask for
+    bars from the last stored open time onwards – normally the still-open
+    bar plus one or two new ones – so request weight no longer scales with
+    the window length. Holes in the open-time sequence are backfilled with one
+    bounded range request, and kline websocket events can be merged directly
+    via :meth:`apply_stream_kline`.
+
+    A series expires when the next bar of its own interval closes (plus
+    ``close_grace`` seconds). Between closes only the still-open tail bar can
+    change, so callers choose how old that tail may get via ``tail_ttl``.
+
+    The store is bounded by ``max_bytes``: series nobody asked for within
+    ``idle_ttl`` seconds are dropped first, then the least recently used ones,
+    until the arrays fit the budget again. :meth:`metrics` reports occupancy,
+    hit rate and evictions.
+    """
+
+    INCREMENTAL_LIMIT = 3
+    MAX_REQUEST = 1500
+
+    def __init__(
+        self,
+        exchange: Exchange,
+        *,
+        ttl: float = KLINE_CACHE_SEC,
+        close_grace: float = KLINE_CLOSE_GRACE_SEC,
+        max_bytes: int = KLINE_CACHE_MAX_BYTES,
+        idle_ttl: float = KLINE_CACHE_IDLE_SEC,
+    ) -> None:
+        self.exchange = exchange
+        self.ttl = float(ttl)
+        self.close_grace = max(0.0, float(close_grace))
+        self.max_bytes = max(0, int(max_bytes))
+        self.idle_ttl = max(0.0, float(idle_ttl))
+        self._lock = threading.RLock()
+        # Insertion order doubles as LRU order: every access moves the key to the end.
+        self._series: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+        self.expired = 0
+        self.hits = 0
+        self.misses = 0
+        self.incremental = 0
+        self.extensions = 0
+        self.backfills = 0
+        self.stream_updates = 0
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @staticmethod
+    def _window(rows: indicators.KlineFrame, limit: Optional[int] = None) -> indicators.KlineFrame:
+        return rows if limit is None else rows.tail(limit)
+
+    def _touch(self, key: Tuple[str, str], entry: Dict[str, Any], now: float) -> None:
+        entry["used_at"] = now
+        try:
+            self._series.move_to_end(key)
+        except KeyError:
+            pass
+
+    def _store(self, key: Tuple[str, str], entry: Dict[str, Any], rows: indicators.KlineFrame) -> None:
+        """Swap in ``rows`` for ``entry`` and keep the byte count in step.
+
+        Callers hold the lock, but fetched outside it: if ``entry`` was evicted
+        meanwhile it is re-inserted (its bytes were already released), and if
+        another fetch replaced it the newer entry wins and ``rows`` is dropped.
+        """
+
+        current = self._series.get(key)
+        if current is not entry:
+            if current is not None:
+                return
+            entry["nbytes"] = 0
+            self._series[key] = entry
+        size = rows.nbytes
+        self._bytes += size - int(entry.get("nbytes", 0))
+        entry["rows"] = rows
+        entry["nbytes"] = size
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        entry = self._series.pop(key, None)
+        if entry is not None:
+            self._bytes -= int(entry.get("nbytes", 0))
+
+    def _enforce_budget(self, keep: Optional[Tuple[str, str]] = None) -> None:
+        """Expire idle series, then evict LRU ones until ``max_bytes`` holds.
+
+        ``keep`` is the series just written; it is never evicted, so a single
+        window larger than the budget still gets served.
+        """
+
+        with self._lock:
+            if self.idle_ttl > 0:
+                cutoff = time.time() - self.idle_ttl
+                # LRU order: the idle ones sit at the front.
+                for key, entry in list(self._series.items()):
+                    if float(entry.get("used_at", 0.0)) > cutoff:
+                        break
+                    if key != keep:
+                        self._drop(key)
+                        self.expired += 1
+            if self.max_bytes <= 0:
+                return
+            while self._bytes > self.max_bytes and len(self._series) > 1:
+                key = next(iter(self._series))
+                if key == keep:
+                    self._series.move_to_end(key)
+                    key = next(iter(self._series))
+                self._drop(key)
+                self.evictions += 1
+
+    def peek(self, symbol: str, interval: str) -> indicators.KlineFrame:
+        """Return the stored series without touching the network."""
+
+        key = (symbol, interval)
+        with self._lock:
+            entry = self._series.get(key)
+            if not entry:
+                return indicators.KlineFrame.empty()
+            self._touch(key, entry, time.time())
+            return entry["rows"]
+
+    def tail_stats(self, symbol: str, interval: str, window: int = 120) -> Optional[KlineTailStats]:
+        """ATR/price ratio and momentum of the newest ``window`` bars.
+
+        Computed once per stored series: a refresh swaps in a new frame, so the
+        cached result is reused for as long as the same frame is stored.
+        """
+
+        entry = self._series.get((symbol, interval))
+        if not entry or not len(entry["rows"]):
+            return None
+        rows = entry["rows"]
+        cached = entry.get("tail_stats")
+        if cached is not None and cached[0] is rows and cached[1] == window:
+            return cached[2]
+        tail = rows.tail(window)
+        closes = tail.close
+        bars = len(closes)
+        price = float(closes[-1])
+        atr_window = min(14, max(5, bars // 4))
+        try:
+            atr = float(indicators.atr_abs(tail.high, tail.low, closes, period=atr_window))
+        except Exception:
+            atr = 0.0
+        trend_span = min(bars - 1, 48)
+        momentum: Optional[float] = None
+        if trend_span > 5:
+            momentum = float(closes[-1] - closes[-trend_span]) / max(float(closes[-trend_span]), 1e-9)
+        stats = KlineTailStats(bars, price, (atr / price) if price > 0 else 0.0, momentum)
+        entry["tail_stats"] = (rows, window, stats)
+        return stats
+
+    def nbytes(self) -> int:
+        """Bytes held by the cached kline arrays."""
+
+        return self._bytes
+
+    def metrics(self) -> Dict[str, Any]:
+        """Occupancy, hit rate and eviction counters for state/dashboard."""
+
+        with self._lock:
+            per_interval: Dict[str, Dict[str, int]] = {}
+            for (_, interval), entry in self._series.items():
+                bucket = per_interval.setdefault(interval, {"series": 0, "bars": 0, "bytes": 0})
+                bucket["series"] += 1
+                bucket["bars"] += len(entry["rows"])
+                bucket["bytes"] += int(entry.get("nbytes", 0))
+            lookups = self.hits + self.misses
+            return {
+                "series": len(self._series),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "incremental": self.incremental,
+                "extensions": self.extensions,
+                "backfills": self.backfills,
+                "stream_updates": self.stream_updates,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "per_interval": per_interval,
+            }
+
+    def expires_at(self, entry: Mapping[str, Any], interval: str, tail_ttl: Optional[float] = None) -> float:
+        """Return the epoch second at which ``entry`` needs a refresh."""
+
+        fetched_at = float(entry["fetched_at"])
+        tail_ttl = self.ttl if tail_ttl is None else float(tail_ttl)
+        expiry = fetched_at + tail_ttl
+        step = _interval_ms(interval)
+        rows = entry["rows"]
+        if step > 0 and len(rows):
+            close_at = (float(rows.open_time[-1]) + step) / 1000.0 + self.close_grace
+            # Refresh once after the close; if the exchange lags, the tail TTL takes over.
+            if fetched_at < close_at:
+                expiry = min(expiry, close_at)
+        return expiry
+
+    def fetch_weight(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        *,
+        tail_ttl: Optional[float] = None,
+    ) -> int:
+        """Estimate the request weight :meth:`get` would spend right now."""
+
+        limit = max(1, int(limit))
+        entry = self._series.get((symbol, interval))
+        if entry is None:
+            return _kline_request_weight(limit)
+        weight = 0
+        if len(entry["rows"]) < limit and not entry["complete"]:
+            weight += _kline_request_weight(limit - len(entry["rows"]))
+        if time.time() >= self.expires_at(entry, interval, tail_ttl):
+            weight += _kline_request_weight(self.INCREMENTAL_LIMIT)
+        return weight
+
+    def get(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        *,
+        tail_ttl: Optional[float] = None,
+    ) -> indicators.KlineFrame:
+        key = (symbol, interval)
+        limit = max(1, int(limit))
+        now = time.time()
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is not None:
+                self._touch(key, entry, now)
+                entry["capacity"] = max(entry["capacity"], limit)
+                need_older = len(entry["rows"]) < limit and not entry["complete"]
+                stale = now >= self.expires_at(entry, interval, tail_ttl)
+                if not need_older and not stale:
+                    self.hits += 1
+                    return self._window(entry["rows"], limit)
+        try:
+            if entry is None:
+                self._fetch_full(key, limit, now)
+            else:
+                if need_older:
+                    self._extend_back(key, entry, limit)
+                if stale:
+                    self._fetch_incremental(key, entry, now)
+        except Exception:
+            if entry and len(entry["rows"]):
+                self.hits += 1
+                log.debug(f"kl-cache fallback {symbol} {interval}")
+                return self._window(entry["rows"], limit)
+            raise
+        with self._lock:
+            self._enforce_budget(keep=key)
+            entry = self._series.get(key)
+            return self._window(entry["rows"], limit) if entry else indicators.KlineFrame.empty()
+
+    def _fetch_full(self, key: Tuple[str, str], limit: int, now: float) -> None:
+        symbol, interval = key
+        fresh = self.exchange.get_klines(symbol, interval, limit)
+        self.misses += 1
+        rows = indicators.KlineFrame.from_rows(fresh or [])
+        with self._lock:
+            if not len(rows):
+                self._drop(key)
+                return
+            entry = self._series.get(key)
+            if entry is None:
+                entry = self._series[key] = {"used_at": now}
+            entry.update(
+                fetched_at=now,
+                capacity=limit,
+                # Fewer bars than requested means the listing is younger than the window.
+                complete=len(rows) < limit,
+            )
+            entry.pop("tail_stats", None)
+            self._store(key, entry, rows)
+
+    def _extend_back(self, key: Tuple[str, str], entry: Dict[str, Any], limit: int) -> None:
+        symbol, interval = key
+        rows = entry["rows"]
+        missing = limit - len(rows)
+        if missing <= 0 or not len(rows):
+            return
+        first_open = float(rows.open_time[0])
+        older = self.exchange.get_klines(
+            symbol,
+            interval,
+            min(self.MAX_REQUEST, missing),
+            end_time=int(first_open) - 1,
+        )
+        self.extensions += 1
+        prefix = indicators.KlineFrame.from_rows(older or [])
+        prefix = prefix[prefix.open_time < first_open]
+        with self._lock:
+            self._store(key, entry, indicators.KlineFrame.concat(prefix, entry["rows"]))
+            # Only a short answer to a full request means the listing starts here.
+            if len(prefix) < min(self.MAX_REQUEST, missing):
+                entry["complete"] = True
+
+    def _fetch_incremental(self, key: Tuple[str, str], entry: Dict[str, Any], now: float) -> None:
+        symbol, interval = key
+        step = _interval_ms(interval)
+        last_open = int(entry["rows"].open_time[-1])
+        pending = int((now * 1000.0 - last_open) // step) + 1 if step > 0 else 0
+        if step <= 0 or pending > entry["capacity"]:
+            self._fetch_full(key, entry["capacity"], now)
+            return
+        fetch_limit = max(self.INCREMENTAL_LIMIT, pending + 1)
+        fresh = self.exchange.get_klines(symbol, interval, fetch_limit, start_time=last_open)
+        self.incremental += 1
+        self._merge(key, entry, indicators.KlineFrame.from_rows(fresh or []), step)
+        with self._lock:
+            entry["fetched_at"] = now
+
+    def _merge(
+        self,
+        key: Tuple[str, str],
+        entry: Dict[str, Any],
+        fresh: indicators.KlineFrame,
+        step: int,
+    ) -> None:
+        if not len(fresh):
+            return
+        symbol, interval = key
+        rows = entry["rows"]
+        first_open = float(fresh.open_time[0])
+        idx = int(np.searchsorted(rows.open_time, first_open, side="left"))
+        gap_start = float(rows.open_time[idx - 1]) + step if idx else None
+        if gap_start is not None and step > 0 and first_open - gap_start >= step:
+            missing = int((first_open - gap_start) // step)
+            try:
+                filler = self.exchange.get_klines(
+                    symbol,
+                    interval,
+                    min(self.MAX_REQUEST, missing),
+                    start_time=int(gap_start),
+                    end_time=int(first_open - 1),
+                )
+            except Exception as exc:
+                log.debug(f"kline backfill failed {symbol} {interval}: {exc}")
+                filler = []
+            self.backfills += 1
+            filler = indicators.KlineFrame.from_rows(filler or [])
+            fresh = indicators.KlineFrame.concat(filler[filler.open_time < first_open], fresh)
+        with self._lock:
+            merged = indicators.KlineFrame.concat(entry["rows"][:idx], fresh)
+            self._store(key, entry, merged.tail(entry["capacity"]))
+
+    def apply_stream_kline(self, payload: Mapping[str, Any]) -> bool:
+        """Merge a kline websocket event into an existing series."""
+
+        bar = payload.get("k") if isinstance(payload, Mapping) else None
+        if not isinstance(bar, Mapping):
+            return False
+        symbol = str(bar.get("s") or payload.get("s") or "").upper()
+        interval = str(bar.get("i") or "")
+        key = (symbol, interval)
+        try:
+            row = (
+                float(bar["t"]),
+                float(bar["o"]),
+                float(bar["h"]),
+                float(bar["l"]),
+                float(bar["c"]),
+                float(bar["v"]),
+                float(bar.get("q", 0.0) or 0.0),
+            )
+        except (KeyError, TypeError, ValueError):
+            return False
+        step = _interval_ms(interval)
+        with self._lock:
+            entry = self._series.get(key)
+            if not entry or not len(entry["rows"]) or step <= 0:
+                return False
+            rows = entry["rows"]
+            last_open = float(rows.open_time[-1])
+            if row[0] == last_open:
+                self._store(key, entry, indicators.KlineFrame.concat(rows[:-1], indicators.KlineFrame.from_rows([row])))
+            elif row[0] == last_open + step:
+                appended = indicators.KlineFrame.concat(rows, indicators.KlineFrame.from_rows([row]))
+                self._store(key, entry, appended.tail(entry["capacity"]))
+            else:
+                # Out of sequence – leave it to the next REST refresh to backfill.
+                return False
+            entry["fetched_at"] = time.time()
+            self.stream_updates += 1
+        return True
+
 
 # ========= Strategy =========
 class Strategy:
+    # Read-only; _adaptive_kline_limit reads them on every call without copying
+    _KLINE_SIZING_PROFILES: Dict[str, Dict[str, Any]] = {
+        "adaptive": {
+            "key": "adaptive",
+            "adaptive": True,
+            "base_scale": 1.0,
+            "lower_scale": 1.0,
+            "upper_scale": 1.0,
+            "atr_low_bias": 1.0,
+            "atr_high_bias": 1.0,
+            "expand_factor": 1.5,
+            "contract_factor": 0.75,
+            "trend_factor": 0.9,
+            "trend_sensitivity": 1.0,
+        },
+        "compact": {
+            "key": "compact",
+            "adaptive": True,
+            "base_scale": 0.85,
+            "lower_scale": 0.9,
+            "upper_scale": 0.9,
+            "atr_low_bias": 0.9,
+            "atr_high_bias": 0.9,
+            "expand_factor": 1.35,
+            "contract_factor": 0.7,
+            "trend_factor": 0.82,
+            "trend_sensitivity": 1.05,
+        },
+        "expanded": {
+            "key": "expanded",
+            "adaptive": True,
+            "base_scale": 1.15,
+            "lower_scale": 1.0,
+            "upper_scale": 1.25,
+            "atr_low_bias": 1.1,
+            "atr_high_bias": 1.1,
+            "expand_factor": 1.65,
+            "contract_factor": 0.85,
+            "trend_factor": 0.95,
+            "trend_sensitivity": 0.9,
+        },
+        "static": {
+            "key": "static",
+            "adaptive": False,
+            "base_scale": 1.0,
+            "lower_scale": 1.0,
+            "upper_scale": 1.0,
+        },
+    }
+
     def __init__(
         self,
         exchange: Exchange,
@@ -7959,16 +9774,24 @@ class Strategy:
         self._premium_cache: Dict[str, dict] = {}
         self._premium_ts = 0.0
         self._premium_ttl = 60
-        self._kl_cache: Dict[Tuple[str, str, int], Tuple[float, Tuple[Tuple[float, ...], ...]]] = {}
-        self._kl_cache_ttl = KLINE_CACHE_SEC
-        self._kl_cache_hits = 0
-        self._kl_cache_miss = 0
+        self._kl_cache = KlineStore(exchange, ttl=KLINE_CACHE_SEC)
+        self._indicator_states: "OrderedDict[Tuple[str, str], indicators.IndicatorState]" = OrderedDict()
+        # (first open, last closed open) of windows served without a state yet
+        self._indicator_windows: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        # Bars of indicator history compute_signal reads back (crossovers, slopes, squeeze, retest)
+        self._indicator_history = max(8, BREAKOUT_RETEST_BARS)
+        self._indicator_batch: Dict[Tuple[str, str], Tuple[Tuple[float, ...], indicators.IndicatorSnapshot]] = {}
+        self.indicator_batch_stats: Dict[str, int] = {"primed": 0, "hits": 0}
         self._symbol_score_cache: Dict[str, Dict[str, float]] = {}
         self.orderbook_limit = ORDERBOOK_DEPTH_LIMIT
         self._orderbook_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
         self._orderbook_budget_max = ORDERBOOK_ON_DEMAND
         self._orderbook_budget = 0
+        self._orderbook_lock = threading.Lock()
         self._orderbook_ttl = ORDERBOOK_TTL
+        # Set by the bot when diff-depth streaming is enabled
+        self.depth_books: Optional[DepthBookStream] = None
+        self._orderbook_features: Dict[str, Tuple[Any, Any, Dict[str, float]]] = {}
         self.min_edge_r = MIN_EDGE_R
         self.rsi_buy_min = RSI_BUY_MIN
         self.rsi_sell_max = RSI_SELL_MAX
@@ -9155,34 +10978,111 @@ class Strategy:
                 snapshot["playbook"] = playbook_summary
         return snapshot
 
-    def _klines_cached(self, symbol: str, interval: str, limit: int) -> Sequence[Sequence[float]]:
-        key = (symbol, interval, int(limit))
-        now = time.time()
-        entry = self._kl_cache.get(key)
-        if entry and (now - entry[0]) < self._kl_cache_ttl:
-            self._kl_cache_hits += 1
-            return entry[1]
-        try:
-            fresh = self.exchange.get_klines(symbol, interval, limit)
-        except Exception:
-            if entry:
-                self._kl_cache_hits += 1
-                log.debug(f"kl-cache fallback {symbol} {interval}")
-                return entry[1]
-            raise
-        self._kl_cache_miss += 1
-        clone = tuple(tuple(row) for row in fresh) if fresh else tuple()
-        if clone:
-            self._kl_cache[key] = (now, clone)
-        elif entry:
-            self._kl_cache.pop(key, None)
-        if self._kl_cache_miss % 50 == 0 and len(self._kl_cache) > 200:
-            stale = [k for k, (ts, _) in self._kl_cache.items() if (now - ts) >= self._kl_cache_ttl]
-            for k in stale:
-                self._kl_cache.pop(k, None)
-        return clone
-
-    def _resolve_kline_sizing_profile(self) -> Dict[str, Any]:
+    @staticmethod
+    def _kline_tail_ttl(interval: str) -> float:
+        # Base bars feed the live price; the open HTF bar only needs an occasional refresh.
+        return KLINE_CACHE_SEC if interval == INTERVAL else HTF_TAIL_REFRESH_SEC
+
+    def _klines_cached(self, symbol: str, interval: str, limit: int) -> indicators.KlineFrame:
+        return self._kl_cache.get(symbol, interval, limit, tail_ttl=self._kline_tail_ttl(interval))
+
+    def _indicator_snapshot(
+        self, symbol: str, interval: str, kl: Sequence[Sequence[float]]
+    ) -> indicators.IndicatorSnapshot:
+        """Indicators for ``kl`` with its last (possibly open) bar as a provisional update.
+
+        Every path returns the values of the window functions over ``kl``. A
+        per-series :class:`indicators.IndicatorState` is only valid while the
+        window still starts at the state's first bar, so closed bars are folded
+        in incrementally only until the window head moves. The first call on a
+        new head is computed from the window; the state is built once the same
+        closed bars come back (e.g. the open bar was refreshed), after which the
+        open bar costs a single preview step.
+        """
+
+        kl = indicators.KlineFrame.from_rows(kl)
+        key = (symbol, interval)
+        primed = self._indicator_batch.get(key)
+        if primed is not None and primed[0] == kl.signature():
+            self.indicator_batch_stats["hits"] += 1
+            return primed[1]
+        if not STREAMING_INDICATORS or len(kl) < 2:
+            return indicators.window_snapshot(kl, history=self._indicator_history, adx_mode=ADX_MODE)
+        states = self._indicator_states
+        state = states.get(key)
+        head = len(kl) - 1
+        opens = kl.open_time
+        start = 0
+        if state is not None:
+            start = int(np.searchsorted(opens[:head], state.last_open, side="right"))
+            if (
+                state.first_open != float(opens[0])
+                or start == 0
+                or float(opens[start - 1]) != state.last_open
+            ):
+                # Window head moved or the series has a gap: the state is seeded elsewhere.
+                state = None
+                start = 0
+                states.pop(key, None)
+        if state is None:
+            closed = (float(opens[0]), float(opens[head - 1]))
+            if self._indicator_windows.get(key) != closed:
+                self._indicator_windows[key] = closed
+                return indicators.window_snapshot(kl, history=self._indicator_history, adx_mode=ADX_MODE)
+            self._indicator_windows.pop(key, None)
+            state = indicators.IndicatorState(history=self._indicator_history, adx_mode=ADX_MODE)
+        state.extend(kl[start:head])
+        states[key] = state
+        states.move_to_end(key)
+        while len(states) > INDICATOR_STATE_MAX:
+            states.popitem(last=False)
+        return state.preview(kl[head])
+
+    def prime_indicator_batch(self, symbols: Iterable[str]) -> int:
+        """Compute the indicator snapshots of all ``symbols`` in one vectorized pass.
+
+        Uses the cached windows only (no requests). ``_indicator_snapshot``
+        serves a primed snapshot as long as it is handed the very window primed
+        here; once the store refreshes a series, that call falls back to the
+        per-series path.
+        """
+
+        self._indicator_batch = {}
+        self.indicator_batch_stats = {"primed": 0, "hits": 0}
+        if not BATCH_INDICATORS:
+            return 0
+        keys: List[Tuple[str, str]] = []
+        windows: List[indicators.KlineFrame] = []
+        for symbol in dict.fromkeys(symbols):
+            try:
+                kl_limit, htf_limit = self.kline_limits(symbol)
+            except Exception as exc:
+                log.debug(f"indicator batch skip {symbol}: {exc}")
+                continue
+            for interval, limit in ((INTERVAL, kl_limit), (HTF_INTERVAL, htf_limit)):
+                window = self._kl_cache.peek(symbol, interval).tail(limit)
+                if len(window) >= 2:
+                    keys.append((symbol, interval))
+                    windows.append(window)
+        if not windows:
+            return 0
+        snaps = indicators.batch_snapshots(windows, history=self._indicator_history, adx_mode=ADX_MODE)
+        self._indicator_batch = {
+            key: (window.signature(), snap) for key, window, snap in zip(keys, windows, snaps)
+        }
+        self.indicator_batch_stats["primed"] = len(snaps)
+        return len(snaps)
+
+    def kline_limits(self, symbol: str) -> Tuple[int, int]:
+        """Return the base and HTF window sizes ``compute_signal`` will request."""
+
+        kl_limit = self._adaptive_kline_limit(symbol, INTERVAL, KLINES)
+        htf_limit = self._adaptive_kline_limit(
+            symbol, HTF_INTERVAL, HTF_KLINES, default_min=90, default_max=max(HTF_KLINES, 200)
+        )
+        return kl_limit, htf_limit
+
+    def _resolve_kline_sizing_profile(self) -> Mapping[str, Any]:
         default_raw = getattr(PlaybookManager, "_KLINE_SIZING_DEFAULT", "expanded")
         alias_map = getattr(PlaybookManager, "_KLINE_SIZING_ALIASES", {}) or {}
         try:
@@ -9209,57 +11109,8 @@ class Strategy:
             except Exception:
                 normalized = default_mode
 
-        profiles = {
-            "adaptive": {
-                "key": "adaptive",
-                "adaptive": True,
-                "base_scale": 1.0,
-                "lower_scale": 1.0,
-                "upper_scale": 1.0,
-                "atr_low_bias": 1.0,
-                "atr_high_bias": 1.0,
-                "expand_factor": 1.5,
-                "contract_factor": 0.75,
-                "trend_factor": 0.9,
-                "trend_sensitivity": 1.0,
-            },
-            "compact": {
-                "key": "compact",
-                "adaptive": True,
-                "base_scale": 0.85,
-                "lower_scale": 0.9,
-                "upper_scale": 0.9,
-                "atr_low_bias": 0.9,
-                "atr_high_bias": 0.9,
-                "expand_factor": 1.35,
-                "contract_factor": 0.7,
-                "trend_factor": 0.82,
-                "trend_sensitivity": 1.05,
-            },
-            "expanded": {
-                "key": "expanded",
-                "adaptive": True,
-                "base_scale": 1.15,
-                "lower_scale": 1.0,
-                "upper_scale": 1.25,
-                "atr_low_bias": 1.1,
-                "atr_high_bias": 1.1,
-                "expand_factor": 1.65,
-                "contract_factor": 0.85,
-                "trend_factor": 0.95,
-                "trend_sensitivity": 0.9,
-            },
-            "static": {
-                "key": "static",
-                "adaptive": False,
-                "base_scale": 1.0,
-                "lower_scale": 1.0,
-                "upper_scale": 1.0,
-            },
-        }
-
-        profile = profiles.get(normalized, profiles.get(default_mode, profiles["adaptive"]))
-        return dict(profile)
+        profiles = self._KLINE_SIZING_PROFILES
+        return profiles.get(normalized, profiles.get(default_mode, profiles["adaptive"]))
 
     def _adaptive_kline_limit(
         self,
@@ -9282,31 +11133,18 @@ class Strategy:
         upper = int(max(lower, upper_bound * upper_scale))
 
         limit = int(clamp(base, lower, upper))
-        cached: Tuple[Tuple[float, ...], ...] = ()
-        for (sym, iv, _), (_, data) in self._kl_cache.items():
-            if sym == symbol and iv == interval and data:
-                cached = data
-                break
+        stats = self._kl_cache.tail_stats(symbol, interval)
 
-        if not cached:
+        if stats is None:
             return limit
 
         if not profile.get("adaptive", True):
             return int(clamp(limit, lower, upper))
 
-        tail = list(cached[-120:])
-        closes = [float(row[4]) for row in tail if len(row) >= 5]
-        if len(closes) < 20:
+        if stats.bars < 20:
             return limit
 
-        price = closes[-1]
-        atr_window = min(14, max(5, len(tail) // 4))
-        try:
-            atr = atr_abs_from_klines([list(row) for row in tail], period=atr_window)
-        except Exception:
-            atr = 0.0
-        atr_ratio = (atr / price) if price > 0 else 0.0
-
+        atr_ratio = stats.atr_ratio
         if atr_ratio > 0:
             atr_low = KLINES_ATR_LOW * float(profile.get("atr_low_bias", 1.0) or 1.0)
             atr_high = KLINES_ATR_HIGH * float(profile.get("atr_high_bias", 1.0) or 1.0)
@@ -9317,9 +11155,8 @@ class Strategy:
             elif atr_ratio > atr_high:
                 limit = max(lower, min(limit, int(base * contract_factor)))
 
-        trend_span = min(len(closes) - 1, 48)
-        if trend_span > 5:
-            momentum = (closes[-1] - closes[-trend_span]) / max(closes[-trend_span], 1e-9)
+        momentum = stats.momentum
+        if momentum is not None:
             trend_threshold = KLINES_TREND_BIAS * float(
                 profile.get("trend_sensitivity", 1.0) or 1.0
             )
@@ -9430,6 +11267,17 @@ class Strategy:
         score = min(2.5, qvol / max(self.min_quote_vol, 1e-9)) if qvol > 0 else 0.0
         return score, rec, float(qvol)
 
+    def weight_headroom(self) -> Optional[int]:
+        """Remaining exchange request weight, or ``None`` when it is not tracked."""
+
+        probe = getattr(self.exchange, "weight_headroom", None)
+        if not callable(probe):
+            return None
+        try:
+            return int(probe())
+        except Exception:
+            return None
+
     def reset_orderbook_budget(self, on_demand: Optional[int] = None) -> None:
         budget = self._orderbook_budget_max if on_demand is None else int(on_demand)
         self._orderbook_budget = max(0, budget)
@@ -9497,57 +11345,33 @@ class Strategy:
         for token in forced_order:
             if token not in plan:
                 plan.append(token)
-        if ORDERBOOK_PREFETCH > 0:
+        prefetch_cap = ORDERBOOK_PREFETCH
+        headroom = self.weight_headroom()
+        if headroom is not None:
+            # Forced symbols always go first; ranked extras only while weight is left.
+            affordable = headroom // _depth_request_weight(self.orderbook_limit)
+            prefetch_cap = min(prefetch_cap, max(len(plan), affordable))
+        if prefetch_cap > 0:
             for score, token in ranked:
+                if len(plan) >= prefetch_cap:
+                    break
                 if token in plan:
                     continue
                 if score <= 0 and len(plan) >= len(forced_order):
                     continue
                 plan.append(token)
-                if len(plan) >= ORDERBOOK_PREFETCH:
-                    break
         return plan
 
     def _normalize_order_book(self, payload: Any) -> Optional[Dict[str, Any]]:
         if not isinstance(payload, dict):
             return None
-        bids_raw = payload.get("bids", [])
-        asks_raw = payload.get("asks", [])
-        bids: List[Tuple[float, float]] = []
-        asks: List[Tuple[float, float]] = []
-        for entry in bids_raw:
-            if not entry:
-                continue
-            try:
-                price = float(entry[0])
-                qty = float(entry[1])
-            except Exception:
-                continue
-            if price <= 0 or qty <= 0:
-                continue
-            bids.append((price, qty))
-            if len(bids) >= self.orderbook_limit:
-                break
-        for entry in asks_raw:
-            if not entry:
-                continue
-            try:
-                price = float(entry[0])
-                qty = float(entry[1])
-            except Exception:
-                continue
-            if price <= 0 or qty <= 0:
-                continue
-            asks.append((price, qty))
-            if len(asks) >= self.orderbook_limit:
-                break
-        if not bids or not asks:
+        bids = indicators.order_book_side(payload.get("bids") or (), self.orderbook_limit, descending=True)
+        asks = indicators.order_book_side(payload.get("asks") or (), self.orderbook_limit, descending=False)
+        if not len(bids) or not len(asks):
             return None
-        bids.sort(key=lambda item: item[0], reverse=True)
-        asks.sort(key=lambda item: item[0])
         normalized: Dict[str, Any] = {
-            "bids": tuple(bids),
-            "asks": tuple(asks),
+            "bids": bids,
+            "asks": asks,
             "lastUpdateId": payload.get("lastUpdateId"),
         }
         return normalized
@@ -9561,15 +11385,29 @@ class Strategy:
             token = str(sym or "").strip().upper()
             if not token:
                 continue
+            streamed = self._streamed_order_book(token)
+            if streamed:
+                fetched[token] = streamed
+                continue
             cached = self._orderbook_cache.get(token)
             if cached and (now - cached[0]) <= self._orderbook_ttl:
                 fetched[token] = cached[1]
                 continue
+            limit = self.orderbook_limit
+            if self.depth_books is not None and self.depth_books.needs_snapshot(token):
+                # This snapshot seeds the local book, which then lives on diffs: fetch it deep.
+                limit = max(limit, self.depth_books.snapshot_limit)
             try:
-                raw = self.exchange.get_order_book(token, limit=self.orderbook_limit)
+                raw = self.exchange.get_order_book(token, limit=limit)
             except Exception as exc:
                 log.debug(f"orderbook fetch failed for {token}: {exc}")
                 continue
+            if self.depth_books is not None:
+                # First sighting subscribes the diff stream, the next snapshot syncs the local book.
+                try:
+                    self.depth_books.seed(token, raw, limit=limit)
+                except Exception as exc:
+                    log.debug(f"depth stream seed failed for {token}: {exc}")
             normalized = self._normalize_order_book(raw)
             if not normalized:
                 continue
@@ -9579,10 +11417,44 @@ class Strategy:
             fetched[token] = snapshot
         return fetched
 
+    def prime_order_book_features(self, books: Mapping[str, Mapping[str, Any]]) -> int:
+        """Compute depth features for all ``books`` in one vectorized pass.
+
+        :meth:`_order_book_features` reuses a result as long as it is handed
+        the very same bid/ask arrays; age and book-ticker fields are still
+        added per call.
+        """
+
+        self._orderbook_features = {}
+        entries = [
+            (str(symbol).upper(), snapshot["bids"], snapshot["asks"])
+            for symbol, snapshot in books.items()
+            if isinstance(snapshot, Mapping) and snapshot.get("bids") is not None and snapshot.get("asks") is not None
+        ]
+        if not entries:
+            return 0
+        results = indicators.order_book_features_batch([(bids, asks) for _, bids, asks in entries])
+        for (token, bids, asks), features in zip(entries, results):
+            self._orderbook_features[token] = (bids, asks, features)
+        return len(entries)
+
+    def _streamed_order_book(self, token: str) -> Optional[Dict[str, Any]]:
+        books = self.depth_books
+        if books is None:
+            return None
+        try:
+            return books.book(token)
+        except Exception as exc:
+            log.debug(f"depth stream read failed for {token}: {exc}")
+            return None
+
     def get_cached_order_book(self, symbol: str, *, stale_ok: bool = False) -> Optional[Dict[str, Any]]:
         token = str(symbol or "").strip().upper()
         if not token:
             return None
+        streamed = self._streamed_order_book(token)
+        if streamed:
+            return streamed
         cached = self._orderbook_cache.get(token)
         if not cached:
             return None
@@ -9597,9 +11469,13 @@ class Strategy:
         snapshot = self.get_cached_order_book(symbol)
         if snapshot:
             return snapshot
-        if self._orderbook_budget <= 0:
+        headroom = self.weight_headroom()
+        if headroom is not None and headroom < _depth_request_weight(self.orderbook_limit):
             return None
-        self._orderbook_budget -= 1
+        with self._orderbook_lock:
+            if self._orderbook_budget <= 0:
+                return None
+            self._orderbook_budget -= 1
         fetched = self.prefetch_order_books([symbol])
         return fetched.get(str(symbol or "").strip().upper())
 
@@ -9612,76 +11488,20 @@ class Strategy:
         snapshot = order_book or self.ensure_order_book(symbol)
         if not snapshot:
             return {}
-        bids: Sequence[Tuple[float, float]] = snapshot.get("bids", ())  # type: ignore[assignment]
-        asks: Sequence[Tuple[float, float]] = snapshot.get("asks", ())  # type: ignore[assignment]
-        if not bids or not asks:
+        bids = snapshot.get("bids")
+        asks = snapshot.get("asks")
+        if bids is None or asks is None or not len(bids) or not len(asks):
             return {}
-
-        def _sum_qty(levels: Sequence[Tuple[float, float]], depth: int) -> float:
-            return sum(level[1] for level in levels[: depth if depth > 0 else len(levels)])
-
-        def _sum_notional(levels: Sequence[Tuple[float, float]], depth: int) -> float:
-            return sum(level[0] * level[1] for level in levels[: depth if depth > 0 else len(levels)])
-
-        def _gap_score(levels: Sequence[Tuple[float, float]], side: str) -> float:
-            if len(levels) < 3:
-                return 0.0
-            diffs: List[float] = []
-            limit = min(len(levels), 12)
-            for idx in range(1, limit):
-                prev_price = levels[idx - 1][0]
-                curr_price = levels[idx][0]
-                gap = prev_price - curr_price if side == "bid" else curr_price - prev_price
-                if gap > 0:
-                    diffs.append(gap)
-            if not diffs:
-                return 0.0
-            avg = sum(diffs) / len(diffs)
-            if avg <= 0:
-                return 0.0
-            return clamp(max(diffs) / avg - 1.0, 0.0, 5.0)
-
-        def _wall_score(levels: Sequence[Tuple[float, float]]) -> float:
-            qtys = [level[1] for level in levels[:10] if level[1] > 0]
-            if len(qtys) < 3:
-                return 0.0
-            qtys_sorted = sorted(qtys)
-            try:
-                median_val = statistics.median(qtys_sorted)
-            except statistics.StatisticsError:
-                median_val = 0.0
-            if median_val <= 0:
-                return 0.0
-            return clamp(max(qtys_sorted) / median_val - 1.0, 0.0, 5.0)
-
-        bid_qty_5 = _sum_qty(bids, 5)
-        ask_qty_5 = _sum_qty(asks, 5)
-        total_5 = max(bid_qty_5 + ask_qty_5, 1e-9)
-        bid_qty_10 = _sum_qty(bids, 10)
-        ask_qty_10 = _sum_qty(asks, 10)
-        total_10 = max(bid_qty_10 + ask_qty_10, 1e-9)
-        bid_notional_10 = _sum_notional(bids, 10)
-        ask_notional_10 = _sum_notional(asks, 10)
-        ratio = bid_notional_10 / max(ask_notional_10, 1e-9)
-        gap_bid = _gap_score(bids, "bid")
-        gap_ask = _gap_score(asks, "ask")
-        wall_bid = _wall_score(bids)
-        wall_ask = _wall_score(asks)
-
-        features: Dict[str, float] = {
-            "lob_imbalance_5": clamp((bid_qty_5 - ask_qty_5) / total_5, -1.0, 1.0),
-            "lob_imbalance_10": clamp((bid_qty_10 - ask_qty_10) / total_10, -1.0, 1.0),
-            "lob_depth_ratio": clamp(ratio, 0.0, 5.0),
-            "lob_gap_score": max(gap_bid, gap_ask),
-            "lob_gap_bid": gap_bid,
-            "lob_gap_ask": gap_ask,
-            "lob_wall_score": max(wall_bid, wall_ask),
-            "lob_wall_bid": wall_bid,
-            "lob_wall_ask": wall_ask,
-            "lob_bid_notional_10": float(bid_notional_10),
-            "lob_ask_notional_10": float(ask_notional_10),
-            "lob_levels": float(min(len(bids), len(asks))),
-        }
+        token = str(symbol or "").strip().upper()
+        primed = self._orderbook_features.get(token)
+        if primed is not None and primed[0] is bids and primed[1] is asks:
+            features = dict(primed[2])
+        else:
+            features = indicators.order_book_features(bids, asks)
+        if not features:
+            return {}
+        bid_notional_10 = features["lob_bid_notional_10"]
+        ask_notional_10 = features["lob_ask_notional_10"]
         features["lob_bias"] = features["lob_imbalance_10"]
         captured_at = snapshot.get("captured_at")
         if captured_at:
@@ -9814,7 +11634,7 @@ class Strategy:
     ) -> Optional[Tuple[str, str, Dict[str, float]]]:
         if price <= 0:
             return None
-        if not ema_fast or not ema_slow or not supertrend_line or not bb_width_series:
+        if not len(ema_fast) or not len(ema_slow) or not len(supertrend_line) or not len(bb_width_series):
             return None
         if len(supertrend_line) != len(supertrend_dir):
             return None
@@ -9824,7 +11644,7 @@ class Strategy:
             return None
 
         tail = bb_width_series[-8:]
-        if not tail:
+        if not len(tail):
             return None
         width_now = float(tail[-1])
         if width_now <= 0:
@@ -9895,19 +11715,17 @@ class Strategy:
         order_book: Optional[Dict[str, Any]] = None,
     ) -> Tuple[str, float, Dict[str, float], float]:
         try:
-            kl_limit = self._adaptive_kline_limit(symbol, INTERVAL, KLINES)
+            kl_limit, htf_limit = self.kline_limits(symbol)
             kl = self._klines_cached(symbol, INTERVAL, kl_limit)
             if not kl or len(kl) < 60:
                 return self._skip("few_klines", symbol, {"k": len(kl) if kl else 0})
-            htf_limit = self._adaptive_kline_limit(
-                symbol, HTF_INTERVAL, HTF_KLINES, default_min=90, default_max=max(HTF_KLINES, 200)
-            )
             htf = self._klines_cached(symbol, HTF_INTERVAL, htf_limit)
         except Exception as e:
             return self._skip("klines_err", symbol, {"err": str(e)[:80]})
 
-        closes = [x[4] for x in kl]; highs = [x[2] for x in kl]; lows = [x[3] for x in kl]
-        last = closes[-1]
+        snap = self._indicator_snapshot(symbol, INTERVAL, kl)
+        bar_last = kl[-1]
+        last = float(bar_last[4])
         ctx_base: Dict[str, Any] = {
             "last_price": float(last),
         }
@@ -9979,7 +11797,7 @@ class Strategy:
             }
         )
 
-        atr = atr_abs_from_klines(kl, 14)
+        atr = float(snap.atr)
         atrp = atr / max(1e-9, last)
         ctx_base["atr_abs"] = float(atr)
         ctx_base["atr_pct"] = float(atrp)
@@ -10034,9 +11852,10 @@ class Strategy:
 
         # Wickiness
         try:
-            wick_hi = highs[-1] - max(closes[-1], float(kl[-1][1]))
-            wick_lo = min(closes[-1], float(kl[-1][1])) - lows[-1]
-            wickiness = max(wick_hi, wick_lo) / max(1e-9, highs[-1] - lows[-1])
+            open_last, high_last, low_last = float(bar_last[1]), float(bar_last[2]), float(bar_last[3])
+            wick_hi = high_last - max(last, open_last)
+            wick_lo = min(last, open_last) - low_last
+            wickiness = max(wick_hi, wick_lo) / max(1e-9, high_last - low_last)
             wick_gate = self.wickiness_max + self.wickiness_near_miss_margin
             ctx_base["wickiness_gate"] = float(wick_gate)
             if wickiness > wick_gate:
@@ -10061,25 +11880,24 @@ class Strategy:
         except Exception:
             pass
 
-        htf_close = [x[4] for x in htf]
-        ema_fast = ema(closes, 21)
-        ema_slow = ema(closes, 55)
-        ema_htf = ema(htf_close, 55)
-        cross_up = ema_fast[-2] < ema_slow[-2] and ema_fast[-1] > ema_slow[-1]
-        cross_dn = ema_fast[-2] > ema_slow[-2] and ema_fast[-1] < ema_slow[-1]
+        ema_fast = snap.ema_fast
+        ema_slow = snap.ema_slow
+        ema_htf = self._indicator_snapshot(symbol, HTF_INTERVAL, htf).ema_slow
+        cross_up = bool(ema_fast[-2] < ema_slow[-2] and ema_fast[-1] > ema_slow[-1])
+        cross_dn = bool(ema_fast[-2] > ema_slow[-2] and ema_fast[-1] < ema_slow[-1])
         ema_gap_pct = abs(ema_fast[-1] - ema_slow[-1]) / max(abs(ema_slow[-1]), 1e-9)
-        rsi14 = rsi(closes, 14)
-        bb_upper, bb_middle, bb_lower, bb_width = bollinger_bands(closes, 20, 2.0)
-        stoch_k, stoch_d = stoch_rsi(closes, 14, 3, 3)
-        stoch_k_last = float(stoch_k[-1]) if stoch_k else 50.0
-        stoch_d_last = float(stoch_d[-1]) if stoch_d else 50.0
-        supertrend_line, supertrend_dir = supertrend_indicator(kl, 10, 3.0)
-        supertrend_last = float(supertrend_line[-1]) if supertrend_line else float(last)
-        supertrend_dir_last = float(supertrend_dir[-1]) if supertrend_dir else 0.0
-        bb_upper_last = float(bb_upper[-1]) if bb_upper else float(last)
-        bb_lower_last = float(bb_lower[-1]) if bb_lower else float(last)
-        bb_middle_last = float(bb_middle[-1]) if bb_middle else float(last)
-        bb_width_last = float(bb_width[-1]) if bb_width else max(bb_upper_last - bb_lower_last, 0.0)
+        rsi14 = snap.rsi
+        bb_upper, bb_middle, bb_lower, bb_width = snap.bb_upper, snap.bb_middle, snap.bb_lower, snap.bb_width
+        stoch_k, stoch_d = snap.stoch_k, snap.stoch_d
+        stoch_k_last = float(stoch_k[-1]) if len(stoch_k) else 50.0
+        stoch_d_last = float(stoch_d[-1]) if len(stoch_d) else 50.0
+        supertrend_line, supertrend_dir = snap.supertrend, snap.supertrend_dir
+        supertrend_last = float(supertrend_line[-1]) if len(supertrend_line) else float(last)
+        supertrend_dir_last = float(supertrend_dir[-1]) if len(supertrend_dir) else 0.0
+        bb_upper_last = float(bb_upper[-1]) if len(bb_upper) else float(last)
+        bb_lower_last = float(bb_lower[-1]) if len(bb_lower) else float(last)
+        bb_middle_last = float(bb_middle[-1]) if len(bb_middle) else float(last)
+        bb_width_last = float(bb_width[-1]) if len(bb_width) else max(bb_upper_last - bb_lower_last, 0.0)
         bb_denom = max(bb_upper_last - bb_lower_last, 1e-9)
         bb_position = float(max(0.0, min(1.0, (last - bb_lower_last) / bb_denom)))
         ctx_base.update(
@@ -10104,10 +11922,8 @@ class Strategy:
             }
         )
 
-        ema_fast_above = [fast > slow for fast, slow in zip(ema_fast, ema_slow)]
-        ema_fast_below = [fast < slow for fast, slow in zip(ema_fast, ema_slow)]
-        trend_persistence_up = _consecutive_true(ema_fast_above, TREND_EXTENSION_LOOKBACK)
-        trend_persistence_down = _consecutive_true(ema_fast_below, TREND_EXTENSION_LOOKBACK)
+        trend_persistence_up = min(snap.run_up, TREND_EXTENSION_LOOKBACK, len(kl))
+        trend_persistence_down = min(snap.run_down, TREND_EXTENSION_LOOKBACK, len(kl))
         ctx_base.update(
             {
                 "trend_persistence_up": float(trend_persistence_up),
@@ -10117,18 +11933,20 @@ class Strategy:
         ctx_base.setdefault("trend_extension_score", 0.0)
 
 
-        adx_val, adx_delta = adx_latest(kl, 14)
+        adx_val, adx_delta = snap.adx, snap.adx_delta
         slope_fast = (ema_fast[-1] - ema_fast[-5]) / max(abs(ema_fast[-5]), 1e-9)
         ctx_base.update(
             {
                 "adx": float(adx_val),
                 "adx_delta": float(adx_delta),
+                "plus_di": float(snap.plus_di),
+                "minus_di": float(snap.minus_di),
                 "slope_fast": float(slope_fast),
             }
         )
 
-        htf_trend_up = ema_htf[-1] > ema_htf[-5]
-        htf_trend_down = ema_htf[-1] < ema_htf[-5]
+        htf_trend_up = bool(ema_htf[-1] > ema_htf[-5])
+        htf_trend_down = bool(ema_htf[-1] < ema_htf[-5])
         ctx_base.update(
             {
                 "htf_trend_up": float(1.0 if htf_trend_up else 0.0),
@@ -10150,8 +11968,8 @@ class Strategy:
             price=float(last),
             ema_fast=ema_fast,
             ema_slow=ema_slow,
-            highs=highs,
-            lows=lows,
+            highs=kl.high[-self._indicator_history :],
+            lows=kl.low[-self._indicator_history :],
             supertrend_line=supertrend_line,
             supertrend_dir=supertrend_dir,
             bb_width_series=bb_width,
@@ -11717,7 +13535,7 @@ class TradeManager:
     def save(self) -> None:
         if self.policy and BANDIT_ENABLED:
             try:
-                self.state["policy"] = self.policy.to_dict()
+                self.state["policy"] = self.policy.to_state(_policy_file())
             except Exception as e:
                 log.debug(f"policy serialize fail: {e}")
         if os.path.exists(STATE_FILE):
@@ -12474,7 +14292,335 @@ class FastTP:
             return True
         return False
 
+# ========= Prefetch =========
+class SymbolPrefetcher:
+    """Look-ahead fetch stage for ``Bot.run_once``.
+
+    While the scan loop evaluates one symbol, a small thread pool downloads
+    base/HTF klines and depth for the next queued symbols into the strategy
+    caches. The loop still evaluates symbols strictly in queue order; it only
+    waits on the prefetch of the symbol it is about to handle. Work is
+    admitted in queue order until the per-cycle request-weight budget is used
+    up, after which remaining symbols fall back to the inline fetch path.
+    """
+
+    def __init__(
+        self,
+        strategy: Strategy,
+        *,
+        workers: int = PREFETCH_WORKERS,
+        lookahead: int = PREFETCH_LOOKAHEAD,
+        weight_budget: int = PREFETCH_WEIGHT_BUDGET,
+    ) -> None:
+        self.strategy = strategy
+        self.lookahead = max(1, int(lookahead))
+        self.weight_budget = max(0, int(weight_budget))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=int(workers), thread_name_prefix="prefetch")
+        self._futures: Dict[str, Future] = {}
+        self._budget_left = self.weight_budget
+        self._exhausted = False
+        self.stats: Dict[str, int] = {"submitted": 0, "waited": 0, "deferred": 0, "weight": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._executor is not None
+
+    def begin_cycle(self, weight_budget: Optional[int] = None) -> None:
+        self.finish_cycle()
+        budget = self.weight_budget if weight_budget is None else int(weight_budget)
+        headroom = self.strategy.weight_headroom()
+        if headroom is not None:
+            budget = min(budget, headroom)
+        self._budget_left = max(0, budget)
+        self._exhausted = False
+        self.stats = {"submitted": 0, "waited": 0, "deferred": 0, "weight": 0}
+
+    def finish_cycle(self) -> None:
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+
+    def shutdown(self) -> None:
+        self.finish_cycle()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def estimate_weight(self, symbol: str) -> int:
+        strategy = self.strategy
+        kl_limit, htf_limit = strategy.kline_limits(symbol)
+        store = strategy._kl_cache
+        weight = store.fetch_weight(
+            symbol, INTERVAL, kl_limit, tail_ttl=strategy._kline_tail_ttl(INTERVAL)
+        )
+        weight += store.fetch_weight(
+            symbol, HTF_INTERVAL, htf_limit, tail_ttl=strategy._kline_tail_ttl(HTF_INTERVAL)
+        )
+        if strategy.get_cached_order_book(symbol) is None:
+            weight += _depth_request_weight(strategy.orderbook_limit)
+        return weight
+
+    def charge(self, weight: int) -> None:
+        self._budget_left = max(0, self._budget_left - max(0, int(weight)))
+        self.stats["weight"] += max(0, int(weight))
+
+    def schedule(self, symbols: Iterable[str]) -> int:
+        """Queue prefetches for the first ``lookahead`` symbols not yet in flight."""
+
+        if self._executor is None or self._exhausted:
+            return 0
+        submitted = 0
+        for sym in itertools.islice(symbols, self.lookahead):
+            token = str(sym or "").strip().upper()
+            if not token or token in self._futures:
+                continue
+            try:
+                cost = self.estimate_weight(token)
+            except Exception as exc:
+                log.debug(f"prefetch estimate failed for {token}: {exc}")
+                continue
+            if cost > self._budget_left:
+                # Keep queue order: never let a cheaper symbol jump ahead of this one.
+                self._exhausted = True
+                self.stats["deferred"] += 1
+                break
+            self.charge(cost)
+            self._futures[token] = self._executor.submit(self._fetch, token)
+            self.stats["submitted"] += 1
+            submitted += 1
+        return submitted
+
+    def wait(self, symbol: str, timeout: Optional[float] = None) -> None:
+        future = self._futures.pop(str(symbol or "").strip().upper(), None)
+        if future is None:
+            return
+        self.stats["waited"] += 1
+        try:
+            future.result(timeout=HTTP_TIMEOUT if timeout is None else timeout)
+        except Exception as exc:
+            log.debug(f"prefetch wait failed for {symbol}: {exc}")
+
+    def prefetch_order_books(self, symbols: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Parallel variant of :meth:`Strategy.prefetch_order_books`."""
+
+        strategy = self.strategy
+        # Streamed or still-fresh books cost no request weight and need no worker.
+        pending = [sym for sym in symbols if strategy.get_cached_order_book(sym) is None]
+        if self._executor is None or len(pending) <= 1:
+            return strategy.prefetch_order_books(symbols)
+        self.charge(_depth_request_weight(strategy.orderbook_limit) * len(pending))
+        futures = [self._executor.submit(strategy.prefetch_order_books, [sym]) for sym in pending]
+        fetched = strategy.prefetch_order_books([sym for sym in symbols if sym not in pending])
+        for future in futures:
+            try:
+                fetched.update(future.result(timeout=HTTP_TIMEOUT))
+            except Exception as exc:
+                log.debug(f"orderbook prefetch failed: {exc}")
+        return fetched
+
+    def _fetch(self, symbol: str) -> None:
+        strategy = self.strategy
+        kl_limit, htf_limit = strategy.kline_limits(symbol)
+        for interval, limit in ((INTERVAL, kl_limit), (HTF_INTERVAL, htf_limit)):
+            try:
+                strategy._klines_cached(symbol, interval, limit)
+            except Exception as exc:
+                log.debug(f"kline prefetch failed for {symbol} {interval}: {exc}")
+        if strategy.get_cached_order_book(symbol) is None:
+            # Already charged to the prefetch budget; the on-demand budget stays for inline lookups.
+            strategy.prefetch_order_books([symbol])
+
+
+# ========= Correlation =========
+class ReturnCorrelationCache:
+    """Per-cycle correlation of close-to-close returns between symbols.
+
+    Returns come from the cached base-interval closes. :meth:`prepare` loads
+    the returns of new symbols once, scales the full-length ones to unit
+    vectors and fills their correlations against every loaded symbol with a
+    single matrix product, so the guards look pairs up in O(1). Symbols with a
+    shorter history are paired on their common tail on demand.
+    :meth:`begin_cycle` drops everything so each cycle works on fresh bars.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], *, lookback: int = 60) -> None:
+        self.loader = loader
+        self.lookback = max(4, int(lookback))
+        self._returns: Dict[str, Optional[np.ndarray]] = {}
+        self._symbols: List[str] = []
+        self._units: Optional[np.ndarray] = None
+        self._pairs: Dict[Tuple[str, str], Optional[float]] = {}
+        self.stats: Dict[str, int] = {"symbols": 0, "products": 0, "pairwise": 0}
+
+    def begin_cycle(self) -> None:
+        self._returns.clear()
+        self._symbols = []
+        self._units = None
+        self._pairs.clear()
+        self.stats = {"symbols": 0, "products": 0, "pairwise": 0}
+
+    def _load(self, symbol: str) -> Optional[np.ndarray]:
+        try:
+            frame = self.loader(symbol)
+        except Exception as exc:
+            log.debug(f"correlation closes unavailable for {symbol}: {exc}")
+            return None
+        if frame is None or len(frame) < 3:
+            return None
+        closes = indicators.KlineFrame.from_rows(frame).close[-(self.lookback + 1) :]
+        base = closes[:-1]
+        return (np.diff(closes) / np.maximum(np.abs(base), 1e-9))[base > 0]
+
+    @staticmethod
+    def _unit(values: np.ndarray) -> Optional[np.ndarray]:
+        centered = values - values.mean()
+        var = float(centered @ centered)
+        if var <= 1e-12:
+            return None
+        return centered / math.sqrt(var)
+
+    def prepare(self, symbols: Iterable[str]) -> None:
+        """Load ``symbols`` not seen this cycle and correlate them with all loaded ones."""
+
+        fresh: List[str] = []
+        units: List[np.ndarray] = []
+        for symbol in dict.fromkeys(symbols):
+            if not symbol or symbol in self._returns:
+                continue
+            returns = self._load(symbol)
+            self._returns[symbol] = returns
+            self.stats["symbols"] += 1
+            if returns is None or len(returns) != self.lookback:
+                continue
+            unit = self._unit(returns)
+            if unit is None:
+                continue
+            fresh.append(symbol)
+            units.append(unit)
+        if not fresh:
+            return
+        block = np.vstack(units)
+        self._units = block if self._units is None else np.vstack([self._units, block])
+        self._symbols.extend(fresh)
+        corr = np.clip(block @ self._units.T, -1.0, 1.0)
+        self.stats["products"] += 1
+        for row, symbol in enumerate(fresh):
+            for col, other in enumerate(self._symbols):
+                value = float(corr[row, col])
+                value = value if math.isfinite(value) else None
+                self._pairs[(symbol, other)] = value
+                self._pairs[(other, symbol)] = value
+
+    def _pairwise(self, symbol: str, other: str) -> Optional[float]:
+        returns_a = self._returns.get(symbol)
+        returns_b = self._returns.get(other)
+        if returns_a is None or returns_b is None:
+            return None
+        m = min(len(returns_a), len(returns_b))
+        if m <= 3:
+            return None
+        unit_a = self._unit(returns_a[-m:])
+        unit_b = self._unit(returns_b[-m:])
+        if unit_a is None or unit_b is None:
+            return None
+        corr = float(unit_a @ unit_b)
+        if not math.isfinite(corr):
+            return None
+        return max(-1.0, min(1.0, corr))
+
+    def get(self, symbol: str, other: str) -> Optional[float]:
+        if not symbol or not other or symbol == other:
+            return None
+        key = (symbol, other)
+        if key not in self._pairs:
+            self.prepare((symbol, other))
+        if key not in self._pairs:
+            # Kurze Historie oder flache Serie: Paar direkt auf dem gemeinsamen Tail rechnen
+            value = self._pairwise(symbol, other)
+            self.stats["pairwise"] += 1
+            self._pairs[key] = value
+            self._pairs[(other, symbol)] = value
+        return self._pairs[key]
+
+
 # ========= Bot =========
+def _build_policy(pol_state: Optional[Dict[str, Any]]) -> BanditPolicy:
+    alpha_kwargs = dict(
+        alpha_enabled=ALPHA_ENABLED,
+        alpha_threshold=ALPHA_THRESHOLD,
+        alpha_warmup=ALPHA_WARMUP,
+        alpha_lr=ALPHA_LR,
+        alpha_l2=ALPHA_L2,
+        alpha_min_conf=ALPHA_MIN_CONF,
+        alpha_promote_delta=ALPHA_PROMOTE_DELTA,
+        alpha_reward_margin=ALPHA_REWARD_MARGIN,
+    )
+    if pol_state:
+        policy = BanditPolicy.from_state(pol_state, _policy_file(), **alpha_kwargs)
+        if policy.sidecar_missing:
+            log.warning(
+                "ML policy sidecar %s is missing or corrupt; starting untrained and re-learning from trade history.",
+                _policy_file(),
+            )
+        return policy
+    return BanditPolicy(**alpha_kwargs)
+
+
+def _policy_needs_warm_start(policy: BanditPolicy, pol_state: Optional[Dict[str, Any]]) -> bool:
+    """Kein gespeicherter Stand, Sidecar verloren oder Feature-Liste geändert."""
+
+    return (
+        not pol_state
+        or policy.sidecar_missing
+        or tuple(policy.feature_names) != tuple(POLICY_FEATURES)
+    )
+
+
+def warm_start_policy(policy: BanditPolicy, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Trainiert ``policy`` aus den gespeicherten Trades in ``state["trade_history"]`` neu."""
+
+    history = state.get("trade_history") if isinstance(state, dict) else None
+    ctxs, rewards, buckets = training_samples(history if isinstance(history, list) else [])
+    if not ctxs:
+        return None
+    summary = policy.warm_start(ctxs, rewards, buckets)
+    log.info(
+        "ML policy warm start: %d trades (%d sized, %d alpha) in %.1f ms.",
+        summary["samples"],
+        summary["size_samples"],
+        summary["alpha_samples"],
+        summary["seconds"] * 1000.0,
+    )
+    if summary["dropped"]:
+        log.info(
+            "ML policy warm start: dropped %d trades with NaN/inf in %s.",
+            summary["dropped"],
+            ", ".join(summary["non_finite"]) or "pnl_r",
+        )
+    if summary["missing"]:
+        log.debug("ML policy warm start: features defaulted to 0 in some trades: %s", ", ".join(summary["missing"]))
+    return summary
+
+
+def retrain_policy(state_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Offline: Policy aus dem State-File neu trainieren und (inkl. Sidecar) zurückschreiben."""
+
+    path = Path(state_path or STATE_FILE)
+    with open(path, "r") as fh:
+        state = json.load(fh)
+    policy = _build_policy(state.get("policy"))
+    summary = warm_start_policy(policy, state)
+    if summary is None:
+        log.info("ML policy warm start: no stored trades with context in %s.", path)
+        return None
+    state["policy"] = policy.to_state(_policy_file())
+    with open(path, "w") as fh:
+        json.dump(state, fh, indent=2)
+    return summary
+
+
 class Bot:
     HYPE_HISTORY_KEY = "hype_correlation"
     HYPE_HISTORY_LIMIT = 24
@@ -12489,7 +14635,28 @@ class Bot:
             log.warning(
                 "AI mode is enabled, but ASTER_OPENAI_API_KEY is missing—AI features remain disabled."
             )
-        self.exchange = Exchange(BASE, API_KEY, API_SECRET, RECV_WINDOW)
+        self.replay: Optional[ReplayExchange] = None
+        if REPLAY_FILE:
+            import brackets_guard
+
+            self.replay = ReplayExchange(REPLAY_FILE, recv_window=RECV_WINDOW)
+            self.replay.install_clock(sys.modules[__name__], brackets_guard)
+            log.info(f"Replay mode: {self.replay.records} captured responses from {REPLAY_FILE}")
+            self.exchange: Exchange = self.replay
+        else:
+            self.exchange = Exchange(BASE, API_KEY, API_SECRET, RECV_WINDOW)
+        capture = http_client.capture_log()
+        # Capture und Replay laufen nur über REST, ohne externe AI-/News-Antworten
+        self.rest_only = self.replay is not None or capture is not None
+        # Zufall (Policy-Exploration, Sampling) in Capture und Replay gleich säen
+        self.rng_seed: Optional[int] = None
+        if self.replay is not None:
+            self.rng_seed = self.replay.seed
+        elif capture is not None:
+            self.rng_seed = int(time.time())
+            capture.write_header(seed=self.rng_seed)
+        if self.rng_seed is not None:
+            random.seed(self.rng_seed)
         self._position_monitor_stop = threading.Event()
         self._position_monitor_thread: Optional[threading.Thread] = None
         self.universe = SymbolUniverse(self.exchange, QUOTE, UNIVERSE_MAX, EXCLUDE, UNIVERSE_ROTATE, include=INCLUDE)
@@ -12583,35 +14750,29 @@ class Bot:
         if BANDIT_ENABLED:
             pol_state = self.state.get("policy") if isinstance(self.state, dict) else None
             try:
-                if pol_state:
-                    self.policy = BanditPolicy.from_dict(
-                        pol_state,
-                        alpha_enabled=ALPHA_ENABLED,
-                        alpha_threshold=ALPHA_THRESHOLD,
-                        alpha_warmup=ALPHA_WARMUP,
-                        alpha_lr=ALPHA_LR,
-                        alpha_l2=ALPHA_L2,
-                        alpha_min_conf=ALPHA_MIN_CONF,
-                        alpha_promote_delta=ALPHA_PROMOTE_DELTA,
-                        alpha_reward_margin=ALPHA_REWARD_MARGIN,
-                    )
-                else:
-                    self.policy = BanditPolicy(
-                        alpha_enabled=ALPHA_ENABLED,
-                        alpha_threshold=ALPHA_THRESHOLD,
-                        alpha_warmup=ALPHA_WARMUP,
-                        alpha_lr=ALPHA_LR,
-                        alpha_l2=ALPHA_L2,
-                        alpha_min_conf=ALPHA_MIN_CONF,
-                        alpha_promote_delta=ALPHA_PROMOTE_DELTA,
-                        alpha_reward_margin=ALPHA_REWARD_MARGIN,
-                    )
+                self.policy = _build_policy(pol_state)
             except Exception as e:
                 log.debug(f"ML policy init failed: {e}")
                 self.policy = None
+            if self.policy and POLICY_WARM_START:
+                if _policy_needs_warm_start(self.policy, pol_state):
+                    try:
+                        warm_start_policy(self.policy, self.state)
+                    except Exception as e:
+                        log.debug(f"ML policy warm start failed: {e}")
         if self.policy:
             self._apply_policy_tunables()
+        guard_exchange: Any = None
+        if self.replay:
+            guard_exchange = self.replay.guard_exchange()
+        elif http_client.capture_log() is not None:
+            from brackets_guard import _LiteExchange
+
+            # Capture: Guard teilt das REST-geladene exchangeInfo statt des Disk-Caches
+            guard_exchange = _LiteExchange(BASE, API_KEY, API_SECRET, recv_window=RECV_WINDOW)
+            guard_exchange.metadata = self.exchange.metadata
         self.guard = BracketGuard(
+            exchange=guard_exchange,
             base_url=BASE,
             api_key=API_KEY,
             api_secret=API_SECRET,
@@ -12619,14 +14780,34 @@ class Bot:
             recv_window=RECV_WINDOW,
         )
         self.trade_mgr = TradeManager(self.exchange, self.policy, self.state, risk=self.risk)
+        # Stream-Daten landen nicht in der Capture
+        rest_only = self.rest_only
+        if rest_only and not self.replay:
+            log.info("Capture mode: websocket streams, AI calls and news disabled so the run can be replayed.")
+        self.market_stream: Optional[MarketDataStream] = None
+        if MARKET_STREAM_ENABLED and not rest_only:
+            try:
+                self.market_stream = MarketDataStream(self.exchange)
+                self.exchange.market_stream = self.market_stream
+                self.market_stream.start()
+            except Exception as exc:
+                log.debug(f"market stream initialization failed: {exc}")
+        self.depth_books: Optional[DepthBookStream] = None
+        if DEPTH_STREAM_ENABLED and not rest_only:
+            try:
+                self.depth_books = DepthBookStream(self.exchange)
+                self.depth_books.start()
+            except Exception as exc:
+                log.debug(f"depth stream initialization failed: {exc}")
         self.user_stream: Optional[UserDataStream] = None
-        if USER_STREAM_ENABLED:
+        if USER_STREAM_ENABLED and not rest_only:
             try:
                 self.user_stream = UserDataStream(
                     self.exchange,
                     on_execution=self._handle_stream_execution,
                     on_account=self._handle_stream_account,
                 )
+                self.exchange.user_stream = self.user_stream
                 self.user_stream.start()
             except Exception as exc:
                 log.debug(f"user stream initialization failed: {exc}")
@@ -12643,6 +14824,10 @@ class Bot:
             decision_tracker=self.decision_tracker,
             state=self.state,
         )
+        if self.market_stream:
+            self.market_stream.on_kline = self._strategy._kl_cache.apply_stream_kline
+        self._strategy.depth_books = self.depth_books
+        self.prefetcher = SymbolPrefetcher(self._strategy)
         self.state.setdefault("symbol_leverage", {})
         self.budget_tracker = DailyBudgetTracker(self.state, AI_DAILY_BUDGET, AI_STRICT_BUDGET)
         try:
@@ -12657,6 +14842,7 @@ class Bot:
             )
         sentinel_active = SENTINEL_ENABLED or AI_MODE_ENABLED
         self.sentinel = NewsTrendSentinel(self.exchange, self.state, enabled=sentinel_active)
+        self.sentinel.news_enabled = not self.rest_only
         self.ai_advisor: Optional[AITradeAdvisor] = None
         if AI_MODE_ENABLED:
             self.ai_advisor = AITradeAdvisor(
@@ -12664,7 +14850,8 @@ class Bot:
                 AI_MODEL,
                 self.budget_tracker,
                 self.state,
-                enabled=AI_MODE_ENABLED,
+                # OpenAI-Antworten sind nicht reproduzierbar -> in Capture/Replay aus
+                enabled=AI_MODE_ENABLED and not self.rest_only,
                 wakeup_cb=self._on_ai_future_ready,
                 activity_logger=self._emit_ai_budget_alert,
                 leverage_lookup=self._symbol_leverage_cap,
@@ -12717,7 +14904,7 @@ class Bot:
 
         if self.policy and BANDIT_ENABLED:
             try:
-                self.state["policy"] = self.policy.to_dict()
+                self.state["policy"] = self.policy.to_state(_policy_file())
             except Exception as exc:
                 log.debug(f"policy serialize fail: {exc}")
 
@@ -13491,55 +15678,24 @@ class Bot:
             return None
         return max(-1.0, min(1.0, corr))
 
-    def _rolling_return_correlation(
-        self, symbol: str, other: str, lookback: int = 60
-    ) -> Optional[float]:
-        if not symbol or not other or symbol == other:
-            return None
+    def _return_correlations(self) -> ReturnCorrelationCache:
+        cache = getattr(self, "return_correlations", None)
+        if cache is None:
+            cache = ReturnCorrelationCache(self._correlation_klines)
+            self.return_correlations = cache
+        return cache
+
+    def _correlation_klines(self, symbol: str) -> Optional[indicators.KlineFrame]:
         strategy = getattr(self, "strategy", None)
         if not strategy:
             return None
-        try:
-            kl_a = strategy._klines_cached(symbol, INTERVAL, max(lookback + 5, 60))
-            kl_b = strategy._klines_cached(other, INTERVAL, max(lookback + 5, 60))
-        except Exception:
-            return None
-        if not kl_a or not kl_b:
-            return None
-        closes_a = [float(bar[4]) for bar in kl_a[-(lookback + 1) :]]
-        closes_b = [float(bar[4]) for bar in kl_b[-(lookback + 1) :]]
-        n = min(len(closes_a), len(closes_b))
-        if n <= 2:
-            return None
-        returns_a = [
-            (closes_a[i + 1] - closes_a[i]) / max(abs(closes_a[i]), 1e-9)
-            for i in range(n - 1)
-            if closes_a[i] > 0
-        ]
-        returns_b = [
-            (closes_b[i + 1] - closes_b[i]) / max(abs(closes_b[i]), 1e-9)
-            for i in range(n - 1)
-            if closes_b[i] > 0
-        ]
-        m = min(len(returns_a), len(returns_b))
-        if m <= 3:
-            return None
-        tail_a = returns_a[-m:]
-        tail_b = returns_b[-m:]
-        mean_a = sum(tail_a) / m
-        mean_b = sum(tail_b) / m
-        var_a = sum((x - mean_a) ** 2 for x in tail_a)
-        var_b = sum((y - mean_b) ** 2 for y in tail_b)
-        if var_a <= 1e-12 or var_b <= 1e-12:
-            return None
-        cov = sum((x - mean_a) * (y - mean_b) for x, y in zip(tail_a, tail_b))
-        denom = math.sqrt(var_a * var_b)
-        if denom <= 0:
-            return None
-        corr = cov / denom
-        if not math.isfinite(corr):
+        lookback = self._return_correlations().lookback
+        return strategy._klines_cached(symbol, INTERVAL, max(lookback + 5, 60))
+
+    def _rolling_return_correlation(self, symbol: str, other: str) -> Optional[float]:
+        if not symbol or not other or symbol == other:
             return None
-        return max(-1.0, min(1.0, corr))
+        return self._return_correlations().get(symbol, other)
 
     @staticmethod
     def _resolve_breadth_score(ctx: Dict[str, Any]) -> Optional[float]:
@@ -13645,6 +15801,7 @@ class Bot:
             )
             return guard
         corr_hits: List[Tuple[str, float]] = []
+        self._return_correlations().prepare([symbol] + [item["symbol"] for item in active])
         for item in active:
             corr = self._rolling_return_correlation(symbol, item["symbol"])  # type: ignore[arg-type]
             if corr is None or corr < SHORT_CLUSTER_CORR_THRESHOLD:
@@ -14004,6 +16161,12 @@ class Bot:
         else:
             snapshot["ai_pending_count"] = 0
             snapshot["ai_pending_requests"] = []
+        kline_cache = self.state.get("kline_cache")
+        if isinstance(kline_cache, dict):
+            snapshot["kline_cache"] = {
+                key: kline_cache.get(key)
+                for key in ("series", "bytes", "max_bytes", "hit_rate", "evictions", "expired", "per_interval")
+            }
         try:
             payload = json.dumps(snapshot, indent=2, sort_keys=True, default=lambda o: str(o))
         except Exception:
@@ -17021,9 +19184,14 @@ class Bot:
         syms = self.universe.refresh()
         ticker_map: Dict[str, Dict[str, Any]] = {}
         now = time.time()
+        market_stream = getattr(self, "market_stream", None)
+        if market_stream is not None and KLINE_STREAM_SYMBOLS:
+            # Laufende Kerzen der ausgewerteten Symbole per Stream statt per REST-Tail nachführen
+            market_stream.watch_klines(syms[:KLINE_STREAM_SYMBOLS], (INTERVAL, HTF_INTERVAL))
         need_bulk_ticker = (
             self.sentinel is not None
             or (now - getattr(self.strategy, "_t24_ts", 0.0)) >= self.strategy._t24_ttl
+            or (market_stream is not None and market_stream.is_live("ticker"))
         )
         if need_bulk_ticker and syms:
             try:
@@ -17137,6 +19305,9 @@ class Bot:
         bulk_book_available = bool(book_ticker_map)
 
         self.strategy.reset_orderbook_budget(ORDERBOOK_ON_DEMAND)
+        prefetcher: Optional[SymbolPrefetcher] = getattr(self, "prefetcher", None)
+        if prefetcher is not None:
+            prefetcher.begin_cycle()
 
         priority_tokens = [
             str(sym or "").strip().upper()
@@ -17150,7 +19321,10 @@ class Bot:
             manual_symbols=manual_for_prefetch,
             priority_symbols=priority_tokens,
         )
-        prefetched_order_books = self.strategy.prefetch_order_books(orderbook_plan)
+        if prefetcher is not None:
+            prefetched_order_books = prefetcher.prefetch_order_books(orderbook_plan)
+        else:
+            prefetched_order_books = self.strategy.prefetch_order_books(orderbook_plan)
         plan_signature = tuple(orderbook_plan[:8])
         if plan_signature and plan_signature != self._orderbook_activity_signature:
             self._orderbook_activity_signature = plan_signature
@@ -17173,6 +19347,26 @@ class Bot:
         elif not plan_signature:
             self._orderbook_activity_signature = tuple()
 
+        try:
+            # Prefetched plus already cached/streamed books of the queue go through one batch.
+            feature_books: Dict[str, Dict[str, Any]] = {}
+            for token in syms_queue:
+                cached_book = self.strategy.get_cached_order_book(token)
+                if cached_book:
+                    feature_books[str(token).upper()] = cached_book
+            feature_books.update(prefetched_order_books)
+            self.strategy.prime_order_book_features(feature_books)
+        except Exception as exc:
+            log.debug(f"order book feature batch failed: {exc}")
+
+        self._return_correlations().begin_cycle()
+        try:
+            self.strategy.prime_indicator_batch(
+                token for token in syms_queue if abs(pos_map.get(token, 0.0)) <= 1e-12
+            )
+        except Exception as exc:
+            log.debug(f"indicator batch failed: {exc}")
+
         last_ai_drain = time.time()
         ai_flush_interval = 2.5
 
@@ -17203,6 +19397,12 @@ class Bot:
                             if token in syms_queue and token not in processed_symbols:
                                 continue
                             syms_queue.appendleft(token)
+            if prefetcher is not None and prefetcher.enabled:
+                prefetcher.schedule(
+                    token
+                    for token in itertools.chain((sym,), syms_queue)
+                    if abs(pos_map.get(token, 0.0)) <= 1e-12
+                )
             # Preis tracken für FastTP
             mid = 0.0
             bt = book_ticker_map.get(sym)
@@ -17233,6 +19433,8 @@ class Bot:
                     self._manage_open_position(sym, amt, mid, atr_abs)
                 continue
 
+            if prefetcher is not None:
+                prefetcher.wait(sym)
             try:
                 order_book_snapshot = (
                     prefetched_order_books.get(sym)
@@ -17258,6 +19460,21 @@ class Bot:
             if not bulk_book_available:
                 time.sleep(0.02)
 
+        if prefetcher is not None:
+            prefetcher.finish_cycle()
+            if prefetcher.enabled:
+                log.debug(f"prefetch stats: {prefetcher.stats}")
+        depth_books = getattr(self, "depth_books", None)
+        if depth_books is not None:
+            log.debug(f"depth stream stats: {depth_books.stats()}")
+        if self.strategy.indicator_batch_stats.get("primed"):
+            log.debug(f"indicator batch stats: {self.strategy.indicator_batch_stats}")
+        if isinstance(self.state, dict):
+            try:
+                self.state["kline_cache"] = self.strategy._kl_cache.metrics()
+            except Exception as exc:
+                log.debug(f"kline cache metrics failed: {exc}")
+
         if getattr(self.strategy, "tech_snapshot_dirty", False):
             try:
                 self.trade_mgr.save()
@@ -17319,9 +19536,26 @@ class Bot:
                     self.user_stream.stop()
                 except Exception as exc:
                     log.debug(f"user stream shutdown failed: {exc}")
+            if self.market_stream:
+                try:
+                    self.market_stream.stop()
+                except Exception as exc:
+                    log.debug(f"market stream shutdown failed: {exc}")
+            depth_books = getattr(self, "depth_books", None)
+            if depth_books is not None:
+                try:
+                    depth_books.stop()
+                except Exception as exc:
+                    log.debug(f"depth stream shutdown failed: {exc}")
+            prefetcher = getattr(self, "prefetcher", None)
+            if prefetcher is not None:
+                prefetcher.shutdown()
             log.info("Bot stopped. Safe to exit.")
 
 # ========= main =========
 if __name__ == "__main__":
+    if os.getenv("ASTER_POLICY_RETRAIN", "").lower() in ("1", "true", "yes", "on"):
+        retrain_policy()
+        sys.exit(0)
     run_once = os.getenv("ASTER_RUN_ONCE", "").lower() in ("1", "true", "yes", "on")
     Bot().run(loop=not run_once)
@@ -6,13 +6,16 @@
 # - nutzt working_type (MARK_PRICE/CONTRACT_PRICE), recv_window & sauberes Runden
 
 from __future__ import annotations
-import os, time, math, json, logging, hmac, hashlib
+import os, time, math, json, logging
 from typing import Dict, Optional, Tuple, List
 from pathlib import Path
 from urllib.parse import urlencode
 
 import requests
 
+import http_client
+from exchange_metadata import shared_metadata
+
 _ROOT_DIR = Path(__file__).resolve().parent
 
 def _resolve_path(env_key: str, default_name: str) -> str:
@@ -41,23 +44,26 @@ class _LiteExchange:
         params = dict(params)
         params["timestamp"] = str(int(time.time() * 1000))
         params["recvWindow"] = str(self.recv_window)
-        qs = urlencode(params)
-        sig = hmac.new(self.s.encode(), qs.encode(), hashlib.sha256).hexdigest()
-        params["signature"] = sig
+        params["signature"] = http_client.hmac_signature(self.s, urlencode(params))
         return params
 
     def _headers(self) -> Dict[str, str]:
         return {"X-MBX-APIKEY": self.k} if self.k else {}
 
     def _req(self, method: str, path: str, params: Dict[str, str], signed: bool) -> dict:
+        # Gepoolte Keep-Alive-Session: SL/TP direkt nach dem Entry ohne neuen TLS-Handshake
         url = f"{self.base}{path}"
         if signed:
             params = self._sign(params)
-            r = requests.request(method, url, params=params, headers=self._headers(), timeout=self.timeout)
+            r = http_client.request(method, url, params=params, headers=self._headers(), timeout=self.timeout)
         else:
-            r = requests.request(method, url, params=params, timeout=self.timeout)
+            r = http_client.request(method, url, params=params, timeout=self.timeout)
         r.raise_for_status()
-        return r.json()
+        data = r.json()
+        capture = http_client.capture_log()
+        if capture is not None:
+            capture.record("guard", method, path, params, data)
+        return data
 
     # Unsigned
     def get_book_ticker(self, symbol: str) -> dict:
@@ -121,15 +127,21 @@ class BracketGuard:
             sec = api_secret or os.getenv("ASTER_API_SECRET", "")
             self.ex = _LiteExchange(base, key, sec, recv_window=self.recv_window, timeout_sec=self.timeout_sec)
 
-        # Meta aus exchangeInfo (tickSize)
+        # Meta aus exchangeInfo (tickSize) – geteilter Cache, wenn verfügbar
         self._tick_cache: Dict[str, float] = {}
         try:
-            info = self.ex.get_exchange_info()
-            for s in info.get("symbols", []):
-                sym = s.get("symbol")
-                fdict = {f.get("filterType"): f for f in s.get("filters", [])}
-                tick = float(fdict.get("PRICE_FILTER", {}).get("tickSize", "0.0001") or 0.0001)
-                self._tick_cache[sym] = tick
+            metadata = getattr(self.ex, "metadata", None)
+            if metadata is None and isinstance(self.ex, _LiteExchange):
+                metadata = shared_metadata(self.ex.base, self.ex.get_exchange_info)
+            if metadata is not None:
+                self._tick_cache = dict(metadata.tick_sizes())
+            else:
+                info = self.ex.get_exchange_info()
+                for s in info.get("symbols", []):
+                    sym = s.get("symbol")
+                    fdict = {f.get("filterType"): f for f in s.get("filters", [])}
+                    tick = float(fdict.get("PRICE_FILTER", {}).get("tickSize", "0.0001") or 0.0001)
+                    self._tick_cache[sym] = tick
         except Exception:
             pass
 
@@ -5,7 +5,6 @@ import asyncio
 import ast
 import copy
 import hashlib
-import hmac
 import json
 import logging
 import math
@@ -22,11 +21,12 @@ from collections import OrderedDict, deque
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
-from urllib.parse import urlencode
 
 import requests
 
+import http_client
 from brackets_guard import BracketGuard
+from exchange_metadata import shared_metadata
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
@@ -1470,14 +1470,11 @@ def _fetch_open_orders_snapshot_with_context(
         return {}
 
     params = {"timestamp": int(time.time() * 1000), "recvWindow": recv_window}
-    ordered = [(k, params[k]) for k in sorted(params)]
-    qs = urlencode(ordered, doseq=True)
-    signature = hmac.new(api_secret.encode(), qs.encode(), hashlib.sha256).hexdigest()
-    url = f"{base}/fapi/v1/openOrders?{qs}&signature={signature}"
-    headers = {"X-MBX-APIKEY": api_key, "Content-Type": "application/x-www-form-urlencoded"}
+    url = f"{base}/fapi/v1/openOrders?{http_client.signed_query(params, api_secret)}"
+    headers = http_client.api_headers(api_key)
 
     try:
-        resp = requests.get(url, headers=headers, timeout=8)
+        resp = http_client.get(url, headers=headers, timeout=8)
         resp.raise_for_status()
         payload = resp.json()
     except Exception as exc:
@@ -1524,14 +1521,11 @@ def _fetch_position_risk_snapshot_with_context(
         return {}
 
     params = {"timestamp": int(time.time() * 1000), "recvWindow": recv_window}
-    ordered = [(k, params[k]) for k in sorted(params)]
-    qs = urlencode(ordered, doseq=True)
-    signature = hmac.new(api_secret.encode(), qs.encode(), hashlib.sha256).hexdigest()
-    url = f"{base}/fapi/v2/positionRisk?{qs}&signature={signature}"
-    headers = {"X-MBX-APIKEY": api_key, "Content-Type": "application/x-www-form-urlencoded"}
+    url = f"{base}/fapi/v2/positionRisk?{http_client.signed_query(params, api_secret)}"
+    headers = http_client.api_headers(api_key)
 
     try:
-        resp = requests.get(url, headers=headers, timeout=8)
+        resp = http_client.get(url, headers=headers, timeout=8)
         resp.raise_for_status()
         payload = resp.json()
     except Exception as exc:
@@ -1742,7 +1736,7 @@ def _fetch_position_brackets(
     if _is_truthy(env.get("ASTER_PAPER")):
         return {}
 
-    headers = {"X-MBX-APIKEY": api_key, "Content-Type": "application/x-www-form-urlencoded"}
+    headers = http_client.api_headers(api_key)
     results: Dict[str, Dict[str, Dict[str, float]]] = {}
     seen: Set[str] = set()
 
@@ -1759,13 +1753,10 @@ def _fetch_position_brackets(
             "timestamp": int(time.time() * 1000),
             "recvWindow": recv_window,
         }
-        ordered = [(k, params[k]) for k in sorted(params)]
-        qs = urlencode(ordered, doseq=True)
-        signature = hmac.new(api_secret.encode(), qs.encode(), hashlib.sha256).hexdigest()
-        url = f"{base}/fapi/v1/openOrders?{qs}&signature={signature}"
+        url = f"{base}/fapi/v1/openOrders?{http_client.signed_query(params, api_secret)}"
 
         try:
-            resp = requests.get(url, headers=headers, timeout=8)
+            resp = http_client.get(url, headers=headers, timeout=8)
             resp.raise_for_status()
             payload = resp.json()
         except Exception as exc:
@@ -2160,14 +2151,11 @@ def _fetch_realized_pnl_entries(env: Dict[str, Any], limit: int = 400) -> List[D
         "incomeType": "REALIZED_PNL",
         "limit": limit_val,
     }
-    ordered = [(k, params[k]) for k in sorted(params)]
-    qs = urlencode(ordered, doseq=True)
-    signature = hmac.new(api_secret.encode(), qs.encode(), hashlib.sha256).hexdigest()
-    url = f"{base}/fapi/v1/income?{qs}&signature={signature}"
-    headers = {"X-MBX-APIKEY": api_key, "Content-Type": "application/x-www-form-urlencoded"}
+    url = f"{base}/fapi/v1/income?{http_client.signed_query(params, api_secret)}"
+    headers = http_client.api_headers(api_key)
 
     try:
-        resp = requests.get(url, headers=headers, timeout=8)
+        resp = http_client.get(url, headers=headers, timeout=8)
         resp.raise_for_status()
         payload = resp.json()
     except Exception as exc:
@@ -2422,14 +2410,11 @@ def _fetch_user_trades_for_symbol(
         else:
             params["endTime"] = int(max(0.0, end_time) * 1000)
 
-    ordered = [(k, params[k]) for k in sorted(params)]
-    qs = urlencode(ordered, doseq=True)
-    signature = hmac.new(api_secret.encode(), qs.encode(), hashlib.sha256).hexdigest()
-    url = f"{base}/fapi/v1/userTrades?{qs}&signature={signature}"
-    headers = {"X-MBX-APIKEY": api_key, "Content-Type": "application/x-www-form-urlencoded"}
+    url = f"{base}/fapi/v1/userTrades?{http_client.signed_query(params, api_secret)}"
+    headers = http_client.api_headers(api_key)
 
     try:
-        resp = requests.get(url, headers=headers, timeout=8)
+        resp = http_client.get(url, headers=headers, timeout=8)
         resp.raise_for_status()
         payload = resp.json()
     except Exception as exc:
@@ -4822,6 +4807,24 @@ def _decision_summary(state: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _kline_cache_summary(state: Dict[str, Any]) -> Dict[str, Any]:
+    metrics = state.get("kline_cache")
+    if not isinstance(metrics, dict):
+        return {}
+    summary: Dict[str, Any] = {
+        key: int(metrics.get(key, 0) or 0)
+        for key in ("series", "bytes", "max_bytes", "hits", "misses", "evictions", "expired")
+    }
+    summary["hit_rate"] = _safe_float(metrics.get("hit_rate"))
+    per_interval = metrics.get("per_interval") or {}
+    summary["per_interval"] = {
+        str(interval): {key: int((bucket or {}).get(key, 0) or 0) for key in ("series", "bars", "bytes")}
+        for interval, bucket in per_interval.items()
+        if isinstance(bucket, dict)
+    }
+    return summary
+
+
 def _friendly_decision_reason(reason: Optional[str]) -> Optional[str]:
     if reason is None:
         return None
@@ -6168,50 +6171,25 @@ class AIChatEngine:
         if not base:
             return None
 
-        try:
-            resp = requests.get(
-                f"{base}/fapi/v1/exchangeInfo",
-                params={"symbol": normalized},
-                timeout=8,
-            )
+        def _fetch_exchange_info() -> Any:
+            resp = http_client.get(f"{base}/fapi/v1/exchangeInfo", timeout=8)
             resp.raise_for_status()
-            payload = resp.json()
+            return resp.json()
+
+        # One shared (and on-disk) exchangeInfo copy instead of a download per symbol.
+        try:
+            data = shared_metadata(base, _fetch_exchange_info).symbol_filters(normalized)
         except Exception as exc:
             logger.debug("Failed to fetch symbol filters for %s: %s", normalized, exc)
             return None
-
-        data: Optional[Dict[str, Any]] = None
-        if isinstance(payload, dict):
-            symbols_payload = payload.get("symbols")
-            if isinstance(symbols_payload, list) and symbols_payload:
-                data = next((entry for entry in symbols_payload if entry.get("symbol") == normalized), None)
-            elif payload.get("symbol") == normalized:
-                data = payload
         if not isinstance(data, dict):
             return None
 
-        filters = data.get("filters", [])
-        tick = None
-        step = None
-        min_qty = None
-        min_notional = None
-        for filt in filters:
-            if not isinstance(filt, dict):
-                continue
-            filter_type = str(filt.get("filterType") or "").upper()
-            if filter_type == "PRICE_FILTER":
-                tick = self._safe_float(filt.get("tickSize"))
-            elif filter_type == "LOT_SIZE":
-                step = self._safe_float(filt.get("stepSize"))
-                min_qty = self._safe_float(filt.get("minQty"))
-            elif filter_type in {"MIN_NOTIONAL", "MIN_NOTIONAL_FILTER"}:
-                min_notional = self._safe_float(filt.get("notional")) or self._safe_float(filt.get("minNotional"))
-
         normalized_filters = {
-            "tickSize": tick or 0.0,
-            "stepSize": step or 0.0,
-            "minQty": min_qty or 0.0,
-            "minNotional": min_notional or 0.0,
+            "tickSize": data.get("tickSize") or 0.0,
+            "stepSize": data.get("stepSize") or 0.0,
+            "minQty": data.get("minQty") or 0.0,
+            "minNotional": data.get("minNotional") or 0.0,
         }
         self._symbol_filters_cache[normalized] = normalized_filters
         self._symbol_filters_cache_ts[normalized] = time.time()
@@ -6234,7 +6212,7 @@ class AIChatEngine:
             return None
 
         try:
-            resp = requests.get(
+            resp = http_client.get(
                 f"{base}/fapi/v1/ticker/bookTicker",
                 params={"symbol": normalized_symbol},
                 timeout=6,
@@ -6274,14 +6252,11 @@ class AIChatEngine:
         payload = dict(params or {})
         payload["timestamp"] = int(time.time() * 1000)
         payload["recvWindow"] = recv_window
-        ordered = [(k, payload[k]) for k in sorted(payload)]
-        qs = urlencode(ordered, doseq=True)
-        signature = hmac.new(api_secret.encode(), qs.encode(), hashlib.sha256).hexdigest()
-        url = f"{base}{path}?{qs}&signature={signature}"
-        headers = {"X-MBX-APIKEY": api_key, "Content-Type": "application/x-www-form-urlencoded"}
+        url = f"{base}{path}?{http_client.signed_query(payload, api_secret)}"
+        headers = http_client.api_headers(api_key)
 
         try:
-            response = requests.request(method.upper(), url, headers=headers, timeout=10)
+            response = http_client.request(method, url, headers=headers, timeout=10)
             response.raise_for_status()
         except requests.HTTPError as exc:
             detail = ""
@@ -6653,7 +6628,7 @@ class AIChatEngine:
         if temperature is not None:
             payload["temperature"] = temperature
 
-        resp = requests.post(
+        resp = http_client.post(
             "https://api.openai.com/v1/responses",
             headers=headers,
             json=payload,
@@ -6703,7 +6678,7 @@ class AIChatEngine:
 
         attempt = 0
         while True:
-            resp = requests.post(
+            resp = http_client.post(
                 "https://api.openai.com/v1/chat/completions",
                 headers=headers,
                 json=payload,
@@ -8521,6 +8496,7 @@ async def trades() -> Dict[str, Any]:
             enriched_open = open_trades
         stats = _compute_stats(stats_history)
         decision_stats = _decision_summary(state)
+        kline_cache = _kline_cache_summary(state)
         ai_budget = _normalize_ai_budget(state.get("ai_budget", {}))
         ai_activity_raw = state.get("ai_activity", [])
         if isinstance(ai_activity_raw, list):
@@ -8588,6 +8564,7 @@ async def trades() -> Dict[str, Any]:
             "pnl_series": pnl_series,
             "stats": stats.dict(),
             "decision_stats": decision_stats,
+            "kline_cache": kline_cache,
             "cumulative_stats": cumulative_summary,
             "history_summary": history_summary,
             "hero_metrics": hero_metrics,
@@ -0,0 +1,235 @@
+# exchange_metadata.py
+# Gemeinsamer Cache für /fapi/v1/exchangeInfo
+# - einmal laden, in tick/step/minNotional/Leverage-Tabellen parsen
+# - TTL + Änderungserkennung über einen Digest des Payloads
+# - Persistenz auf Disk, damit Neustarts und das Dashboard den Stand wiederverwenden
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger("exchange_metadata")
+
+_ROOT_DIR = Path(__file__).resolve().parent
+
+
+def _resolve_cache_file() -> Optional[Path]:
+    raw = os.getenv("ASTER_EXCHANGE_INFO_CACHE", "exchange_info_cache.json").strip()
+    if not raw:
+        return None
+    candidate = Path(raw)
+    if not candidate.is_absolute():
+        candidate = _ROOT_DIR / candidate
+    return candidate
+
+
+EXCHANGE_INFO_TTL = max(30.0, float(os.getenv("ASTER_EXCHANGE_INFO_TTL", "900") or 900))
+EXCHANGE_INFO_CACHE_FILE = _resolve_cache_file()
+
+
+def _float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value or default)
+    except (TypeError, ValueError):
+        return default
+
+
+def _positive(value: Any) -> float:
+    number = _float(value)
+    return number if number > 0 else 0.0
+
+
+def parse_symbol_filters(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one ``exchangeInfo`` symbol entry into its trading limits."""
+
+    fdict = {f.get("filterType"): f for f in entry.get("filters", []) if isinstance(f, dict)}
+    lot = fdict.get("LOT_SIZE", {})
+    market_lot = fdict.get("MARKET_LOT_SIZE", {})
+    price = fdict.get("PRICE_FILTER", {})
+    notional = fdict.get("MIN_NOTIONAL") or fdict.get("MIN_NOTIONAL_FILTER") or {}
+    max_leverage = _positive(entry.get("maxLeverage"))
+    if max_leverage <= 0:
+        lev_filter = fdict.get("LEVERAGE") or fdict.get("LEVERAGE_FILTER")
+        if isinstance(lev_filter, dict):
+            max_leverage = _positive(lev_filter.get("maxLeverage"))
+    return {
+        "minQty": _float(lot.get("minQty", "0")),
+        "maxQty": _float(lot.get("maxQty", "0")),
+        "stepSize": _float(lot.get("stepSize", "0.0001"), 0.0001),
+        "marketMinQty": _float(market_lot.get("minQty", "0")),
+        "marketMaxQty": _float(market_lot.get("maxQty", "0")),
+        "marketStepSize": _float(market_lot.get("stepSize", "0")),
+        "minPrice": _float(price.get("minPrice", "0")),
+        "maxPrice": _float(price.get("maxPrice", "0")),
+        "tickSize": _float(price.get("tickSize", "0.0001"), 0.0001),
+        "minNotional": _positive(notional.get("notional")) or _positive(notional.get("minNotional")),
+        "maxLeverage": max_leverage,
+        "defaultLeverage": _positive(entry.get("defaultLeverage")),
+        "quoteAsset": str(entry.get("quoteAsset") or "").upper(),
+        "status": str(entry.get("status") or "").upper(),
+    }
+
+
+def payload_digest(payload: Any) -> str:
+    """Stable digest of an ``exchangeInfo`` payload, ignoring ``serverTime``."""
+
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items() if k != "serverTime"}
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+class ExchangeMetadata:
+    """TTL cache around one venue's ``exchangeInfo`` payload.
+
+    ``fetch`` is only called when both the in-memory copy and the on-disk
+    cache are older than ``ttl``. ``digest`` changes only when the payload
+    itself changes, so consumers can skip re-deriving their symbol lists.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Any],
+        *,
+        base_url: str = "",
+        ttl: float = EXCHANGE_INFO_TTL,
+        cache_file: Optional[Path] = EXCHANGE_INFO_CACHE_FILE,
+    ) -> None:
+        self._fetch = fetch
+        self.base_url = str(base_url or "").rstrip("/")
+        self.ttl = float(ttl)
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._lock = threading.RLock()
+        self._payload: Optional[Dict[str, Any]] = None
+        self._filters: Dict[str, Dict[str, Any]] = {}
+        self.digest: Optional[str] = None
+        self.fetched_at = 0.0
+        self.fetches = 0
+        self.changes = 0
+
+    # ------------------------------------------------------------------ state
+    def _install(self, payload: Dict[str, Any], fetched_at: float, digest: Optional[str] = None) -> bool:
+        digest = digest or payload_digest(payload)
+        changed = digest != self.digest
+        if changed:
+            filters: Dict[str, Dict[str, Any]] = {}
+            for entry in payload.get("symbols", []) or []:
+                if not isinstance(entry, dict):
+                    continue
+                sym = str(entry.get("symbol") or "").upper()
+                if sym:
+                    filters[sym] = parse_symbol_filters(entry)
+            self._payload = payload
+            self._filters = filters
+            self.digest = digest
+            if self.fetched_at > 0:
+                self.changes += 1
+        self.fetched_at = fetched_at
+        return changed
+
+    def _load_disk(self) -> bool:
+        if self.cache_file is None:
+            return False
+        try:
+            with self.cache_file.open("r", encoding="utf-8") as fh:
+                blob = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(blob, dict) or str(blob.get("base") or "") != self.base_url:
+            return False
+        payload = blob.get("payload")
+        fetched_at = _float(blob.get("fetched_at"))
+        if not isinstance(payload, dict) or fetched_at <= self.fetched_at:
+            return False
+        self._install(payload, fetched_at, blob.get("digest"))
+        return True
+
+    def _store_disk(self) -> None:
+        if self.cache_file is None or self._payload is None:
+            return
+        blob = {
+            "base": self.base_url,
+            "fetched_at": self.fetched_at,
+            "digest": self.digest,
+            "payload": self._payload,
+        }
+        tmp = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        try:
+            with tmp.open("w", encoding="utf-8") as fh:
+                json.dump(blob, fh, separators=(",", ":"))
+            os.replace(tmp, self.cache_file)
+        except OSError as exc:
+            log.debug(f"exchangeInfo cache write failed: {exc}")
+
+    def refresh(self, *, force: bool = False) -> bool:
+        """Make sure the payload is at most ``ttl`` old; return True if it changed."""
+
+        with self._lock:
+            now = time.time()
+            if not force and self._payload is not None and now - self.fetched_at < self.ttl:
+                return False
+            before = self.digest
+            if not force and self._load_disk() and now - self.fetched_at < self.ttl:
+                return self.digest != before
+            try:
+                payload = self._fetch()
+            except Exception:
+                if self._payload is not None:
+                    log.debug("exchangeInfo refresh failed; serving cached copy")
+                    return False
+                raise
+            if not isinstance(payload, dict):
+                return False
+            self.fetches += 1
+            changed = self._install(payload, now)
+            self._store_disk()
+            return changed
+
+    # ------------------------------------------------------------------ reads
+    def info(self) -> Dict[str, Any]:
+        self.refresh()
+        return self._payload or {}
+
+    def filters(self) -> Dict[str, Dict[str, Any]]:
+        self.refresh()
+        return self._filters
+
+    def symbol_filters(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.filters().get(str(symbol or "").upper())
+
+    def symbols(self, quote: Optional[str] = None, *, trading_only: bool = False) -> List[str]:
+        quote_token = str(quote or "").upper()
+        out: List[str] = []
+        for sym, entry in self.filters().items():
+            if quote_token and entry.get("quoteAsset") != quote_token:
+                continue
+            if trading_only and entry.get("status") not in ("", "TRADING"):
+                continue
+            out.append(sym)
+        return out
+
+    def tick_sizes(self) -> Dict[str, float]:
+        return {sym: entry["tickSize"] for sym, entry in self.filters().items()}
+
+
+_SHARED: Dict[str, ExchangeMetadata] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_metadata(base_url: str, fetch: Callable[[], Any], **kwargs: Any) -> ExchangeMetadata:
+    """Return the process-wide :class:`ExchangeMetadata` for ``base_url``."""
+
+    key = str(base_url or "").rstrip("/")
+    with _SHARED_LOCK:
+        metadata = _SHARED.get(key)
+        if metadata is None:
+            metadata = ExchangeMetadata(fetch, base_url=key, **kwargs)
+            _SHARED[key] = metadata
+        return metadata
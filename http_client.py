@@ -0,0 +1,218 @@
+# http_client.py
+# Gemeinsame HTTP-Schicht mit Keep-Alive
+# - ein Session-Objekt pro Prozess mit Connection-Pools pro Host (kein TLS-Handshake pro Request)
+# - Pool-Größen passend zu Prefetch-Workern, Guard und AI-Threads
+# - einheitliche Signatur (HMAC-SHA256) und Default-Timeouts
+# - optionaler Capture-Modus: Request/Response-Paare als gzip-JSONL für Offline-Replays
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key, str(default)) or default)
+    except ValueError:
+        return default
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, str(default)) or default)
+    except ValueError:
+        return default
+
+
+# Anzahl Hosts mit eigenem Pool (Exchange, OpenAI, News, Logos …)
+HTTP_POOL_CONNECTIONS = max(1, _env_int("ASTER_HTTP_POOL_CONNECTIONS", 8))
+# Verbindungen pro Host – Prefetch-Worker + Positionsmonitor + Guard + AI
+HTTP_POOL_MAXSIZE = max(1, _env_int("ASTER_HTTP_POOL_MAXSIZE", 16))
+HTTP_CONNECT_TIMEOUT = max(0.5, _env_float("ASTER_HTTP_CONNECT_TIMEOUT", 5.0))
+HTTP_READ_TIMEOUT = max(1.0, _env_float("ASTER_HTTP_READ_TIMEOUT", 20.0))
+
+Timeout = Union[float, Tuple[float, float]]
+DEFAULT_TIMEOUT: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def new_session(
+    *,
+    pool_connections: int = HTTP_POOL_CONNECTIONS,
+    pool_maxsize: int = HTTP_POOL_MAXSIZE,
+) -> requests.Session:
+    """Create a keep-alive session with tuned per-host connection pools.
+
+    Retries stay with the callers (they know which requests are idempotent),
+    so the adapter itself never re-sends.
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def session() -> requests.Session:
+    """Process-wide pooled session shared by the guard, dashboard and AI calls."""
+
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = new_session()
+    return _SESSION
+
+
+def request(method: str, url: str, *, timeout: Optional[Timeout] = None, **kwargs: Any) -> requests.Response:
+    return session().request(method.upper(), url, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+# ------------------------------------------------------------------ signing
+def hmac_signature(secret: str, query: str) -> str:
+    return hmac.new(secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+
+
+def api_headers(api_key: str, *, form: bool = True) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if form:
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    if api_key:
+        headers["X-MBX-APIKEY"] = api_key
+    return headers
+
+
+def signed_query(params: Mapping[str, Any], secret: str) -> str:
+    """Return ``params`` as a sorted query string with its signature appended.
+
+    Callers add ``timestamp``/``recvWindow`` themselves so they control the
+    clock (e.g. a server-time skew correction).
+    """
+
+    ordered: Iterable[Tuple[str, Any]] = [(k, params[k]) for k in sorted(params)]
+    qs = urlencode(list(ordered), doseq=True)
+    return f"{qs}&signature={hmac_signature(secret, qs)}"
+
+
+# ------------------------------------------------------------------ capture
+# Parameter, die sich bei jedem Request ändern und beim Replay ignoriert werden
+VOLATILE_PARAMS = frozenset({"timestamp", "recvWindow", "signature"})
+
+
+def canonical_params(params: Optional[Mapping[str, Any]]) -> str:
+    """Stable representation of request parameters used as a replay key."""
+
+    cleaned = {str(k): str(v) for k, v in (params or {}).items() if k not in VOLATILE_PARAMS and v is not None}
+    return json.dumps(cleaned, sort_keys=True, separators=(",", ":"))
+
+
+class CaptureLog:
+    """Append-only, gzip-compressed JSON-lines log of request/response pairs.
+
+    Every line holds ``t`` (epoch seconds), ``source``, ``method``, ``path``,
+    canonical ``params``, ``status`` and the decoded ``body``; header lines
+    (``source="header"``) carry run metadata instead of a response. Each process
+    appends its own gzip member, so the file can be extended across runs and
+    read back with :meth:`read`.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._fh: Optional[Any] = None
+        self.records = 0
+
+    def record(
+        self,
+        source: str,
+        method: str,
+        path: str,
+        params: Optional[Mapping[str, Any]],
+        body: Any,
+        *,
+        status: int = 200,
+        ts: Optional[float] = None,
+    ) -> None:
+        line = json.dumps(
+            {
+                "t": time.time() if ts is None else float(ts),
+                "source": source,
+                "method": method.upper(),
+                "path": path,
+                "params": canonical_params(params),
+                "status": int(status),
+                "body": body,
+            },
+            separators=(",", ":"),
+            default=str,
+        )
+        with self._lock:
+            if self._fh is None:
+                self._fh = gzip.open(self.path, "at", encoding="utf-8")
+            self._fh.write(line + "\n")
+            # Flush per record so a crashed run still leaves a readable capture.
+            self._fh.flush()
+            self.records += 1
+
+    def write_header(self, **fields: Any) -> None:
+        """Record run metadata (e.g. the RNG seed) as a ``source="header"`` line."""
+
+        self.record("header", "META", "", None, fields)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    @staticmethod
+    def read(path: Union[str, os.PathLike]) -> Iterator[Dict[str, Any]]:
+        with gzip.open(os.fspath(path), "rt", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Truncated tail of an interrupted run.
+                    break
+
+
+CAPTURE_FILE = os.getenv("ASTER_CAPTURE_FILE", "").strip()
+_CAPTURE: Optional[CaptureLog] = CaptureLog(CAPTURE_FILE) if CAPTURE_FILE else None
+
+
+def capture_log() -> Optional[CaptureLog]:
+    """The active capture log, or ``None`` when capture mode is off."""
+
+    return _CAPTURE
+
+
+def set_capture_log(log: Optional[CaptureLog]) -> Optional[CaptureLog]:
+    global _CAPTURE
+    previous, _CAPTURE = _CAPTURE, log
+    return previous
@@ -0,0 +1,1108 @@
+# indicators.py
+# NumPy-Indikatoren für compute_signal
+# - gleiche Ergebnisse wie die Listen-Versionen in aster_multi_bot (inkl. deren Warm-up-Eigenheiten)
+# - Wilder/EMA-Rekursionen blockweise als Matrixprodukt statt Python-Schleife
+# - Eingaben sind Spalten (high/low/close) als float64-Arrays, Ausgaben np.ndarray
+# - IndicatorState: laufender Zustand pro (Symbol, Intervall), ein Update pro geschlossenem Balken
+# - alle Fensterfunktionen rechnen entlang der letzten Achse: (Symbole, Balken) geht in einem Durchlauf
+# - KlineFrame: spaltenweise Kline-Serie (float64), Spalten und Tail-Slices ohne Kopie
+# - Orderbuch: Seiten als (n, 2)-Arrays, Tiefen-Features für viele Bücher in einem Durchlauf
+
+from __future__ import annotations
+
+import copy
+import itertools
+import math
+import operator
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Blocklänge der linearen Rekursion: a**63 bleibt für alle genutzten Perioden weit über dem Underflow
+_BLOCK = 64
+
+Array = np.ndarray
+
+
+def as_array(values: Any) -> Array:
+    return np.asarray(values, dtype=np.float64)
+
+
+def columns(kl: Sequence[Sequence[float]]) -> Array:
+    """Return klines as a 2-D float64 array (one row per bar)."""
+
+    if isinstance(kl, KlineFrame):
+        return kl.rows
+    n = len(kl)
+    if n == 0:
+        return np.empty((0, 7))
+    width = len(kl[0])
+    try:
+        return np.fromiter(itertools.chain.from_iterable(kl), np.float64, count=n * width).reshape(n, width)
+    except ValueError:
+        # Ungleich lange Zeilen – nur die OHLCV-Spalten übernehmen
+        return np.asarray([tuple(row[:6]) for row in kl], dtype=np.float64)
+
+
+# ------------------------------------------------------------------ klines
+KLINE_FIELDS = ("open_time", "open", "high", "low", "close", "volume", "quote_volume")
+# Exchange-Payload: open_time, o, h, l, c, v, (close_time), quote_volume
+_PAYLOAD_FIELDS = operator.itemgetter(0, 1, 2, 3, 4, 5, 7)
+
+
+def _readonly(data: Array) -> Array:
+    if data.flags.writeable:
+        data = data.view()
+        data.flags.writeable = False
+    return data
+
+
+class KlineFrame(Sequence):
+    """Immutable kline series stored column-wise in one float64 array.
+
+    ``data`` has shape ``(7, n)`` in C order, so each field (``close``,
+    ``high`` …) is a contiguous view and slices are views as well. A frame
+    is never modified in place; the kline store swaps in a new frame on
+    refresh, so a frame handed to a caller stays a consistent snapshot.
+    Integer indexing and iteration still yield
+    ``(open_time, open, high, low, close, volume, quote_volume)`` tuples.
+    """
+
+    __slots__ = ("_data",)
+
+    WIDTH = len(KLINE_FIELDS)
+
+    def __init__(self, data: Array) -> None:
+        if data.ndim != 2 or data.shape[0] != self.WIDTH or data.dtype != np.float64:
+            raise ValueError(f"KlineFrame expects a float64 array of shape (7, n), got {data.dtype} {data.shape}")
+        self._data = _readonly(data)
+
+    # -------------------------------------------------------------- construction
+    @classmethod
+    def empty(cls) -> "KlineFrame":
+        return cls(np.empty((cls.WIDTH, 0)))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[float]]) -> "KlineFrame":
+        """Build a frame from ``(open_time, o, h, l, c, v, q)`` rows; frames pass through."""
+
+        if isinstance(rows, KlineFrame):
+            return rows
+        rows = rows if isinstance(rows, Sequence) else list(rows)
+        if not len(rows):
+            return cls.empty()
+        table = columns(rows)
+        if table.shape[1] < cls.WIDTH:
+            table = np.pad(table, ((0, 0), (0, cls.WIDTH - table.shape[1])))
+        return cls(np.ascontiguousarray(table[:, : cls.WIDTH].T))
+
+    @classmethod
+    def from_payload(cls, payload: Sequence[Sequence[Any]]) -> "KlineFrame":
+        """Parse a raw ``/fapi/v1/klines`` response (numbers as strings) in one pass."""
+
+        n = len(payload or ())
+        if n == 0:
+            return cls.empty()
+        flat = np.fromiter(
+            itertools.chain.from_iterable(map(_PAYLOAD_FIELDS, payload)), np.float64, count=n * cls.WIDTH
+        )
+        return cls(np.ascontiguousarray(flat.reshape(n, cls.WIDTH).T))
+
+    @classmethod
+    def concat(cls, *frames: "KlineFrame") -> "KlineFrame":
+        parts = [frame._data for frame in frames if len(frame)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return cls(parts[0])
+        return cls(np.concatenate(parts, axis=1))
+
+    # -------------------------------------------------------------- columns
+    @property
+    def data(self) -> Array:
+        return self._data
+
+    @property
+    def rows(self) -> Array:
+        """``(n, 7)`` view with one row per bar (the layout of :func:`columns`)."""
+
+        return self._data.T
+
+    @property
+    def open_time(self) -> Array:
+        return self._data[0]
+
+    @property
+    def open(self) -> Array:
+        return self._data[1]
+
+    @property
+    def high(self) -> Array:
+        return self._data[2]
+
+    @property
+    def low(self) -> Array:
+        return self._data[3]
+
+    @property
+    def close(self) -> Array:
+        return self._data[4]
+
+    @property
+    def volume(self) -> Array:
+        return self._data[5]
+
+    @property
+    def quote_volume(self) -> Array:
+        return self._data[6]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._data.nbytes)
+
+    # -------------------------------------------------------------- sequence
+    def __len__(self) -> int:
+        return self._data.shape[1]
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                return KlineFrame(np.ascontiguousarray(self._data[:, index]))
+            return KlineFrame(self._data[:, index])
+        if isinstance(index, np.ndarray):
+            return KlineFrame(np.ascontiguousarray(self._data[:, index]))
+        return tuple(self._data[:, index].tolist())
+
+    def __iter__(self) -> Iterator[Tuple[float, ...]]:
+        return zip(*self._data.tolist())
+
+    def signature(self) -> Tuple[float, ...]:
+        """Length, first open time and the full last bar – identifies a window of one series."""
+
+        if not len(self):
+            return (0.0,)
+        return (float(len(self)), float(self._data[0, 0])) + tuple(self._data[:, -1].tolist())
+
+    def tail(self, n: int) -> "KlineFrame":
+        n = int(n)
+        return self[-n:] if n > 0 else self[:0]
+
+    def __repr__(self) -> str:
+        return f"KlineFrame(len={len(self)})"
+
+
+@lru_cache(maxsize=32)
+def _recurrence_kernel(a: float) -> Tuple[Array, Array]:
+    j = np.arange(_BLOCK)
+    lag = j[:, None] - j[None, :]
+    kernel = np.where(lag >= 0, np.power(a, np.maximum(lag, 0)), 0.0).T.copy()
+    carry_w = np.power(a, j + 1)
+    kernel.flags.writeable = False
+    carry_w.flags.writeable = False
+    return kernel, carry_w
+
+
+def _linear_recurrence(b: Array, a: float, y0: float) -> Array:
+    """Solve ``y[i] = a * y[i-1] + b[i]`` with ``y[-1] = y0`` along the last axis.
+
+    Each block of ``_BLOCK`` steps is one product with a lower-triangular
+    matrix of powers of ``a``; only the carry between blocks stays in Python.
+    """
+
+    n = b.shape[-1]
+    if n == 0:
+        return np.empty_like(b)
+    pad = (-n) % _BLOCK
+    if pad:
+        b = np.concatenate([b, np.zeros(b.shape[:-1] + (pad,))], axis=-1)
+    blocks = b.reshape(b.shape[:-1] + (-1, _BLOCK))
+    kernel, carry_w = _recurrence_kernel(float(a))
+    out = blocks @ kernel
+    carry = np.broadcast_to(np.asarray(y0, dtype=np.float64), b.shape[:-1])
+    for blk in range(blocks.shape[-2]):
+        out[..., blk, :] += carry[..., None] * carry_w
+        carry = out[..., blk, -1]
+    return out.reshape(b.shape)[..., :n]
+
+
+def _scalar(values: Array) -> Any:
+    """Plain ``float`` for a single series, the array itself for a batch."""
+
+    return float(values) if np.ndim(values) == 0 else values
+
+
+def ema(data: Any, period: int) -> Array:
+    x = as_array(data)
+    if x.shape[-1] == 0:
+        return x
+    k = 2.0 / (period + 1.0)
+    out = np.empty_like(x)
+    out[..., 0] = x[..., 0]
+    out[..., 1:] = _linear_recurrence(k * x[..., 1:], 1.0 - k, x[..., 0])
+    return out
+
+
+def sma_series(values: Any, period: int) -> Array:
+    """Rolling mean; the first ``period - 1`` values average what is available."""
+
+    x = as_array(values)
+    n = x.shape[-1]
+    if n == 0:
+        return x
+    cs = np.cumsum(x, axis=-1)
+    out = cs / np.arange(1, n + 1)
+    if 0 < period < n:
+        out[..., period:] = (cs[..., period:] - cs[..., :-period]) / period
+    return out
+
+
+def rolling_std(values: Any, period: int) -> Array:
+    """Population standard deviation over the same windows as :func:`sma_series`."""
+
+    x = as_array(values)
+    n = x.shape[-1]
+    if n == 0:
+        return x
+    full = period if 0 < period <= n else n + 1
+    warm = min(full - 1, n)
+    out = np.empty_like(x)
+    if warm:
+        # Auf den ersten Wert zentriert, damit E[x²]-E[x]² nicht auslöscht
+        head = x[..., :warm] - x[..., :1]
+        count = np.arange(1, warm + 1)
+        mean = np.cumsum(head, axis=-1) / count
+        var = np.cumsum(head * head, axis=-1) / count - mean * mean
+        out[..., :warm] = np.sqrt(np.maximum(var, 0.0))
+    if full <= n:
+        out[..., warm:] = sliding_window_view(x, full, axis=-1).std(axis=-1)
+    return out
+
+
+def bollinger_bands(closes: Any, period: int = 20, std_mult: float = 2.0) -> Tuple[Array, Array, Array, Array]:
+    x = as_array(closes)
+    if x.shape[-1] == 0:
+        return x, x, x, x
+    middle = sma_series(x, period)
+    shift = std_mult * rolling_std(x, period)
+    upper = middle + shift
+    lower = middle - shift
+    return upper, middle, lower, np.maximum(upper - lower, 0.0)
+
+
+def rsi(closes: Any, period: int = 14) -> Array:
+    x = as_array(closes)
+    n = x.shape[-1]
+    if n < period + 1:
+        return np.full(x.shape, 50.0)
+    change = np.diff(x, axis=-1)
+    gains = np.maximum(change, 0.0)
+    losses = np.maximum(-change, 0.0)
+    a = (period - 1) / period
+    # Wie die Listen-Version: der letzte Seed-Balken fließt ein zweites Mal in die Glättung ein
+    avg_gain = _linear_recurrence(gains[..., period - 1 :] / period, a, gains[..., :period].sum(axis=-1) / period)
+    avg_loss = _linear_recurrence(losses[..., period - 1 :] / period, a, losses[..., :period].sum(axis=-1) / period)
+    out = np.full(x.shape, 50.0)
+    rs = avg_gain / (avg_loss + 1e-12)
+    out[..., period:] = 100.0 - 100.0 / (1.0 + rs)
+    return out
+
+
+def stoch_rsi(
+    closes: Any, period: int = 14, smooth_k: int = 3, smooth_d: int = 3, *, rsi_vals: Any = None
+) -> Tuple[Array, Array]:
+    """Stochastic RSI; pass ``rsi_vals`` when ``rsi(closes, period)`` is already at hand."""
+
+    x = as_array(closes)
+    if x.shape[-1] == 0:
+        return x, x
+    rsi_vals = rsi(x, period) if rsi_vals is None else as_array(rsi_vals)
+    stoch = np.full(rsi_vals.shape, 50.0)
+    if 0 < period <= rsi_vals.shape[-1]:
+        window = sliding_window_view(rsi_vals, period, axis=-1)
+        low = window.min(axis=-1)
+        rng = np.maximum(window.max(axis=-1) - low, 1e-9)
+        stoch[..., period - 1 :] = (rsi_vals[..., period - 1 :] - low) / rng * 100.0
+    k_line = sma_series(stoch, max(smooth_k, 1))
+    return k_line, sma_series(k_line, max(smooth_d, 1))
+
+
+def true_range(high: Array, low: Array, close: Array) -> Array:
+    """True range per bar; the first bar has no previous close and gets 0."""
+
+    tr = np.zeros_like(close)
+    if close.shape[-1] > 1:
+        prev = close[..., :-1]
+        h, l = high[..., 1:], low[..., 1:]
+        tr[..., 1:] = np.maximum(np.maximum(h - l, np.abs(h - prev)), np.abs(l - prev))
+    return tr
+
+
+def _supertrend_bands(
+    basic_upper: Array, basic_lower: Array, close: Array, period: int
+) -> Tuple[Array, Array]:
+    """Band ratchet for a batch; the loop runs over bars, each step over all series at once."""
+
+    # Balken nach vorne, damit jeder Schritt auf zusammenhängendem Speicher arbeitet
+    upper = np.ascontiguousarray(np.moveaxis(basic_upper, -1, 0))
+    lower = np.ascontiguousarray(np.moveaxis(basic_lower, -1, 0))
+    closes = np.ascontiguousarray(np.moveaxis(close, -1, 0))
+    n = closes.shape[0]
+    line = np.zeros_like(closes)
+    direction = np.zeros_like(closes)
+    for i in range(period, n):
+        if i > period:
+            prev_upper = upper[i - 1]
+            prev_lower = lower[i - 1]
+            prev_close = closes[i - 1]
+            prev_dir = direction[i - 1]
+            # Gegen den Trend zieht das Band nur nach; sonst nachziehen oder bei Durchbruch neu setzen
+            upper[i] = np.where(
+                prev_dir <= 0,
+                np.minimum(upper[i], prev_upper),
+                np.where((upper[i] < prev_upper) | (prev_close > prev_upper), upper[i], prev_upper),
+            )
+            lower[i] = np.where(
+                prev_dir >= 0,
+                np.maximum(lower[i], prev_lower),
+                np.where((lower[i] > prev_lower) | (prev_close < prev_lower), lower[i], prev_lower),
+            )
+        direction[i] = np.where(closes[i] > upper[i], 1.0, np.where(closes[i] < lower[i], -1.0, direction[i - 1]))
+        line[i] = np.where(direction[i] >= 0, lower[i], upper[i])
+    return np.moveaxis(line, 0, -1), np.moveaxis(direction, 0, -1)
+
+
+def supertrend(high: Any, low: Any, close: Any, period: int = 10, multiplier: float = 3.0) -> Tuple[Array, Array]:
+    h, l, c = as_array(high), as_array(low), as_array(close)
+    n = c.shape[-1]
+    if n < period + 2:
+        return np.zeros(c.shape), np.zeros(c.shape)
+    period = max(period, 1)
+    tr = true_range(h, l, c)
+    atr = np.empty(c.shape)
+    atr[..., period] = tr[..., 1 : period + 1].mean(axis=-1)
+    atr[..., period + 1 :] = _linear_recurrence(tr[..., period + 1 :] / period, (period - 1) / period, atr[..., period])
+    # Listen-Version füllt den Warm-up mit dem zuletzt berechneten ATR
+    atr[..., :period] = atr[..., -1:]
+    hl2 = (h + l) / 2.0
+    if c.ndim > 1:
+        line_arr, dir_arr = _supertrend_bands(hl2 + multiplier * atr, hl2 - multiplier * atr, c, period)
+        line_arr[..., :period] = line_arr[..., period : period + 1]
+        dir_arr[..., :period] = dir_arr[..., period : period + 1]
+        return line_arr, dir_arr
+    basic_upper = (hl2 + multiplier * atr).tolist()
+    basic_lower = (hl2 - multiplier * atr).tolist()
+
+    # Das Nachziehen der Bänder hängt von der Richtung des Vorbalkens ab und bleibt sequenziell
+    closes = c.tolist()
+    final_upper = list(basic_upper)
+    final_lower = list(basic_lower)
+    line = [0.0] * n
+    direction = [0.0] * n
+    for i in range(period, n):
+        if i > period:
+            prev_upper = final_upper[i - 1]
+            prev_lower = final_lower[i - 1]
+            if not (basic_upper[i] < prev_upper or closes[i - 1] > prev_upper):
+                final_upper[i] = prev_upper
+            if not (basic_lower[i] > prev_lower or closes[i - 1] < prev_lower):
+                final_lower[i] = prev_lower
+            prev_dir = direction[i - 1]
+            if prev_dir >= 0 and final_lower[i] < prev_lower:
+                final_lower[i] = prev_lower
+            if prev_dir <= 0 and final_upper[i] > prev_upper:
+                final_upper[i] = prev_upper
+        if closes[i] > final_upper[i]:
+            direction[i] = 1.0
+        elif closes[i] < final_lower[i]:
+            direction[i] = -1.0
+        else:
+            direction[i] = direction[i - 1] if i > 0 else 0.0
+        line[i] = final_lower[i] if direction[i] >= 0 else final_upper[i]
+    line_arr = np.asarray(line)
+    dir_arr = np.asarray(direction)
+    line_arr[:period] = line_arr[period]
+    dir_arr[:period] = dir_arr[period]
+    return line_arr, dir_arr
+
+
+def atr_abs(high: Any, low: Any, close: Any, period: int = 14) -> Any:
+    c = as_array(close)
+    if c.shape[-1] < max(period + 1, 2):
+        return _scalar(np.zeros(c.shape[:-1]))
+    tr = true_range(as_array(high), as_array(low), c)[..., 1:]
+    return _scalar(tr[..., -period:].sum(axis=-1) / float(period))
+
+
+ADX_MODES = ("legacy", "wilder")
+
+
+class AdxReading(NamedTuple):
+    adx: float
+    delta: float
+    plus_di: float
+    minus_di: float
+
+
+_ADX_WARMUP = AdxReading(25.0, 0.0, 0.0, 0.0)
+
+
+def _adx_warmup(shape: Tuple[int, ...]) -> AdxReading:
+    if not shape:
+        return _ADX_WARMUP
+    return AdxReading(*(np.full(shape, value) for value in _ADX_WARMUP))
+
+
+def directional_movement(high: Array, low: Array, close: Array) -> Tuple[Array, Array, Array]:
+    """Return ``(tr, plus_dm, minus_dm)`` for bars 1..n-1."""
+
+    up = high[..., 1:] - high[..., :-1]
+    down = low[..., :-1] - low[..., 1:]
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    return true_range(high, low, close)[..., 1:], plus_dm, minus_dm
+
+
+def _dx(tr_sum: Array, plus_sum: Array, minus_sum: Array) -> Tuple[Array, Array, Array]:
+    valid = tr_sum > 0
+    safe_tr = np.where(valid, tr_sum, 1.0)
+    plus_di = np.where(valid, 100.0 * plus_sum / safe_tr, 0.0)
+    minus_di = np.where(valid, 100.0 * minus_sum / safe_tr, 0.0)
+    denom = plus_di + minus_di
+    dx = np.where(denom > 0, 100.0 * np.abs(plus_di - minus_di) / np.where(denom > 0, denom, 1.0), 0.0)
+    return dx, plus_di, minus_di
+
+
+def adx_legacy(high: Any, low: Any, close: Any, period: int = 14) -> AdxReading:
+    """Mean DX of the last ``period`` windows and its change against the ``period`` before.
+
+    Matches the original ``adx_latest``; the window sums come from running
+    totals, so the cost is O(n) instead of O(n·period).
+    """
+
+    h, l, c = as_array(high), as_array(low), as_array(close)
+    if c.shape[-1] <= period + 1:
+        return _adx_warmup(c.shape[:-1])
+    tr, plus_dm, minus_dm = directional_movement(h, l, c)
+    if tr.shape[-1] < period:
+        return _adx_warmup(c.shape[:-1])
+    # Laufende Summen; Fenster aus lauter Nullen bleiben dabei exakt 0
+    sums = np.cumsum(np.stack([tr, plus_dm, minus_dm]), axis=-1)
+    window = sums[..., period - 1 :].copy()
+    window[..., 1:] -= sums[..., : -period]
+    np.maximum(window, 0.0, out=window)
+    dx, plus_di, minus_di = _dx(*window)
+    adx_last = dx[..., -period:].mean(axis=-1)
+    prev = dx[..., -2 * period : -period] if dx.shape[-1] > period else dx[..., :0]
+    adx_prev = prev.mean(axis=-1) if prev.shape[-1] else adx_last
+    return AdxReading(
+        _scalar(adx_last), _scalar(adx_last - adx_prev), _scalar(plus_di[..., -1]), _scalar(minus_di[..., -1])
+    )
+
+
+def adx_wilder(high: Any, low: Any, close: Any, period: int = 14) -> AdxReading:
+    """Standard Wilder ADX with +DI/-DI; ``delta`` is the change over ``period`` bars."""
+
+    h, l, c = as_array(high), as_array(low), as_array(close)
+    if c.shape[-1] < 2:
+        return _adx_warmup(c.shape[:-1])
+    tr, plus_dm, minus_dm = directional_movement(h, l, c)
+    if period < 1 or tr.shape[-1] < period:
+        return _adx_warmup(c.shape[:-1])
+    a = (period - 1) / period
+    # Wilder-Summen: Seed ist die Summe der ersten ``period`` Werte, danach S - S/p + x
+    smoothed = np.empty((3,) + tr.shape[:-1] + (tr.shape[-1] - period + 1,))
+    for row, values in enumerate((tr, plus_dm, minus_dm)):
+        seed = values[..., :period].sum(axis=-1)
+        smoothed[row, ..., 0] = seed
+        smoothed[row, ..., 1:] = _linear_recurrence(values[..., period:], a, seed)
+    dx, plus_di, minus_di = _dx(*smoothed)
+    plus_last, minus_last = _scalar(plus_di[..., -1]), _scalar(minus_di[..., -1])
+    if dx.shape[-1] < period:
+        warm = _adx_warmup(c.shape[:-1])
+        return AdxReading(warm.adx, warm.delta, plus_last, minus_last)
+    adx = np.empty(dx.shape[:-1] + (dx.shape[-1] - period + 1,))
+    adx[..., 0] = dx[..., :period].mean(axis=-1)
+    adx[..., 1:] = _linear_recurrence(dx[..., period:] / period, a, adx[..., 0])
+    if adx.shape[-1] > period:
+        delta = adx[..., -1] - adx[..., -1 - period]
+    else:
+        delta = np.zeros(adx.shape[:-1])
+    return AdxReading(_scalar(adx[..., -1]), _scalar(delta), plus_last, minus_last)
+
+
+def adx_reading(high: Any, low: Any, close: Any, period: int = 14, *, mode: str = "legacy") -> AdxReading:
+    if mode == "wilder":
+        return adx_wilder(high, low, close, period)
+    return adx_legacy(high, low, close, period)
+
+
+def adx_latest(high: Any, low: Any, close: Any, period: int = 14, *, mode: str = "legacy") -> Tuple[float, float]:
+    """Return (adx_last, delta) in the given ``mode``."""
+
+    reading = adx_reading(high, low, close, period, mode=mode)
+    return reading.adx, reading.delta
+
+
+def _trailing_run(flags: Array) -> Any:
+    """Length of the run of ``True`` values at the end of ``flags`` (per series for a batch)."""
+
+    n = flags.shape[-1]
+    misses = ~flags[..., ::-1]
+    run = np.where(misses.any(axis=-1), misses.argmax(axis=-1), n) if n else np.zeros(flags.shape[:-1], dtype=int)
+    return int(run) if np.ndim(run) == 0 else run
+
+
+# ------------------------------------------------------------------ streaming state
+class IndicatorSnapshot:
+    """Latest indicator values plus the last ``history`` bars of each series.
+
+    The series are short arrays aligned with the newest bars, so callers index
+    them from the end exactly like the full-window arrays (``[-1]``, ``[-5]``,
+    ``[-8:]``).
+    """
+
+    SERIES = (
+        "ema_fast",
+        "ema_slow",
+        "rsi",
+        "bb_upper",
+        "bb_middle",
+        "bb_lower",
+        "bb_width",
+        "stoch_k",
+        "stoch_d",
+        "supertrend",
+        "supertrend_dir",
+    )
+    __slots__ = SERIES + ("atr", "adx", "adx_delta", "plus_di", "minus_di", "run_up", "run_down", "bars")
+
+    def __init__(self, **values: Any) -> None:
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+
+class IndicatorState:
+    """Running indicator state for one (symbol, interval) series.
+
+    ``push`` folds one closed bar into the EMAs, Wilder averages, the short
+    rolling windows and the Supertrend bands. Its cost depends on the
+    indicator periods and not on how many bars came before. ``preview``
+    evaluates the still-open bar on a copy without touching the state.
+    Results match the window functions above for a window starting at
+    :attr:`first_open`; once a window drops that bar, the state no longer
+    describes it (the EMAs and Wilder averages keep their seed).
+    """
+
+    def __init__(
+        self,
+        *,
+        ema_fast: int = 21,
+        ema_slow: int = 55,
+        rsi_period: int = 14,
+        bb_period: int = 20,
+        bb_mult: float = 2.0,
+        stoch_period: int = 14,
+        stoch_k: int = 3,
+        stoch_d: int = 3,
+        st_period: int = 10,
+        st_mult: float = 3.0,
+        atr_period: int = 14,
+        adx_period: int = 14,
+        adx_mode: str = "legacy",
+        history: int = 8,
+    ) -> None:
+        self.periods = {
+            "ema_fast": ema_fast,
+            "ema_slow": ema_slow,
+            "rsi_period": rsi_period,
+            "bb_period": bb_period,
+            "bb_mult": bb_mult,
+            "stoch_period": stoch_period,
+            "stoch_k": stoch_k,
+            "stoch_d": stoch_d,
+            "st_period": st_period,
+            "st_mult": st_mult,
+            "atr_period": atr_period,
+            "adx_period": adx_period,
+            "adx_mode": adx_mode if adx_mode in ADX_MODES else "legacy",
+            "history": history,
+        }
+        self.bars = 0
+        self.first_open: Optional[float] = None
+        self.last_open: Optional[float] = None
+        self._prev: Optional[Tuple[float, float, float]] = None
+        self._k_fast = 2.0 / (ema_fast + 1.0)
+        self._k_slow = 2.0 / (ema_slow + 1.0)
+        self._ema_fast = 0.0
+        self._ema_slow = 0.0
+        self._gain_seed = 0.0
+        self._loss_seed = 0.0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._closes: Deque[float] = deque(maxlen=max(bb_period, 1))
+        self._rsi_window: Deque[float] = deque(maxlen=max(stoch_period, 1))
+        self._stoch_window: Deque[float] = deque(maxlen=max(stoch_k, 1))
+        self._k_window: Deque[float] = deque(maxlen=max(stoch_d, 1))
+        self._atr_window: Deque[float] = deque(maxlen=max(atr_period, 1))
+        self._st_seed = 0.0
+        self._st_atr = 0.0
+        self._st_upper = 0.0
+        self._st_lower = 0.0
+        self._st_dir = 0.0
+        self._adx_tr: Deque[float] = deque(maxlen=max(adx_period, 1))
+        self._adx_plus: Deque[float] = deque(maxlen=max(adx_period, 1))
+        self._adx_minus: Deque[float] = deque(maxlen=max(adx_period, 1))
+        self._dx: Deque[float] = deque(maxlen=2 * max(adx_period, 1))
+        # Wilder: geglättete Summen (TR, +DM, -DM), DX-Seed und die letzten ``period + 1`` ADX-Werte
+        self._wilder = [0.0, 0.0, 0.0]
+        self._wilder_seen = 0
+        self._di: Tuple[float, float] = (0.0, 0.0)
+        self._dx_count = 0
+        self._dx_seed = 0.0
+        self._adx_ring: Deque[float] = deque(maxlen=max(adx_period, 1) + 1)
+        self.run_up = 0
+        self.run_down = 0
+        self._history: Dict[str, Deque[float]] = {
+            name: deque(maxlen=max(history, 1)) for name in IndicatorSnapshot.SERIES
+        }
+        self._last: Dict[str, float] = {"atr": 0.0, "adx": 25.0, "adx_delta": 0.0, "plus_di": 0.0, "minus_di": 0.0}
+
+    # -------------------------------------------------------------- updates
+    def fork(self) -> "IndicatorState":
+        clone = copy.copy(self)
+        for name, value in self.__dict__.items():
+            if isinstance(value, deque):
+                setattr(clone, name, deque(value, maxlen=value.maxlen))
+        clone._history = {name: deque(ring, maxlen=ring.maxlen) for name, ring in self._history.items()}
+        clone._last = dict(self._last)
+        clone._wilder = list(self._wilder)
+        return clone
+
+    def push(self, bar: Sequence[float]) -> None:
+        """Fold one kline row ``(open_time, open, high, low, close, ...)`` into the state."""
+
+        p = self.periods
+        high, low, close = float(bar[2]), float(bar[3]), float(bar[4])
+        i = self.bars
+        prev = self._prev
+        tr = 0.0
+        if prev is not None:
+            prev_high, prev_low, prev_close = prev
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        # EMA – Seed ist der erste Schlusskurs
+        if i == 0:
+            self._ema_fast = self._ema_slow = close
+        else:
+            self._ema_fast = (1.0 - self._k_fast) * self._ema_fast + self._k_fast * close
+            self._ema_slow = (1.0 - self._k_slow) * self._ema_slow + self._k_slow * close
+
+        # RSI (Wilder) inkl. doppelt gezähltem letzten Seed-Balken der Fenster-Version
+        period = p["rsi_period"]
+        rsi_val = 50.0
+        if prev is not None:
+            change = close - prev[2]
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            if i <= period:
+                self._gain_seed += gain
+                self._loss_seed += loss
+            if i == period:
+                self._avg_gain = self._gain_seed / period
+                self._avg_loss = self._loss_seed / period
+            if i >= period:
+                a = (period - 1) / period
+                self._avg_gain = a * self._avg_gain + gain / period
+                self._avg_loss = a * self._avg_loss + loss / period
+                rs = self._avg_gain / (self._avg_loss + 1e-12)
+                rsi_val = 100.0 - 100.0 / (1.0 + rs)
+
+        # Bollinger
+        self._closes.append(close)
+        count = len(self._closes)
+        mean = sum(self._closes) / count
+        std = math.sqrt(sum((x - mean) * (x - mean) for x in self._closes) / count)
+        shift = p["bb_mult"] * std
+        bb_upper, bb_lower = mean + shift, mean - shift
+
+        # StochRSI
+        self._rsi_window.append(rsi_val)
+        if len(self._rsi_window) < p["stoch_period"]:
+            stoch = 50.0
+        else:
+            lo = min(self._rsi_window)
+            stoch = (rsi_val - lo) / max(max(self._rsi_window) - lo, 1e-9) * 100.0
+        self._stoch_window.append(stoch)
+        k_val = sum(self._stoch_window) / len(self._stoch_window)
+        self._k_window.append(k_val)
+        d_val = sum(self._k_window) / len(self._k_window)
+
+        # ATR (einfacher Schnitt der letzten True Ranges)
+        if prev is not None:
+            self._atr_window.append(tr)
+        if i + 1 >= p["atr_period"] + 1:
+            self._last["atr"] = sum(self._atr_window) / float(p["atr_period"])
+
+        # Supertrend
+        st_period = max(p["st_period"], 1)
+        st_line = 0.0
+        if 1 <= i <= st_period:
+            self._st_seed += tr
+        if i == st_period:
+            self._st_atr = self._st_seed / st_period
+        elif i > st_period:
+            self._st_atr = ((st_period - 1) / st_period) * self._st_atr + tr / st_period
+        if i >= st_period:
+            hl2 = (high + low) / 2.0
+            upper = hl2 + p["st_mult"] * self._st_atr
+            lower = hl2 - p["st_mult"] * self._st_atr
+            if i > st_period:
+                prev_upper, prev_lower = self._st_upper, self._st_lower
+                prev_close = prev[2] if prev is not None else close
+                if not (upper < prev_upper or prev_close > prev_upper):
+                    upper = prev_upper
+                if not (lower > prev_lower or prev_close < prev_lower):
+                    lower = prev_lower
+                if self._st_dir >= 0 and lower < prev_lower:
+                    lower = prev_lower
+                if self._st_dir <= 0 and upper > prev_upper:
+                    upper = prev_upper
+            if close > upper:
+                self._st_dir = 1.0
+            elif close < lower:
+                self._st_dir = -1.0
+            self._st_upper, self._st_lower = upper, lower
+            st_line = lower if self._st_dir >= 0 else upper
+
+        # ADX
+        if prev is not None:
+            up = high - prev[0]
+            down = prev[1] - low
+            plus_dm = up if up > down and up > 0 else 0.0
+            minus_dm = down if down > up and down > 0 else 0.0
+            if p["adx_mode"] == "wilder":
+                self._push_wilder(tr, plus_dm, minus_dm)
+            else:
+                self._push_legacy(tr, plus_dm, minus_dm, i)
+
+        self.run_up = self.run_up + 1 if self._ema_fast > self._ema_slow else 0
+        self.run_down = self.run_down + 1 if self._ema_fast < self._ema_slow else 0
+
+        hist = self._history
+        hist["ema_fast"].append(self._ema_fast)
+        hist["ema_slow"].append(self._ema_slow)
+        hist["rsi"].append(rsi_val)
+        hist["bb_upper"].append(bb_upper)
+        hist["bb_middle"].append(mean)
+        hist["bb_lower"].append(bb_lower)
+        hist["bb_width"].append(max(bb_upper - bb_lower, 0.0))
+        hist["stoch_k"].append(k_val)
+        hist["stoch_d"].append(d_val)
+        hist["supertrend"].append(st_line)
+        hist["supertrend_dir"].append(self._st_dir if i >= st_period else 0.0)
+
+        self._prev = (high, low, close)
+        if i == 0:
+            self.first_open = float(bar[0])
+        self.last_open = float(bar[0])
+        self.bars = i + 1
+
+    def _push_legacy(self, tr: float, plus_dm: float, minus_dm: float, i: int) -> None:
+        # Fenstersummen wie adx_legacy
+        period = self.periods["adx_period"]
+        self._adx_tr.append(tr)
+        self._adx_plus.append(plus_dm)
+        self._adx_minus.append(minus_dm)
+        if len(self._adx_tr) < period:
+            return
+        self._dx.append(self._dx_from(sum(self._adx_tr), sum(self._adx_plus), sum(self._adx_minus)))
+        if i + 1 > period + 1:
+            dx_vals = list(self._dx)
+            last_slice = dx_vals[-period:]
+            adx_last = sum(last_slice) / len(last_slice)
+            prev_slice = dx_vals[:-period] if len(dx_vals) > period else []
+            adx_prev = sum(prev_slice) / len(prev_slice) if prev_slice else adx_last
+            self._last["adx"], self._last["adx_delta"] = adx_last, adx_last - adx_prev
+            self._last["plus_di"], self._last["minus_di"] = self._di
+
+    def _push_wilder(self, tr: float, plus_dm: float, minus_dm: float) -> None:
+        period = self.periods["adx_period"]
+        a = (period - 1) / period
+        sums = self._wilder
+        if self._wilder_seen < period:
+            # Seed-Phase: die ersten ``period`` Werte aufsummieren
+            self._wilder_seen += 1
+            sums[0] += tr
+            sums[1] += plus_dm
+            sums[2] += minus_dm
+            if self._wilder_seen < period:
+                return
+        else:
+            sums[0] = a * sums[0] + tr
+            sums[1] = a * sums[1] + plus_dm
+            sums[2] = a * sums[2] + minus_dm
+        dx = self._dx_from(*sums)
+        self._last["plus_di"], self._last["minus_di"] = self._di
+        self._dx_count += 1
+        ring = self._adx_ring
+        if self._dx_count < period:
+            self._dx_seed += dx
+            return
+        if self._dx_count == period:
+            ring.append((self._dx_seed + dx) / period)
+        else:
+            ring.append(a * ring[-1] + dx / period)
+        self._last["adx"] = ring[-1]
+        self._last["adx_delta"] = ring[-1] - ring[0] if len(ring) == ring.maxlen else 0.0
+
+    def _dx_from(self, tr_sum: float, plus_sum: float, minus_sum: float) -> float:
+        if tr_sum <= 0:
+            self._di = (0.0, 0.0)
+            return 0.0
+        plus_di = 100.0 * plus_sum / tr_sum
+        minus_di = 100.0 * minus_sum / tr_sum
+        self._di = (plus_di, minus_di)
+        denom = plus_di + minus_di
+        return 100.0 * abs(plus_di - minus_di) / denom if denom > 0 else 0.0
+
+    def extend(self, bars: Iterable[Sequence[float]]) -> None:
+        for bar in bars:
+            self.push(bar)
+
+    # -------------------------------------------------------------- reads
+    def snapshot(self) -> IndicatorSnapshot:
+        values: Dict[str, Any] = {name: np.asarray(ring, dtype=np.float64) for name, ring in self._history.items()}
+        values.update(self._last)
+        values.update(run_up=self.run_up, run_down=self.run_down, bars=self.bars)
+        return IndicatorSnapshot(**values)
+
+    def preview(self, bar: Sequence[float]) -> IndicatorSnapshot:
+        """Snapshot including the still-open ``bar`` without committing it."""
+
+        clone = self.fork()
+        clone.push(bar)
+        return clone.snapshot()
+
+
+def _window_values(high: Array, low: Array, close: Array, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot fields for one window, or for a stack of equal-length windows along the first axis."""
+
+    tail = max(spec["history"], 1)
+    ema_fast = ema(close, spec["ema_fast"])
+    ema_slow = ema(close, spec["ema_slow"])
+    rsi_vals = rsi(close, spec["rsi_period"])
+    # Fensterindikatoren hängen nur von den letzten Balken ab: nur so viel rechnen, wie der Tail braucht
+    bb_span = tail + max(spec["bb_period"], 1) - 1
+    bb_upper, bb_middle, bb_lower, bb_width = bollinger_bands(close[..., -bb_span:], spec["bb_period"], spec["bb_mult"])
+    stoch_span = tail + max(spec["stoch_period"], 1) + max(spec["stoch_k"], 1) + max(spec["stoch_d"], 1) - 3
+    stoch_k, stoch_d = stoch_rsi(
+        close[..., -stoch_span:],
+        spec["stoch_period"],
+        spec["stoch_k"],
+        spec["stoch_d"],
+        rsi_vals=rsi_vals[..., -stoch_span:],
+    )
+    st_line, st_dir = supertrend(high, low, close, spec["st_period"], spec["st_mult"])
+    if spec["adx_mode"] == "legacy":
+        adx_span = 3 * max(spec["adx_period"], 1) + 2
+        adx = adx_legacy(high[..., -adx_span:], low[..., -adx_span:], close[..., -adx_span:], spec["adx_period"])
+    else:
+        adx = adx_wilder(high, low, close, spec["adx_period"])
+    series = {
+        "ema_fast": ema_fast,
+        "ema_slow": ema_slow,
+        "rsi": rsi_vals,
+        "bb_upper": bb_upper,
+        "bb_middle": bb_middle,
+        "bb_lower": bb_lower,
+        "bb_width": bb_width,
+        "stoch_k": stoch_k,
+        "stoch_d": stoch_d,
+        "supertrend": st_line,
+        "supertrend_dir": st_dir,
+    }
+    values: Dict[str, Any] = {name: arr[..., -tail:] for name, arr in series.items()}
+    values.update(
+        atr=atr_abs(high, low, close, spec["atr_period"]),
+        adx=adx.adx,
+        adx_delta=adx.delta,
+        plus_di=adx.plus_di,
+        minus_di=adx.minus_di,
+        run_up=_trailing_run(ema_fast > ema_slow),
+        run_down=_trailing_run(ema_fast < ema_slow),
+        bars=close.shape[-1],
+    )
+    return values
+
+
+def window_snapshot(kl: Sequence[Sequence[float]], **periods: Any) -> IndicatorSnapshot:
+    """Compute an :class:`IndicatorSnapshot` from a full kline window in one batch."""
+
+    spec = IndicatorState(**periods).periods
+    bars = columns(kl)
+    return IndicatorSnapshot(**_window_values(bars[:, 2], bars[:, 3], bars[:, 4], spec))
+
+
+def batch_snapshots(windows: Sequence[Sequence[Sequence[float]]], **periods: Any) -> List[IndicatorSnapshot]:
+    """:func:`window_snapshot` for many windows at once.
+
+    Windows of equal length are stacked into ``(symbols, bars)`` matrices and
+    go through every indicator in one vectorized pass; each returned snapshot
+    holds views into that pass. Results match :func:`window_snapshot` per window.
+    """
+
+    spec = IndicatorState(**periods).periods
+    frames = [KlineFrame.from_rows(window) for window in windows]
+    groups: Dict[int, List[int]] = {}
+    for idx, frame in enumerate(frames):
+        groups.setdefault(len(frame), []).append(idx)
+    out: List[Optional[IndicatorSnapshot]] = [None] * len(frames)
+    for length, members in groups.items():
+        if length == 0 or len(members) == 1:
+            for idx in members:
+                out[idx] = IndicatorSnapshot(**_window_values(frames[idx].high, frames[idx].low, frames[idx].close, spec))
+            continue
+        # (3, symbols, bars): high/low/close je Symbol als Zeile
+        stack = np.stack([frames[idx].data[2:5] for idx in members], axis=1)
+        values = _window_values(stack[0], stack[1], stack[2], spec)
+        for row, idx in enumerate(members):
+            snap: Dict[str, Any] = {name: values[name][row] for name in IndicatorSnapshot.SERIES}
+            for name in ("atr", "adx", "adx_delta", "plus_di", "minus_di"):
+                snap[name] = float(values[name][row])
+            snap.update(run_up=int(values["run_up"][row]), run_down=int(values["run_down"][row]), bars=length)
+            out[idx] = IndicatorSnapshot(**snap)
+    return out  # type: ignore[return-value]
+
+
+# ------------------------------------------------------------------ order book
+# Tiefen, die Strategy._order_book_features liest
+_BOOK_SUM_LEVELS = 10
+_BOOK_GAP_LEVELS = 12
+
+
+def order_book_side(levels: Iterable[Any], limit: int, *, descending: bool) -> Array:
+    """Parse ``[[price, qty], ...]`` into a read-only ``(n, 2)`` float64 array.
+
+    Levels with a non-positive price or quantity are skipped, the first
+    ``limit`` remaining ones (payload order) are kept and then sorted by price,
+    stable like :func:`sorted`.
+    """
+
+    levels = levels if isinstance(levels, Sequence) else list(levels or ())
+    try:
+        flat = np.fromiter(map(float, itertools.chain.from_iterable(entry[:2] for entry in levels)), dtype=np.float64)
+        if flat.size != 2 * len(levels):
+            raise ValueError("ragged levels")
+        data = flat.reshape(-1, 2)
+    except (TypeError, ValueError, IndexError):
+        rows: List[Tuple[float, float]] = []
+        for entry in levels or ():
+            try:
+                rows.append((float(entry[0]), float(entry[1])))
+            except Exception:
+                continue
+        data = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    data = data[(data[:, 0] > 0) & (data[:, 1] > 0)][: max(0, int(limit))]
+    order = np.argsort(-data[:, 0] if descending else data[:, 0], kind="stable")
+    return _readonly(data[order])
+
+
+def _book_matrix(sides: Sequence[Array], width: int) -> Array:
+    # (Seiten, Stufen, [Preis, Menge]), fehlende Stufen als 0
+    out = np.zeros((len(sides), width, 2))
+    for row, side in enumerate(sides):
+        n = min(len(side), width)
+        out[row, :n] = side[:n]
+    return out
+
+
+def _clip(values: Array, lower: float, upper: float) -> Array:
+    return np.minimum(np.maximum(values, lower), upper)
+
+
+def order_book_features_batch(books: Sequence[Tuple[Any, Any]]) -> List[Dict[str, float]]:
+    """Depth features for many ``(bids, asks)`` books in one pass.
+
+    Bids are sorted best (highest) first, asks lowest first, as produced by
+    :func:`order_book_side`. A book with an empty side yields ``{}``.
+    """
+
+    m = len(books)
+    if not m:
+        return []
+    # Gebotsseiten in den ersten m Zeilen, Angebotsseiten in den letzten m
+    sides = [as_array(bids).reshape(-1, 2) for bids, _ in books] + [as_array(asks).reshape(-1, 2) for _, asks in books]
+    counts = np.array([len(side) for side in sides])
+    levels = _book_matrix(sides, _BOOK_GAP_LEVELS)
+    prices = levels[..., 0]
+    qty = levels[:, :_BOOK_SUM_LEVELS, 1]
+    rows = np.arange(2 * m)
+
+    # cumsum addiert Stufe für Stufe wie sum(); aufgefüllte Nullen ändern nichts
+    qty_sums = np.cumsum(qty, axis=-1)
+    notional = np.cumsum(prices[:, :_BOOK_SUM_LEVELS] * qty, axis=-1)[:, -1]
+    bid_qty = qty_sums[:m, (4, -1)]
+    ask_qty = qty_sums[m:, (4, -1)]
+    imbalance = _clip((bid_qty - ask_qty) / np.maximum(bid_qty + ask_qty, 1e-9), -1.0, 1.0)
+    ratio = _clip(notional[:m] / np.maximum(notional[m:], 1e-9), 0.0, 5.0)
+
+    # Lücken: positive Preisabstände zur Nachbarstufe (Gebote fallen, Angebote steigen)
+    present = np.arange(_BOOK_GAP_LEVELS) < counts[:, None]
+    steps = prices[:, :-1] - prices[:, 1:]
+    steps[m:] *= -1.0
+    valid = (steps > 0) & present[:, 1:]
+    positive = np.where(valid, steps, 0.0)
+    n = valid.sum(axis=-1)
+    avg = np.cumsum(positive, axis=-1)[:, -1] / np.maximum(n, 1)
+    ok = present[:, 2] & (n > 0) & (avg > 0)
+    gap = np.where(ok, _clip(positive.max(axis=-1) / np.where(ok, avg, 1.0) - 1.0, 0.0, 5.0), 0.0)
+
+    # Wände: größte Menge der ersten 10 Stufen relativ zum Median (statistics.median)
+    valid = qty > 0
+    k = valid.sum(axis=-1)
+    ordered = np.sort(np.where(valid, qty, np.inf), axis=-1)
+    median = (ordered[rows, np.maximum(k - 1, 0) // 2] + ordered[rows, k // 2]) / 2.0
+    ok = (k >= 3) & (median > 0)
+    wall = np.where(ok, _clip(ordered[rows, np.maximum(k - 1, 0)] / np.where(ok, median, 1.0) - 1.0, 0.0, 5.0), 0.0)
+
+    columns = zip(
+        imbalance.tolist(),
+        ratio.tolist(),
+        gap[:m].tolist(),
+        gap[m:].tolist(),
+        wall[:m].tolist(),
+        wall[m:].tolist(),
+        notional[:m].tolist(),
+        notional[m:].tolist(),
+        np.minimum(counts[:m], counts[m:]).tolist(),
+    )
+    out: List[Dict[str, float]] = []
+    for (imb5, imb10), depth_ratio, gb, ga, wb, wa, bid_n, ask_n, depth in columns:
+        if not depth:
+            out.append({})
+            continue
+        out.append(
+            {
+                "lob_imbalance_5": imb5,
+                "lob_imbalance_10": imb10,
+                "lob_depth_ratio": depth_ratio,
+                "lob_gap_score": max(gb, ga),
+                "lob_gap_bid": gb,
+                "lob_gap_ask": ga,
+                "lob_wall_score": max(wb, wa),
+                "lob_wall_bid": wb,
+                "lob_wall_ask": wa,
+                "lob_bid_notional_10": bid_n,
+                "lob_ask_notional_10": ask_n,
+                "lob_levels": float(depth),
+            }
+        )
+    return out
+
+
+def order_book_features(bids: Any, asks: Any) -> Dict[str, float]:
+    """:func:`order_book_features_batch` for a single book."""
+
+    return order_book_features_batch([(bids, asks)])[0]
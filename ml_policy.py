@@ -1,7 +1,7 @@
 # ml_policy.py — LinUCB Bandit für Gate (TAKE/SKIP) + Größenbucket (S/M/L)
 from __future__ import annotations
-import math, time, random
-from typing import Dict, Optional, Tuple, Any
+import hashlib, json, math, os, time, random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 try:
     import numpy as np
@@ -85,32 +85,217 @@ FEATURES = (
     "breakout_direction",
 )
 
+# --------------------------- Feature-Schema ----------------------------------
+class FeatureSchema:
+    """Feste Feature-Liste, einmal kompiliert: Indexmap + wiederverwendbarer Puffer.
+
+    Werte werden wie bisher mit ``float(ctx.get(k, 0.0) or 0.0)`` gelesen.
+    Das Schema hält keinen Zustand über Aufrufe hinweg (außer dem Puffer von
+    :meth:`fill`); welche Features fehlten bzw. NaN/inf waren, liefert
+    ``matrix(..., diagnostics=True)`` auf Anfrage als Tupel.
+    """
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.names: Tuple[str, ...] = tuple(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.dim = len(self.names)
+        self._name_set = frozenset(self.names)
+        self._defaults = (0.0,) * self.dim
+        self._buffer = np.zeros(self.dim, dtype=float)
+
+    def __len__(self) -> int:
+        return self.dim
+
+    def missing(self, ctxs: Sequence[Dict[str, Any]]) -> Tuple[str, ...]:
+        """Features, die in mindestens einem Kontext fehlen (gehen als 0 ein)."""
+
+        missing: set = set()
+        for ctx in ctxs:
+            missing.update(self._name_set.difference(ctx))
+        return tuple(name for name in self.names if name in missing)
+
+    def non_finite(self, X: np.ndarray) -> Tuple[str, ...]:
+        """Features, die in mindestens einer Zeile von ``X`` NaN/inf sind."""
+
+        bad = ~np.isfinite(X.reshape(-1, self.dim)).all(axis=0)
+        return tuple(name for name, flag in zip(self.names, bad) if flag)
+
+    def _values(self, ctx: Dict[str, Any]) -> Tuple[List[Any], bool]:
+        values = list(map(ctx.get, self.names, self._defaults))
+        try:
+            # schneller Pfad: nur Zahlen; die Summe ist genau dann endlich, wenn alle es sind
+            total = sum(values)
+            if total - total == 0.0:
+                return values, True
+        except TypeError:
+            pass
+        # None/""/0 -> 0.0 und echte Fehler exakt wie früher
+        values = [float(ctx.get(k, 0.0) or 0.0) for k in self.names]
+        return values, all(map(math.isfinite, values))
+
+    def fill(self, ctx: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Schreibt ``ctx`` in ``out`` (Standard: den internen Puffer) und gibt ihn zurück.
+
+        Der interne Puffer wird beim nächsten Aufruf überschrieben – wer den
+        Vektor behält oder das Schema zwischen Threads teilt, nimmt :meth:`vector`.
+        """
+
+        buf = self._buffer if out is None else out
+        buf[:] = self._values(ctx)[0]
+        return buf
+
+    def vector(self, ctx: Dict[str, Any]) -> np.ndarray:
+        return np.array(self._values(ctx)[0], dtype=float)  # d
+
+    def column(self, ctx: Dict[str, Any]) -> np.ndarray:
+        return self.vector(ctx).reshape(-1, 1)  # d×1
+
+    def matrix(self, ctxs: Sequence[Dict[str, Any]], diagnostics: bool = False) -> Any:
+        """``n×d``-Matrix der Kontexte; mit ``diagnostics=True`` als Tupel
+        ``(X, missing, non_finite)``."""
+
+        ctxs = list(ctxs)
+        rows: List[List[Any]] = []
+        finite = True
+        for ctx in ctxs:
+            values, ok = self._values(ctx)
+            rows.append(values)
+            finite = finite and ok
+        X = np.array(rows, dtype=float).reshape(len(rows), self.dim)  # n×d
+        if not diagnostics:
+            return X
+        return X, self.missing(ctxs), (() if finite else self.non_finite(X))
+
+    def as_dict(self, ctx: Dict[str, Any]) -> Dict[str, float]:
+        return dict(zip(self.names, self.fill(ctx).tolist()))
+
+
+POLICY_SCHEMA = FeatureSchema(FEATURES)
+
+
 def _vec_from_ctx(ctx: Dict[str, float]) -> "np.ndarray":
-    return np.array([float(ctx.get(k, 0.0) or 0.0) for k in FEATURES], dtype=float).reshape(-1, 1)  # d×1
+    return POLICY_SCHEMA.column(ctx)  # d×1
+
+def _matrix_from_ctxs(ctxs: Sequence[Dict[str, float]]) -> "np.ndarray":
+    return POLICY_SCHEMA.matrix(ctxs)  # n×d
 
 # ------------------------------ LinUCB ---------------------------------------
 class LinUCB:
+    """Lineares UCB mit gecachter Inverse.
+
+    ``A⁻¹`` und ``θ = A⁻¹b`` werden in ``learn`` per Sherman–Morrison (Rang 1)
+    nachgeführt; alle ``REFRESH_EVERY`` Updates wird die Inverse über eine
+    Cholesky-Zerlegung von ``A`` neu aufgebaut, damit sich Rundungsfehler
+    nicht aufsummieren. ``predict_ucb`` kostet damit O(d²) statt O(d³).
+    """
+
+    REFRESH_EVERY = 64
+
     def __init__(self, alpha: float = 1.0, l2: float = 1e-3, d: Optional[int] = None):
         self.alpha = float(alpha)
         self.l2 = float(l2)
         self.d = int(d or len(FEATURES))
-        self.A = np.eye(self.d) * self.l2  # d×d
-        self.b = np.zeros((self.d, 1))  # d×1
+        self._A = np.eye(self.d) * self.l2  # d×d
+        self._b = np.zeros((self.d, 1))  # d×1
+        self._A_inv: Optional[np.ndarray] = None
+        self._theta: Optional[np.ndarray] = None
+        self.updates_since_refresh = 0
+
+    # A/b von außen setzen verwirft die gecachte Inverse
+    @property
+    def A(self) -> "np.ndarray":
+        return self._A
+
+    @A.setter
+    def A(self, value: "np.ndarray") -> None:
+        self._A = np.asarray(value, dtype=float)
+        self._A_inv = None
+
+    @property
+    def b(self) -> "np.ndarray":
+        return self._b
+
+    @b.setter
+    def b(self, value: "np.ndarray") -> None:
+        self._b = np.asarray(value, dtype=float)
+        self._theta = None
+
+    def refresh(self) -> None:
+        """Rebuild ``A⁻¹`` and ``θ`` from ``A`` and ``b``."""
+
+        try:
+            L_inv = np.linalg.inv(np.linalg.cholesky(self._A))
+            A_inv = L_inv.T @ L_inv
+        except np.linalg.LinAlgError:
+            A_inv = np.linalg.pinv(self._A)
+        self._A_inv = A_inv
+        self._theta = A_inv @ self._b
+        self.updates_since_refresh = 0
+
+    @property
+    def A_inv(self) -> "np.ndarray":
+        if self._A_inv is None:
+            self.refresh()
+        return self._A_inv  # type: ignore[return-value]
+
+    @property
+    def theta(self) -> "np.ndarray":
+        if self._A_inv is None:
+            self.refresh()
+        elif self._theta is None:
+            self._theta = self._A_inv @ self._b
+        return self._theta  # type: ignore[return-value]
+
+    def fit(self, X: "np.ndarray", rewards: "np.ndarray") -> None:
+        """Baut ``A``/``b`` aus allen Zeilen von ``X`` (n×d) neu auf – wie n× :meth:`learn`."""
+
+        X = np.asarray(X, dtype=float).reshape(-1, self.d)
+        r = np.asarray(rewards, dtype=float).reshape(-1, 1)
+        self._A = np.eye(self.d) * self.l2 + X.T @ X
+        self._b = X.T @ r
+        self.refresh()
 
     def predict_ucb(self, x: "np.ndarray") -> float:
         # x: d×1
-        A_inv = np.linalg.inv(self.A)
-        theta = A_inv @ self.b  # d×1
-        mu = float((theta.T @ x)[0, 0])
-        s = float(math.sqrt((x.T @ A_inv @ x)[0, 0]))
+        A_inv_x = self.A_inv @ x
+        mu = float((self.theta.T @ x)[0, 0])
+        s = float(math.sqrt(max(float((x.T @ A_inv_x)[0, 0]), 0.0)))
+        return mu + self.alpha * s
+
+    def predict_ucb_many(self, X: "np.ndarray") -> "np.ndarray":
+        """UCB for every row of ``X`` (n×d) with two matrix products."""
+
+        mu = (X @ self.theta)[:, 0]
+        s = np.sqrt(np.maximum(np.einsum("ij,ij->i", X @ self.A_inv, X), 0.0))
         return mu + self.alpha * s
 
     def learn(self, x: "np.ndarray", reward: float) -> None:
-        self.A += x @ x.T
-        self.b += float(reward) * x
+        A_inv = self.A_inv
+        self._A += x @ x.T
+        self._b += float(reward) * x
+        self.updates_since_refresh += 1
+        if self.updates_since_refresh >= self.REFRESH_EVERY:
+            self.refresh()
+            return
+        # Sherman–Morrison: (A + xxᵀ)⁻¹ = A⁻¹ − (A⁻¹x)(A⁻¹x)ᵀ / (1 + xᵀA⁻¹x)
+        A_inv_x = A_inv @ x
+        denom = 1.0 + float((x.T @ A_inv_x)[0, 0])
+        A_inv -= (A_inv_x @ A_inv_x.T) / denom
+        self._theta = A_inv @ self._b
+
+    def to_dict(self, include_arrays: bool = True) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "alpha": self.alpha,
+            "l2": self.l2,
+            "d": self.d,
+            "updates_since_refresh": self.updates_since_refresh,
+        }
+        if include_arrays:
+            data.update({"A": self._A.tolist(), "b": self._b.tolist(), "A_inv": self.A_inv.tolist()})
+        return data
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {"alpha": self.alpha, "l2": self.l2, "d": self.d, "A": self.A.tolist(), "b": self.b.tolist()}
+    def arrays(self) -> Dict[str, "np.ndarray"]:
+        return {"A": self._A, "b": self._b, "A_inv": self.A_inv}
 
     @classmethod
     def from_dict(cls, d: Dict[str, Any], *, target_dim: Optional[int] = None) -> "LinUCB":
@@ -137,6 +322,14 @@ class LinUCB:
             obj.b[:min_dim, 0] = stored_b[:min_dim, 0]
         else:
             obj.b = np.zeros((target_dim, 1))
+
+        # Gecachte Inverse nur übernehmen, wenn A unverändert geladen wurde
+        stored_inv = np.array(d.get("A_inv", []), dtype=float)
+        if stored_A.shape == (target_dim, target_dim) and stored_inv.shape == (target_dim, target_dim):
+            if np.all(np.isfinite(stored_inv)):
+                obj._A_inv = stored_inv
+                obj._theta = stored_inv @ obj._b
+                obj.updates_since_refresh = int(d.get("updates_since_refresh", 0) or 0)
         return obj
 
 # ---------------------------- Alpha Model ------------------------------------
@@ -194,7 +387,7 @@ class AlphaModel:
         return (x_raw - self.mean) / std
 
     def _vec(self, ctx: Dict[str, float]) -> np.ndarray:
-        return np.array([float(ctx.get(k, 0.0) or 0.0) for k in FEATURES], dtype=float)
+        return POLICY_SCHEMA.vector(ctx)
 
     def _ensure_weight_shape(self, size: int) -> None:
         if self.weights is None:
@@ -221,6 +414,89 @@ class AlphaModel:
         conf = max(self.min_conf, 1.0 - math.exp(-self.train_count / self.conf_scale))
         return prob, conf
 
+    def predict_many(self, X_raw: np.ndarray) -> Tuple[np.ndarray, float, np.ndarray]:
+        """:meth:`predict` for every row of ``X_raw`` (n×d raw features).
+
+        Returns probabilities, the shared confidence and a mask of rows where
+        the logistic overflows – :meth:`predict` raises for those.
+        """
+
+        x_norm = self._norm(X_raw, update=False)
+        x = np.hstack([x_norm, np.ones((len(x_norm), 1))])
+        self._ensure_weight_shape(x.shape[1])
+        if self.weights is None:
+            prob = np.full(len(x), 0.5)
+            failed = np.zeros(len(x), dtype=bool)
+        else:
+            z = x @ self.weights
+            with np.errstate(over="ignore", invalid="ignore"):
+                e = np.exp(-z)
+            # math.exp wirft nur bei endlichem Überlauf (inf/nan gehen durch)
+            failed = np.isinf(e) & np.isfinite(z)
+            prob = 1.0 / (1.0 + e)
+        prob = np.clip(prob, 1e-4, 1.0 - 1e-4)
+        if len(prob) and not failed[-1]:
+            self.last_prob = float(prob[-1])
+        conf = max(self.min_conf, 1.0 - math.exp(-self.train_count / self.conf_scale))
+        return prob, conf, failed
+
+    def targets(self, rewards: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Ziel, Gewicht und Maske je Reward – vektorisierte Regeln aus :meth:`learn`."""
+
+        r = np.asarray(rewards, dtype=float)
+        margin = self.reward_margin
+        target = np.where(r > margin, 1.0, 0.0)
+        weight = np.clip(np.abs(r), 0.1, 1.0)
+        inner = np.abs(r) <= margin
+        if margin > 0.0:
+            norm = r / margin
+            target = np.where(inner, np.clip(0.5 + 0.5 * norm, 0.05, 0.95), target)
+            weight = np.where(inner, np.maximum(0.05, np.abs(norm)), weight)
+            keep = np.isfinite(r)
+        else:
+            keep = np.isfinite(r) & ~inner
+        return target, weight, keep
+
+    def fit(
+        self,
+        X_raw: np.ndarray,
+        rewards: np.ndarray,
+        *,
+        epochs: int = 40,
+        batch_size: int = 256,
+        seed: int = 0,
+    ) -> int:
+        """Neu-Fit per Mini-Batch-Gradientenabstieg über alle Zeilen; gibt die Zahl genutzter Zeilen zurück.
+
+        Normalisierung aus den Batch-Statistiken, Ziele/Gewichte wie in :meth:`learn`.
+        """
+
+        X_raw = np.asarray(X_raw, dtype=float).reshape(-1, len(FEATURES))
+        target, weight, keep = self.targets(rewards)
+        keep &= np.isfinite(X_raw).all(axis=1)
+        X_raw, target, weight = X_raw[keep], target[keep], weight[keep]
+        n = len(X_raw)
+        if not n:
+            return 0
+        self.mean = X_raw.mean(axis=0)
+        self.m2 = ((X_raw - self.mean) ** 2).sum(axis=0)
+        self.norm_count = float(n)
+        x = np.hstack([self._norm(X_raw, update=False), np.ones((n, 1))])
+        w = np.zeros(x.shape[1], dtype=float)
+        rng = np.random.default_rng(seed)
+        step = max(1, int(batch_size))
+        for _ in range(max(1, int(epochs))):
+            order = rng.permutation(n)
+            for start in range(0, n, step):
+                idx = order[start:start + step]
+                xb = x[idx]
+                prob = 1.0 / (1.0 + np.exp(-np.clip(xb @ w, -500.0, 500.0)))
+                grad = xb.T @ ((prob - target[idx]) * weight[idx]) / len(idx) + self.l2 * w
+                w -= self.lr * grad
+        self.weights = w
+        self.train_count = float(weight.sum())
+        return n
+
     def learn(self, ctx: Dict[str, float], reward: float) -> None:
         if ctx is None:
             return
@@ -252,11 +528,15 @@ class AlphaModel:
         self.train_count += weight
         self.last_prob = float(prob)
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "weights": self.weights.tolist() if self.weights is not None else None,
-            "mean": self.mean.tolist() if self.mean is not None else None,
-            "m2": self.m2.tolist() if self.m2 is not None else None,
+    def to_dict(self, include_arrays: bool = True) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        if include_arrays:
+            data.update({
+                "weights": self.weights.tolist() if self.weights is not None else None,
+                "mean": self.mean.tolist() if self.mean is not None else None,
+                "m2": self.m2.tolist() if self.m2 is not None else None,
+            })
+        data.update({
             "norm_count": self.norm_count,
             "train_count": self.train_count,
             "lr": self.lr,
@@ -264,7 +544,12 @@ class AlphaModel:
             "min_conf": self.min_conf,
             "reward_margin": self.reward_margin,
             "conf_scale": self.conf_scale,
-        }
+        })
+        return data
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        named = {"weights": self.weights, "mean": self.mean, "m2": self.m2}
+        return {name: arr for name, arr in named.items() if arr is not None}
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "AlphaModel":
@@ -309,6 +594,97 @@ class AlphaModel:
         obj.train_count = float(data.get("train_count", 0.0))
         return obj
 
+# -------------------------- Sidecar (.npz) -----------------------------------
+POLICY_FILE_FORMAT = "aster-policy"
+POLICY_FILE_VERSION = 1
+
+
+def _arrays_checksum(arrays: Dict[str, np.ndarray]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        arr = np.ascontiguousarray(arrays[name], dtype=float)
+        digest.update(name.encode())
+        digest.update(repr(arr.shape).encode())
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+def write_policy_arrays(
+    path: str, arrays: Dict[str, np.ndarray], learn_count: Optional[int] = None
+) -> Dict[str, Any]:
+    """Schreibt ``arrays`` atomar als ``.npz`` mit Format-/Versions-Header und SHA-256."""
+
+    arrays = {name: np.asarray(arr, dtype=float) for name, arr in arrays.items()}
+    checksum = _arrays_checksum(arrays)
+    header = json.dumps(
+        {
+            "format": POLICY_FILE_FORMAT,
+            "version": POLICY_FILE_VERSION,
+            "checksum": checksum,
+            "learn_count": learn_count,
+        }
+    )
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        np.savez(fh, __header__=np.array(header), **arrays)
+    os.replace(tmp, path)
+    return {
+        "file": os.path.basename(path),
+        "path": os.path.abspath(path),
+        "version": POLICY_FILE_VERSION,
+        "checksum": checksum,
+        "bytes": os.path.getsize(path),
+        "saved_at": time.time(),
+        "learn_count": learn_count,
+    }
+
+
+def read_policy_arrays(path: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+    """Liest einen Sidecar als ``(arrays, header)``.
+
+    Integrität prüft allein die Prüfsumme im Header des Sidecars; ``None`` bei
+    fehlender Datei, falscher Version oder Prüfsumme.
+    """
+
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            header = json.loads(str(npz["__header__"]))
+            arrays = {name: npz[name] for name in npz.files if name != "__header__"}
+    except Exception:
+        return None
+    if header.get("format") != POLICY_FILE_FORMAT or header.get("version") != POLICY_FILE_VERSION:
+        return None
+    if _arrays_checksum(arrays) != header.get("checksum"):
+        return None
+    return arrays, header
+
+# --------------------------- Warm-Start --------------------------------------
+def training_samples(
+    history: Sequence[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], np.ndarray, List[Optional[str]]]:
+    """(Kontexte, Rewards in R, Größenbuckets) aus ``trade_history``-Einträgen."""
+
+    ctxs: List[Dict[str, Any]] = []
+    rewards: List[float] = []
+    buckets: List[Optional[str]] = []
+    for rec in history or ():
+        if not isinstance(rec, dict):
+            continue
+        ctx = rec.get("context") or rec.get("ctx")
+        if not isinstance(ctx, dict) or not ctx:
+            continue
+        try:
+            reward = float(rec.get("pnl_r"))
+        except (TypeError, ValueError):
+            continue
+        if not math.isfinite(reward):
+            continue
+        ctxs.append(ctx)
+        rewards.append(reward)
+        bucket = rec.get("bucket")
+        buckets.append(bucket if bucket in ("S", "M", "L") else None)
+    return ctxs, np.array(rewards, dtype=float), buckets
+
 # --------------------------- BanditPolicy ------------------------------------
 class BanditPolicy:
     """
@@ -380,6 +756,10 @@ class BanditPolicy:
         # Laufzeit-Stats
         self.n_trades: int = 0
         self.last_trade_ts: float = 0.0
+        self.learn_count: int = 0           # zählt Lernschritte; Sidecar nur bei Änderung schreiben
+        self._sidecar_ref: Optional[Dict[str, Any]] = None
+        # from_state: referenzierter Sidecar fehlte/war kaputt -> Matrizen leer, neu anlernen
+        self.sidecar_missing: bool = False
 
         # Puffer falls Bot Einhänge nicht jedes Mal übergibt
         self._last_ctx: Optional[Dict[str, float]] = None
@@ -407,9 +787,61 @@ class BanditPolicy:
     # ---------- API ----------
     def decide(self, ctx: Dict[str, float]) -> Tuple[str, Dict[str, Any]]:
         x = _vec_from_ctx(ctx)
+        gate_ucb = self.gate.predict_ucb(x)
+        alpha_pred: Optional[Tuple[float, float]] = None
+        if self.alpha:
+            try:
+                alpha_pred = self.alpha.predict(ctx)
+            except Exception:
+                alpha_pred = (0.5, self.alpha_min_conf)
+        size_scores: Optional[Dict[str, float]] = None
+        if self.enable_size:
+            # simple trick: unterschiedliche „Arme“ simulieren mit skaliertem Feature
+            size_scores = {b: self.size.predict_ucb(x * self.size_multipliers[b]) for b in ("S", "M", "L")}
+        return self._decide_scored(ctx, gate_ucb, alpha_pred, size_scores)
+
+    def decide_many(self, ctxs: Sequence[Dict[str, float]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """:meth:`decide` for many candidates at once.
+
+        Gate and size UCBs and alpha probabilities come from one n×d feature
+        matrix; the per-candidate rules (and their random draws, in order) are
+        the same as ``n`` calls to :meth:`decide` without ``note_entry``/
+        ``note_exit`` in between.
+        """
+
+        ctxs = list(ctxs)
+        if not ctxs:
+            return []
+        X = _matrix_from_ctxs(ctxs)
+        gate_ucb = self.gate.predict_ucb_many(X).tolist()
+        alpha_preds: List[Optional[Tuple[float, float]]] = [None] * len(ctxs)
+        if self.alpha:
+            try:
+                probs, conf, failed = self.alpha.predict_many(X)
+                alpha_preds = [
+                    (0.5, self.alpha_min_conf) if bad else (float(prob), conf)
+                    for prob, bad in zip(probs.tolist(), failed.tolist())
+                ]
+            except Exception:
+                alpha_preds = [(0.5, self.alpha_min_conf)] * len(ctxs)
+        size_rows: List[Optional[Dict[str, float]]] = [None] * len(ctxs)
+        if self.enable_size:
+            per_bucket = {b: self.size.predict_ucb_many(X * self.size_multipliers[b]).tolist() for b in ("S", "M", "L")}
+            size_rows = [{b: per_bucket[b][i] for b in ("S", "M", "L")} for i in range(len(ctxs))]
+        return [
+            self._decide_scored(ctx, gate_ucb[i], alpha_preds[i], size_rows[i])
+            for i, ctx in enumerate(ctxs)
+        ]
 
+    def _decide_scored(
+        self,
+        ctx: Dict[str, float],
+        gate_ucb: float,
+        alpha_pred: Optional[Tuple[float, float]],
+        size_scores: Optional[Dict[str, float]],
+    ) -> Tuple[str, Dict[str, Any]]:
         # Gate-Score: wir vergleichen TAKE vs. SKIP=0 baseline
-        take_ucb = self.gate.predict_ucb(x) - self.skip_push
+        take_ucb = gate_ucb - self.skip_push
         event_risk = float(ctx.get("sentinel_event_risk", 0.0) or 0.0)
         hype_score = float(ctx.get("sentinel_hype", 0.0) or 0.0)
         risk_penalty = 0.0
@@ -440,11 +872,8 @@ class BanditPolicy:
         alpha_conf = self.alpha_min_conf
         alpha_ready = False
         alpha_bias = 0.0
-        if self.alpha:
-            try:
-                alpha_prob, alpha_conf = self.alpha.predict(ctx)
-            except Exception:
-                alpha_prob, alpha_conf = 0.5, self.alpha_min_conf
+        if self.alpha and alpha_pred is not None:
+            alpha_prob, alpha_conf = alpha_pred
             alpha_ready = alpha_conf >= self.alpha_min_conf and self.n_trades >= self.alpha_warmup
             if alpha_ready:
                 alpha_bias = (alpha_prob - 0.5) * 2.0
@@ -468,16 +897,11 @@ class BanditPolicy:
             decision = "TAKE" if (gate_score - self.gate_margin) > 0.0 else "SKIP"
 
         # Größe: UCB-Argmax über Buckets (mit leichter Exploration)
-        if not self.enable_size:
+        if not self.enable_size or size_scores is None:
             size_bucket = "S"
             extras: Dict[str, Any] = {"size_bucket": size_bucket}
         else:
-            scores = {}
-            for b in ("S", "M", "L"):
-                # simple trick: unterschiedliche „Arme“ simulieren mit skaliertem Feature
-                xb = x * self.size_multipliers[b]
-                scores[b] = self.size.predict_ucb(xb)
-
+            scores = dict(size_scores)
             size_choice_reason = "ucb"
             if random.random() < self.eps_size:
                 size_bucket = random.choices(("S", "M", "L"), weights=(0.25, 0.35, 0.40))[0]
@@ -617,12 +1041,64 @@ class BanditPolicy:
                 self.size.learn(xb, reward)
             except Exception:
                 pass
+        self.learn_count += 1
+
+    # ---------- Offline-Warm-Start ----------
+    def warm_start(
+        self,
+        ctxs: Sequence[Dict[str, Any]],
+        rewards: Sequence[float],
+        buckets: Optional[Sequence[Optional[str]]] = None,
+        **alpha_fit: Any,
+    ) -> Dict[str, Any]:
+        """Trainiert Gate/Size/Alpha in einem Rutsch neu aus gespeicherten Trades.
+
+        Gate und Size bekommen ``A``/``b`` aus einem ``XᵀX``-Produkt (identisch zu
+        n× ``learn``), Alpha einen Mini-Batch-Fit. Zeilen mit NaN/inf werden
+        verworfen. Danach gilt der Warmup als durchlaufen, soweit Trades da sind.
+        Die Zusammenfassung nennt die betroffenen Features (``non_finite``) und
+        die, die in mindestens einem Kontext fehlten und als 0 eingingen
+        (``missing``).
+        """
+
+        t0 = time.perf_counter()
+        X, missing_names, non_finite_names = POLICY_SCHEMA.matrix(ctxs, diagnostics=True)
+        non_finite = list(non_finite_names)
+        missing = list(missing_names)
+        r = np.asarray(rewards, dtype=float).reshape(-1)
+        ok = np.isfinite(X).all(axis=1) & np.isfinite(r)
+        self.gate.fit(X[ok], r[ok])
+
+        size_rows = 0
+        if buckets is not None:
+            scale = np.array([self.size_multipliers.get(b, 0.0) if isinstance(b, str) else 0.0 for b in buckets])
+            has_bucket = ok & (scale > 0.0)
+            size_rows = int(has_bucket.sum())
+            self.size.fit(X[has_bucket] * scale[has_bucket, None], r[has_bucket])
+
+        alpha_rows = 0
+        if self.alpha:
+            alpha_rows = self.alpha.fit(X[ok], r[ok], **alpha_fit)
+
+        samples = int(ok.sum())
+        self.n_trades = max(self.n_trades, samples)
+        self.feature_names = tuple(FEATURES)
+        self.learn_count += 1
+        return {
+            "samples": samples,
+            "dropped": int(len(r) - samples),
+            "non_finite": non_finite,
+            "missing": missing,
+            "size_samples": size_rows,
+            "alpha_samples": alpha_rows,
+            "seconds": time.perf_counter() - t0,
+        }
 
     # ---------- Persistence (optional) ----------
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, include_arrays: bool = True) -> Dict[str, Any]:
         data = {
-            "gate": self.gate.to_dict(),
-            "size": self.size.to_dict(),
+            "gate": self.gate.to_dict(include_arrays),
+            "size": self.size.to_dict(include_arrays),
             "features": list(self.feature_names),
             "gate_alpha": self.gate.alpha,
             "size_alpha": self.size.alpha,
@@ -648,11 +1124,91 @@ class BanditPolicy:
         }
         if self.alpha:
             try:
-                data["alpha"] = self.alpha.to_dict()
+                data["alpha"] = self.alpha.to_dict(include_arrays)
             except Exception:
                 pass
         return data
 
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Alle Matrizen/Vektoren flach benannt (``gate.A``, ``alpha.weights``, …)."""
+
+        out: Dict[str, np.ndarray] = {}
+        parts: List[Tuple[str, Any]] = [("gate", self.gate), ("size", self.size)]
+        if self.alpha:
+            parts.append(("alpha", self.alpha))
+        for prefix, model in parts:
+            for name, arr in model.arrays().items():
+                out[f"{prefix}.{name}"] = arr
+        return out
+
+    def to_state(self, path: str) -> Dict[str, Any]:
+        """Kompakter State-Eintrag; Matrizen landen im ``.npz``-Sidecar unter ``path``.
+
+        Der Sidecar wird nur neu geschrieben, wenn seit dem letzten Schreiben
+        gelernt wurde (oder die Datei fehlt).
+        """
+
+        data = self.to_dict(include_arrays=False)
+        ref = self._sidecar_ref
+        if (
+            ref is None
+            or ref.get("learn_count") != self.learn_count
+            or ref.get("path") != os.path.abspath(path)
+            or not os.path.exists(path)
+        ):
+            ref = write_policy_arrays(path, self.arrays(), learn_count=self.learn_count)
+            self._sidecar_ref = ref
+        data["learn_count"] = self.learn_count
+        data["arrays"] = {k: v for k, v in ref.items() if k != "path"}
+        return data
+
+    @classmethod
+    def from_state(cls, d: Dict[str, Any], path: Optional[str] = None, **overrides) -> "BanditPolicy":
+        """Gegenstück zu :meth:`to_state`; alte States mit Inline-Matrizen laden weiter.
+
+        Lässt sich ein referenzierter Sidecar nicht lesen, startet die Policy
+        untrainiert (``n_trades``/``learn_count`` = 0, also wieder im Warmup)
+        und setzt :attr:`sidecar_missing`, damit der Aufrufer neu anlernt.
+        """
+
+        ref = d.get("arrays") if isinstance(d, dict) else None
+        if not isinstance(ref, dict) or not path:
+            obj = cls.from_dict(d, **overrides)
+            obj.learn_count = int(d.get("learn_count", 0) or 0)
+            return obj
+        merged = dict(d)
+        learn_count = int(d.get("learn_count", 0) or 0)
+        # Die Referenz im JSON ist nur informativ: stürzt der Bot zwischen
+        # Sidecar- und JSON-Schreiben ab, ist der Sidecar neuer und trotzdem gültig.
+        loaded = read_policy_arrays(path)
+        if loaded is not None:
+            arrays, header = loaded
+            for key, arr in arrays.items():
+                prefix, _, name = key.partition(".")
+                if isinstance(merged.get(prefix), dict):
+                    merged[prefix] = dict(merged[prefix], **{name: arr})
+        obj = cls.from_dict(merged, **overrides)
+        obj.learn_count = learn_count
+        if loaded is None:
+            obj.sidecar_missing = True
+            obj.n_trades = 0
+            obj.learn_count = 0
+        else:
+            sidecar_count = header.get("learn_count")
+            if sidecar_count is None and header.get("checksum") == ref.get("checksum"):
+                sidecar_count = ref.get("learn_count")
+            if isinstance(sidecar_count, int) and sidecar_count >= learn_count:
+                # Sidecar entspricht dem geladenen Stand -> nicht gleich neu schreiben
+                obj.learn_count = sidecar_count
+                obj._sidecar_ref = dict(
+                    ref,
+                    checksum=header.get("checksum"),
+                    learn_count=sidecar_count,
+                    bytes=os.path.getsize(path),
+                    path=os.path.abspath(path),
+                )
+        return obj
+
     @classmethod
     def from_dict(cls, d: Dict[str, Any], **overrides) -> "BanditPolicy":
         gate_alpha = float(overrides.get("gate_alpha", d.get("gate_alpha", 1.6)))
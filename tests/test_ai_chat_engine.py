@@ -57,7 +57,7 @@ def test_responses_payload_normalises_text(monkeypatch: pytest.MonkeyPatch, engi
         captured["payload"] = json
         return DummyResponse()
 
-    monkeypatch.setattr("dashboard_server.requests.post", fake_post)
+    monkeypatch.setattr("dashboard_server.http_client.post", fake_post)
 
     messages = [
         {"role": "system", "content": " system "},
@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pytest
+
+from ml_policy import FEATURES, BanditPolicy
+
+
+def _ctx(rng) -> dict:
+    ctx = {name: float(rng.normal(0.0, 1.0)) for name in FEATURES if rng.random() < 0.6}
+    ctx["event_risk"] = float(rng.random())
+    ctx["playbook_risk_bias"] = float(rng.uniform(0.7, 1.4))
+    return ctx
+
+
+def _trained_policy(seed: int = 3) -> BanditPolicy:
+    rng = np.random.default_rng(seed)
+    policy = BanditPolicy(alpha_enabled=True, alpha_warmup=5, warmup_trades=10)
+    policy.eps_gate = 0.1
+    for _ in range(30):
+        ctx = _ctx(rng)
+        bucket = ("S", "M", "L")[int(rng.integers(3))]
+        policy.note_entry("BTCUSDT", ctx=ctx, size_bucket=bucket)
+        policy.note_exit("BTCUSDT", ctx=ctx, size_bucket=bucket, pnl_r=float(rng.normal(0.1, 1.0)))
+    return policy
+
+
+def _assert_same(left, right) -> None:
+    assert left[0] == right[0]
+    assert left[1].keys() == right[1].keys()
+    for key, value in left[1].items():
+        if isinstance(value, float):
+            assert value == pytest.approx(right[1][key], rel=1e-9, abs=1e-12), key
+        elif isinstance(value, dict):
+            assert value == pytest.approx(right[1][key], rel=1e-9, abs=1e-12), key
+        else:
+            assert value == right[1][key], key
+
+
+@pytest.mark.parametrize("alpha_enabled", [True, False])
+def test_decide_many_matches_sequential_decide(alpha_enabled):
+    policy = _trained_policy()
+    if not alpha_enabled:
+        policy.alpha = None
+    rng = np.random.default_rng(11)
+    ctxs = [_ctx(rng) for _ in range(40)]
+
+    random.seed(5)
+    single = [policy.decide(ctx) for ctx in ctxs]
+    random.seed(5)
+    batched = policy.decide_many(ctxs)
+
+    assert len(batched) == len(single)
+    for got, want in zip(batched, single):
+        _assert_same(got, want)
+    if alpha_enabled:
+        assert {decision for decision, _ in single} == {"TAKE", "SKIP"}
+
+
+def test_decide_many_falls_back_like_decide_when_alpha_overflows():
+    policy = _trained_policy()
+    policy.alpha.weights = np.full(len(FEATURES) + 1, -1e6)
+    ctxs = [{name: 1.0 for name in FEATURES}, {}]
+
+    random.seed(1)
+    single = [policy.decide(ctx) for ctx in ctxs]
+    random.seed(1)
+    batched = policy.decide_many(ctxs)
+
+    assert single[0][1]["alpha_prob"] == 0.5
+    for got, want in zip(batched, single):
+        _assert_same(got, want)
+    assert policy.decide_many([]) == []
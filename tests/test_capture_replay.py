@@ -0,0 +1,274 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot as bot
+import http_client
+from aster_multi_bot import ReplayExchange, ReplayMiss
+from brackets_guard import BracketGuard
+
+
+class _Response:
+    def __init__(self, body):
+        self.body = body
+        self.status_code = 200
+        self.headers = {}
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def capture(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    log = http_client.CaptureLog(tmp_path / "capture.jsonl.gz")
+    previous = http_client.set_capture_log(log)
+    yield log
+    log.close()
+    http_client.set_capture_log(previous)
+
+
+def _record_session(capture, monkeypatch):
+    monkeypatch.setattr(bot, "PAPER", False)
+    live = bot.Exchange("https://fapi.example.com", api_key="key", api_secret="secret")
+    prices = iter(["100.0", "101.5"])
+    live.s.get = lambda url, **kw: _Response({"symbol": "BTCUSDT", "price": next(prices)})
+    live.s.post = lambda url, **kw: _Response({"orderId": 7, "status": "NEW"})
+
+    now = {"t": 1_700_000_000.0}
+    monkeypatch.setattr(http_client.time, "time", lambda: now["t"])
+    first = live.get("/fapi/v1/ticker/price", {"symbol": "BTCUSDT"})
+    now["t"] += 5
+    order = live.signed("post", "/fapi/v1/order", {"symbol": "BTCUSDT", "side": "BUY"})
+    now["t"] += 4
+    second = live.get("/fapi/v1/ticker/price", {"symbol": "BTCUSDT"})
+    monkeypatch.undo()
+    capture.close()
+    return first, order, second
+
+
+def test_capture_is_append_only_gzip_and_strips_signing_params(capture, monkeypatch):
+    _record_session(capture, monkeypatch)
+    records = list(http_client.CaptureLog.read(capture.path))
+
+    assert [(r["source"], r["method"], r["path"]) for r in records] == [
+        ("rest", "GET", "/fapi/v1/ticker/price"),
+        ("signed", "POST", "/fapi/v1/order"),
+        ("rest", "GET", "/fapi/v1/ticker/price"),
+    ]
+    assert records[1]["params"] == '{"side":"BUY","symbol":"BTCUSDT"}'
+    assert [r["t"] for r in records] == [1_700_000_000.0, 1_700_000_005.0, 1_700_000_009.0]
+
+    capture.record("guard", "GET", "/fapi/v1/openOrders", {"timestamp": 1}, [])
+    capture.close()
+    assert len(list(http_client.CaptureLog.read(capture.path))) == 4
+
+
+def test_replay_serves_responses_in_order_with_simulated_clock(capture, monkeypatch):
+    first, order, second = _record_session(capture, monkeypatch)
+    replay = ReplayExchange(capture.path)
+
+    assert replay.clock.time() == 1_700_000_000.0
+    assert replay.get("/fapi/v1/ticker/price", {"symbol": "BTCUSDT"}) == first
+    assert replay.signed("POST", "/fapi/v1/order", {"side": "BUY", "symbol": "BTCUSDT", "timestamp": 5}) == order
+    assert replay.clock.time() == 1_700_000_005.0
+    assert replay.get("/fapi/v1/ticker/price", {"symbol": "BTCUSDT"}) == second
+    assert replay.remaining() == 0
+    # Exhausted keys keep serving their last response.
+    assert replay.get("/fapi/v1/ticker/price", {"symbol": "BTCUSDT"}) == second
+
+    replay.clock.sleep(2.5)
+    assert replay.clock.time() == pytest.approx(1_700_000_011.5)
+    with pytest.raises(ReplayMiss):
+        replay.get("/fapi/v1/ticker/price", {"symbol": "ETHUSDT"})
+
+
+def test_replay_reads_the_seed_from_the_capture_header(capture, monkeypatch):
+    capture.write_header(seed=4242)
+    _record_session(capture, monkeypatch)
+    replay = ReplayExchange(capture.path)
+
+    assert replay.seed == 4242
+    # The header is metadata, not a response or the start of the clock.
+    assert replay.records == 3
+    assert replay.clock.time() == 1_700_000_000.0
+
+
+def test_replay_without_header_seeds_from_the_first_timestamp(capture, monkeypatch):
+    _record_session(capture, monkeypatch)
+
+    assert ReplayExchange(capture.path).seed == 1_700_000_000
+
+
+def test_guard_requests_replay_without_network(capture, monkeypatch):
+    body = {"symbols": [{"symbol": "BTCUSDT", "filters": [{"filterType": "PRICE_FILTER", "tickSize": "0.1"}]}]}
+    capture.record("guard", "GET", "/fapi/v1/exchangeInfo", {}, body, ts=1_700_000_000.0)
+    capture.record("rest", "GET", "/fapi/v1/exchangeInfo", {}, body, ts=1_700_000_000.0)
+    capture.close()
+
+    def _no_network(*_args, **_kwargs):
+        raise AssertionError("replay must not touch the network")
+
+    monkeypatch.setattr(http_client.session(), "request", _no_network)
+    replay = ReplayExchange(capture.path)
+    lite = replay.guard_exchange()
+    assert lite.get_exchange_info() == body
+
+    guard = BracketGuard(exchange=lite, state_file=os.devnull, queue_file=os.devnull)
+    assert guard.ex is lite
+
+
+def test_installed_clock_delegates_to_the_real_time_module(monkeypatch):
+    clock = bot.ReplayClock(1_700_000_000.0)
+    monkeypatch.setattr(bot, "time", clock)
+    assert bot.time.time() == 1_700_000_000.0
+    assert bot.time.monotonic() > 0.0
+    assert bot.time.perf_counter() > 0.0
+
+
+_SYMBOLS = ("BTCUSDT", "ETHUSDT", "SOLUSDT")
+
+
+def _kline_rows(params):
+    import numpy as np
+
+    n = int(params.get("limit", 500))
+    step = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}.get(params.get("interval"), 300) * 1000
+    rng = np.random.default_rng(_SYMBOLS.index(params.get("symbol", "BTCUSDT")) + 1)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    end = 1_700_000_000_000
+    return [
+        [end - (n - i) * step, str(c), str(c * 1.01), str(c * 0.99), str(c), "1000", end - (n - i - 1) * step - 1, "100000", 10, "500", "50000", "0"]
+        for i, c in enumerate(closes)
+    ]
+
+
+class _FakeVenue:
+    """Minimal REST venue for a full Bot cycle; records every request it serves."""
+
+    def __init__(self):
+        self.calls = []
+
+    def _route(self, method, url, params=None, **_kw):
+        from urllib.parse import parse_qsl, urlparse
+
+        parsed = urlparse(url)
+        path = parsed.path
+        query = dict(params or {})
+        query.update(parse_qsl(parsed.query))
+        self.calls.append((method, path))
+
+        def _rows(rows):
+            return rows if "symbol" not in query else next(r for r in rows if r["symbol"] == query["symbol"])
+
+        if path.endswith("exchangeInfo"):
+            filters = [
+                {"filterType": "PRICE_FILTER", "tickSize": "0.01", "minPrice": "0.01", "maxPrice": "1000000"},
+                {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "10000"},
+                {"filterType": "MIN_NOTIONAL", "notional": "5"},
+            ]
+            body = {
+                "symbols": [
+                    {"symbol": s, "status": "TRADING", "quoteAsset": "USDT", "baseAsset": s[:-4], "contractType": "PERPETUAL", "filters": filters}
+                    for s in _SYMBOLS
+                ]
+            }
+        elif path.endswith("ticker/24hr"):
+            body = _rows([
+                {"symbol": s, "quoteVolume": "50000000", "volume": "1000", "lastPrice": "100", "priceChangePercent": "2.5",
+                 "highPrice": "105", "lowPrice": "95", "openPrice": "98"}
+                for s in _SYMBOLS
+            ])
+        elif path.endswith("klines"):
+            body = _kline_rows(query)
+        elif path.endswith("premiumIndex"):
+            body = _rows([{"symbol": s, "markPrice": "100", "indexPrice": "100", "lastFundingRate": "0.0001"} for s in _SYMBOLS])
+        elif path.endswith("depth"):
+            levels = range(1, 50)
+            body = {"lastUpdateId": 1, "bids": [[f"{100 - i * 0.01:.2f}", "5"] for i in levels], "asks": [[f"{100 + i * 0.01:.2f}", "5"] for i in levels]}
+        elif path.endswith("bookTicker"):
+            body = _rows([{"symbol": s, "bidPrice": "99.99", "askPrice": "100.01", "bidQty": "5", "askQty": "5"} for s in _SYMBOLS])
+        elif path.endswith("ticker/price"):
+            body = _rows([{"symbol": s, "price": "100"} for s in _SYMBOLS])
+        elif "account" in path:
+            body = {"totalWalletBalance": "1000", "availableBalance": "1000", "assets": [], "positions": []}
+        elif any(token in path for token in ("openOrders", "positionRisk", "userTrades", "allOrders", "income", "balance")):
+            body = []
+        else:
+            body = {}
+        return _Response(body)
+
+    def get(self, url, **kw):
+        return self._route("GET", url, **kw)
+
+    def post(self, url, **kw):
+        return self._route("POST", url, **kw)
+
+    def delete(self, url, **kw):
+        return self._route("DELETE", url, **kw)
+
+    def request(self, method, url, **kw):
+        return self._route(method, url, **kw)
+
+
+def test_captured_cycle_replays_without_network(tmp_path, monkeypatch, capture):
+    import brackets_guard
+
+    venue = _FakeVenue()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(http_client, "new_session", lambda **_kw: venue)
+    monkeypatch.setattr(http_client, "_SESSION", venue)
+    monkeypatch.setattr(bot, "STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr(bot, "API_KEY", "key")
+    monkeypatch.setattr(bot, "API_SECRET", "secret")
+    monkeypatch.setattr(bot, "PAPER", False)
+    monkeypatch.setattr(bot, "MARKET_STREAM_ENABLED", True)
+    monkeypatch.setattr(bot, "DEPTH_STREAM_ENABLED", True)
+    monkeypatch.setattr(bot, "USER_STREAM_ENABLED", True)
+    # install_clock() rebinds these; let monkeypatch restore them afterwards
+    monkeypatch.setattr(bot, "time", bot.time)
+    monkeypatch.setattr(brackets_guard, "time", brackets_guard.time)
+
+    live = bot.Bot()
+    live_draw = bot.random.random()
+    assert live.market_stream is None and live.depth_books is None and live.user_stream is None
+    assert live.sentinel.news_enabled is False
+    assert live.exchange.metadata.cache_file is None
+    live.run_once()
+    capture.close()
+    live_stats = dict(live.state["decision_stats"]["rejected"])
+    assert sum(live_stats.values()) == len(_SYMBOLS)
+
+    venue.calls.clear()
+    (tmp_path / "state.json").unlink()
+    monkeypatch.setattr(bot, "REPLAY_FILE", str(capture.path))
+    replayed = bot.Bot()
+    assert replayed.rng_seed == live.rng_seed
+    assert bot.random.random() == live_draw
+    replayed.run_once()
+
+    assert venue.calls == []
+    assert replayed.state["decision_stats"]["rejected"] == live_stats
+
+
+def test_capture_builds_the_ai_advisor_disabled(tmp_path, monkeypatch, capture):
+    venue = _FakeVenue()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(http_client, "new_session", lambda **_kw: venue)
+    monkeypatch.setattr(http_client, "_SESSION", venue)
+    monkeypatch.setattr(bot, "STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr(bot, "PAPER", False)
+    monkeypatch.setattr(bot, "AI_MODE_ENABLED", True)
+    monkeypatch.setattr(bot, "OPENAI_API_KEY", "sk-test")
+
+    captured = bot.Bot()
+
+    assert captured.ai_advisor is not None and captured.ai_advisor.enabled is False
+    capture.close()
+    header = next(iter(http_client.CaptureLog.read(capture.path)))
+    assert header["source"] == "header" and header["body"] == {"seed": captured.rng_seed}
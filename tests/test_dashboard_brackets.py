@@ -22,7 +22,10 @@ class _DummyResponse:
 
 
 def test_fetch_position_brackets_accepts_take_profit_with_hyphen(monkeypatch):
+    calls = []
+
     def fake_get(url, headers, timeout):
+        calls.append((url, headers))
         payload = [
             {
                 "type": "Take-Profit-Market",
@@ -34,7 +37,7 @@ def test_fetch_position_brackets_accepts_take_profit_with_hyphen(monkeypatch):
         ]
         return _DummyResponse(payload)
 
-    monkeypatch.setattr(dashboard_server.requests, "get", fake_get)
+    monkeypatch.setattr(dashboard_server.http_client, "get", fake_get)
 
     env = {
         "ASTER_EXCHANGE_BASE": "https://example.invalid",
@@ -44,6 +47,12 @@ def test_fetch_position_brackets_accepts_take_profit_with_hyphen(monkeypatch):
 
     result = dashboard_server._fetch_position_brackets(env, ["DOGEUSDT"], 5000)
 
+    url, headers = calls[0]
+    query = url.split("?", 1)[1]
+    unsigned, _, signature = query.rpartition("&signature=")
+    assert signature == dashboard_server.http_client.hmac_signature("s", unsigned)
+    assert headers["X-MBX-APIKEY"] == "k"
+
     assert "DOGEUSDT" in result
     bucket = result["DOGEUSDT"].get("BUY")
     assert bucket is not None
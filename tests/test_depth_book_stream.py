@@ -0,0 +1,140 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot as bot
+
+
+@pytest.fixture(autouse=True)
+def _reset_ws_env(monkeypatch):
+    monkeypatch.delenv("ASTER_WS_BASE", raising=False)
+    monkeypatch.delenv("ASTER_WS_MARKET_PATH", raising=False)
+
+
+def _make_stream(**kwargs) -> bot.DepthBookStream:
+    stream = bot.DepthBookStream(bot.Exchange("https://fapi.asterdex.com", api_key="", api_secret=""), **kwargs)
+    stream._connected.set()
+    return stream
+
+
+def _diff(symbol: str, first: int, last: int, prev: int, bids=(), asks=()) -> dict:
+    data = {"e": "depthUpdate", "s": symbol, "U": first, "u": last, "pu": prev, "b": list(bids), "a": list(asks)}
+    return {"stream": f"{symbol.lower()}@depth", "data": data}
+
+
+SNAPSHOT = {
+    "lastUpdateId": 100,
+    "bids": [["99.5", "2"], ["99.0", "3"], ["98.5", "1"]],
+    "asks": [["100.0", "1"], ["100.5", "4"], ["101.0", "2"]],
+}
+
+
+def test_depth_stream_url_lists_watched_symbols():
+    stream = _make_stream()
+    assert stream._build_url(["BTCUSDT", "ETHUSDT"]) == (
+        "wss://fstream.asterdex.com/stream?streams=btcusdt@depth/ethusdt@depth"
+    )
+
+
+def test_snapshot_and_buffered_diffs_build_the_local_book():
+    stream = _make_stream()
+    assert stream.watch("btcusdt") is False
+    stream._handle_payload(_diff("BTCUSDT", 90, 95, 89, bids=[["99.5", "9"]]))
+    stream._handle_payload(_diff("BTCUSDT", 96, 104, 95, bids=[["99.5", "5"]], asks=[["100.0", "0"]]))
+    assert stream.book("BTCUSDT") is None
+
+    assert stream.seed("BTCUSDT", SNAPSHOT) is True
+    stream._handle_payload(_diff("BTCUSDT", 105, 110, 104, bids=[["99.8", "1"]], asks=[["100.2", "3"]]))
+
+    book = stream.book("BTCUSDT")
+    # The event ending before the snapshot is dropped; the straddling one and its successor apply.
+    assert book["bids"].tolist() == [[99.8, 1.0], [99.5, 5.0], [99.0, 3.0], [98.5, 1.0]]
+    assert book["asks"].tolist() == [[100.2, 3.0], [100.5, 4.0], [101.0, 2.0]]
+    assert book["lastUpdateId"] == 110
+    assert stream.stats()["synced"] == 1
+
+
+def test_sequence_gap_drops_the_book_until_the_next_snapshot():
+    stream = _make_stream()
+    stream.watch("BTCUSDT")
+    stream._handle_payload(_diff("BTCUSDT", 98, 101, 97))
+    assert stream.seed("BTCUSDT", SNAPSHOT) is True
+
+    stream._handle_payload(_diff("BTCUSDT", 120, 125, 118, bids=[["99.9", "1"]]))
+    assert stream.book("BTCUSDT") is None
+    assert stream.needs_snapshot("BTCUSDT")
+    assert stream.stats()["resyncs"] == 1
+
+    assert stream.seed("BTCUSDT", dict(SNAPSHOT, lastUpdateId=122)) is True
+    assert stream.book("BTCUSDT")["bids"][0].tolist() == [99.9, 1.0]
+
+
+def test_watch_cap_unsubscribes_least_recently_read_symbol():
+    stream = _make_stream(max_symbols=2)
+    sent = []
+    stream._ws_app = type("_App", (), {"send": lambda _self, message: sent.append(message)})()
+    stream.watch("BTCUSDT")
+    stream.watch("ETHUSDT")
+    stream.watch("BTCUSDT")
+    stream.watch("SOLUSDT")
+
+    assert list(stream._books) == ["BTCUSDT", "SOLUSDT"]
+    assert '"UNSUBSCRIBE"' in sent[-2] and "ethusdt@depth" in sent[-2]
+    assert '"SUBSCRIBE"' in sent[-1] and "solusdt@depth" in sent[-1]
+
+
+def test_truncated_snapshot_bounds_served_levels_and_reseeds():
+    stream = _make_stream(depth=5, snapshot_limit=8)
+    stream.watch("BTCUSDT")
+    deep = {
+        "lastUpdateId": 100,
+        "bids": [[str(99 - i), "1"] for i in range(8)],
+        "asks": [[str(100 + i), "1"] for i in range(8)],
+    }
+    # A diff far below the snapshot's deepest bid is real but cannot be placed in a complete book.
+    stream._handle_payload(_diff("BTCUSDT", 99, 101, 98, bids=[["50", "9"]]))
+    assert stream.seed("BTCUSDT", deep, limit=8) is True
+    assert stream.book("BTCUSDT")["bids"][:, 0].tolist() == [99.0, 98.0, 97.0, 96.0, 95.0]
+
+    # Bids taken out down to the seeded floor leave fewer than ``depth`` known levels.
+    stream._handle_payload(_diff("BTCUSDT", 102, 102, 101, bids=[[str(99 - i), "0"] for i in range(4)]))
+    assert stream.book("BTCUSDT") is None
+    assert stream.needs_snapshot("BTCUSDT")
+    assert stream.stats()["reseeds"] == 1
+
+
+class _DepthExchange:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.limits = []
+
+    def get_order_book(self, symbol: str, limit: int = 100) -> dict:
+        self.calls += 1
+        self.limits.append(limit)
+        return SNAPSHOT
+
+
+def test_strategy_switches_from_rest_to_streamed_books():
+    exchange = _DepthExchange()
+    strategy = bot.Strategy(exchange=exchange)
+    strategy._orderbook_ttl = 0.0
+    strategy.depth_books = _make_stream()
+
+    strategy.prefetch_order_books(["BTCUSDT"])
+    assert exchange.calls == 1 and strategy.depth_books.needs_snapshot("BTCUSDT")
+
+    strategy.depth_books._handle_payload(_diff("BTCUSDT", 99, 103, 98, asks=[["100.0", "7"]]))
+    strategy._orderbook_cache.clear()
+    strategy.prefetch_order_books(["BTCUSDT"])
+    assert exchange.calls == 2
+    assert exchange.limits == [strategy.orderbook_limit, strategy.depth_books.snapshot_limit]
+
+    books = strategy.prefetch_order_books(["BTCUSDT"])
+    assert exchange.calls == 2
+    assert books["BTCUSDT"]["asks"][0].tolist() == [100.0, 7.0]
+    assert strategy.get_cached_order_book("BTCUSDT")["asks"][0].tolist() == [100.0, 7.0]
+    features = strategy._order_book_features("BTCUSDT")
+    assert features["lob_levels"] == 3.0
@@ -0,0 +1,112 @@
+import os
+import sys
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import exchange_metadata
+from exchange_metadata import ExchangeMetadata
+from aster_multi_bot import SymbolUniverse
+
+
+def _info(symbols: List[str], server_time: int = 1) -> Dict[str, Any]:
+    return {
+        "serverTime": server_time,
+        "symbols": [
+            {
+                "symbol": sym,
+                "quoteAsset": "USDT",
+                "status": "TRADING",
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "tickSize": "0.01", "minPrice": "0.01", "maxPrice": "100000"},
+                    {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "1000"},
+                    {"filterType": "MIN_NOTIONAL", "notional": "5"},
+                ],
+            }
+            for sym in symbols
+        ],
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch):
+    state = {"now": 1_700_000_000.0}
+    monkeypatch.setattr(exchange_metadata.time, "time", lambda: state["now"])
+    return state
+
+
+class _Fetcher:
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.payload = payload
+        self.calls = 0
+
+    def __call__(self) -> Dict[str, Any]:
+        self.calls += 1
+        return self.payload
+
+
+def test_payload_is_parsed_once_and_served_within_ttl(clock, tmp_path):
+    fetch = _Fetcher(_info(["BTCUSDT", "ETHUSDT"]))
+    metadata = ExchangeMetadata(fetch, base_url="https://x", ttl=60, cache_file=tmp_path / "info.json")
+
+    btc = metadata.symbol_filters("btcusdt")
+    assert btc["tickSize"] == pytest.approx(0.01)
+    assert btc["stepSize"] == pytest.approx(0.001)
+    assert btc["minNotional"] == pytest.approx(5.0)
+    assert metadata.symbols("USDT") == ["BTCUSDT", "ETHUSDT"]
+    clock["now"] += 30
+    metadata.info()
+    assert fetch.calls == 1
+
+
+def test_change_detection_ignores_server_time(clock, tmp_path):
+    fetch = _Fetcher(_info(["BTCUSDT"], server_time=1))
+    metadata = ExchangeMetadata(fetch, base_url="https://x", ttl=60, cache_file=tmp_path / "info.json")
+    assert metadata.refresh() is True
+    digest = metadata.digest
+
+    clock["now"] += 61
+    fetch.payload = _info(["BTCUSDT"], server_time=2)
+    assert metadata.refresh() is False
+    assert metadata.digest == digest
+
+    clock["now"] += 61
+    fetch.payload = _info(["BTCUSDT", "SOLUSDT"], server_time=3)
+    assert metadata.refresh() is True
+    assert metadata.changes == 1
+
+
+def test_second_process_reuses_disk_cache(clock, tmp_path):
+    cache_file = tmp_path / "info.json"
+    ExchangeMetadata(_Fetcher(_info(["BTCUSDT"])), base_url="https://x", ttl=60, cache_file=cache_file).info()
+
+    fetch = _Fetcher(_info(["OTHERUSDT"]))
+    reader = ExchangeMetadata(fetch, base_url="https://x", ttl=60, cache_file=cache_file)
+    assert reader.symbols() == ["BTCUSDT"]
+    assert fetch.calls == 0
+
+    other_venue = ExchangeMetadata(fetch, base_url="https://y", ttl=60, cache_file=cache_file)
+    assert other_venue.symbols() == ["OTHERUSDT"]
+
+
+def test_universe_skips_rediff_when_payload_unchanged(clock, tmp_path):
+    class _Exchange:
+        def __init__(self) -> None:
+            self.fetch = _Fetcher(_info(["ETHUSDT", "BTCUSDT"]))
+            self.metadata = ExchangeMetadata(self.fetch, base_url="https://x", ttl=60, cache_file=None)
+
+    exchange = _Exchange()
+    universe = SymbolUniverse(exchange, "USDT", 0, set(), rotate=False)
+    assert universe.refresh() == ["BTCUSDT", "ETHUSDT"]
+    normalize_calls = []
+    original = universe._normalize_symbols
+    universe._normalize_symbols = lambda symbols: normalize_calls.append(1) or original(symbols)
+
+    assert universe.refresh() == ["BTCUSDT", "ETHUSDT"]
+    assert not normalize_calls
+
+    universe.exclude.add("ETHUSDT")
+    assert universe.refresh() == ["BTCUSDT"]
+    assert len(normalize_calls) == 1
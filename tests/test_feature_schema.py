@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from ai_extensions import PostmortemLearning
+from ml_policy import FEATURES, POLICY_SCHEMA, FeatureSchema
+
+
+def _legacy(ctx):
+    return [float(ctx.get(k, 0.0) or 0.0) for k in FEATURES]
+
+
+CTXS = [
+    {},
+    {name: float(i) for i, name in enumerate(FEATURES)},
+    {"adx": None, "rsi": "", "funding": "0.25", "trend": True, "unrelated": "x"},
+    {"adx": float("nan"), "atr_pct": float("inf"), "rsi": 55},
+]
+
+
+@pytest.mark.parametrize("ctx", CTXS)
+def test_vector_matches_legacy_coercion(ctx):
+    got = POLICY_SCHEMA.vector(ctx)
+    assert np.array_equal(got, _legacy(ctx), equal_nan=True)
+    assert POLICY_SCHEMA.column(ctx).shape == (len(FEATURES), 1)
+
+
+def test_fill_reuses_buffer_without_keeping_the_context():
+    schema = FeatureSchema(("a", "b", "c"))
+    ctx = {"a": 1.0, "c": float("nan")}
+    first = schema.fill(ctx)
+    second = schema.fill({"a": 2.0, "b": 3.0, "c": 4.0})
+    assert second is first and second.tolist() == [2.0, 3.0, 4.0]
+    assert schema.index == {"a": 0, "b": 1, "c": 2}
+    # The shared schema must not pin the last context it saw.
+    assert all(value is not ctx for value in vars(schema).values())
+    with pytest.raises(ValueError):
+        schema.fill({"a": "not a number"})
+
+
+def test_matrix_vectorizes_contexts_in_one_pass():
+    X = POLICY_SCHEMA.matrix(CTXS)
+    assert X.shape == (len(CTXS), len(FEATURES))
+    assert np.array_equal(X, np.array([_legacy(ctx) for ctx in CTXS]), equal_nan=True)
+    assert POLICY_SCHEMA.matrix([]).shape == (0, len(FEATURES))
+
+
+def test_matrix_diagnostics_are_computed_per_call():
+    schema = FeatureSchema(("a", "b", "c"))
+    X, missing, non_finite = schema.matrix([{"a": 1.0, "c": float("nan")}, {"a": 2.0, "c": 1.0}], diagnostics=True)
+    assert X.shape == (2, 3)
+    assert missing == ("b",) and non_finite == ("c",)
+    _, missing, non_finite = schema.matrix([{"a": 1.0, "b": 2.0, "c": 3.0}], diagnostics=True)
+    assert missing == () and non_finite == ()
+
+    _, missing, non_finite = POLICY_SCHEMA.matrix(CTXS, diagnostics=True)
+    assert set(non_finite) == {"adx", "atr_pct"}
+    assert "supertrend" in missing
+
+
+def test_postmortem_features_follow_the_schema():
+    state = {}
+    learner = PostmortemLearning(state)
+    learner.register("BTCUSDT", {"pm_trend_break": 0.8, "pm_volatility_bias": -0.4}, pnl_r=-1.0)
+    features = learner.context_features("ETHUSDT")
+    assert list(features) == list(learner.schema.names)
+    assert features["pm_trend_break"] == pytest.approx(
+        state["postmortem_learning"]["global"]["features"]["pm_trend_break"]
+    )
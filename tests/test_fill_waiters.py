@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot as bot
+from aster_multi_bot import FillWaiterRegistry, UserDataStream
+
+
+def _event(status: str, executed: str, last_qty: str, trade_id: int, price: str = "101.5") -> dict:
+    return {
+        "e": "ORDER_TRADE_UPDATE",
+        "E": 1_700_000_000_000,
+        "o": {
+            "s": "BTCUSDT",
+            "X": status,
+            "S": "BUY",
+            "i": 42,
+            "c": "entry-1",
+            "z": executed,
+            "ap": price,
+            "l": last_qty,
+            "L": price,
+            "n": "0.01",
+            "rp": "0",
+            "t": trade_id,
+            "T": 1_700_000_000_100,
+        },
+    }
+
+
+class _ConnectedStream:
+    def is_connected(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def exchange(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(bot, "PAPER", False)
+    ex = bot.Exchange("https://fapi.example.com", api_key="", api_secret="")
+    return ex
+
+
+def test_stream_fill_wakes_waiter_without_rest_polling(exchange):
+    exchange.user_stream = _ConnectedStream()
+    stream = UserDataStream(exchange)
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("REST polling must not run while the stream delivers fills")
+
+    exchange.query_order = _fail
+    exchange.get_user_trades = _fail
+
+    def _deliver():
+        time.sleep(0.05)
+        stream._handle_payload(_event("PARTIALLY_FILLED", "0.4", "0.4", 7))
+        stream._handle_payload(_event("FILLED", "1.0", "0.6", 8))
+
+    threading.Thread(target=_deliver).start()
+    started = time.time()
+    order, trades = exchange.await_order_fill(
+        "BTCUSDT", {"orderId": 42, "clientOrderId": "entry-1", "status": "NEW"}, timeout=2.0
+    )
+
+    assert time.time() - started < 1.0
+    assert order["status"] == "FILLED"
+    assert [t["id"] for t in trades] == [7, 8]
+    assert sum(float(t["qty"]) for t in trades) == pytest.approx(1.0)
+    assert all(float(t["commission"]) == pytest.approx(0.01) for t in trades)
+
+
+def test_fill_seen_before_waiting_is_kept_and_deduplicated():
+    registry = FillWaiterRegistry()
+    stream = UserDataStream.__new__(UserDataStream)
+    stream.exchange = type("Ex", (), {"fill_waiters": registry})()
+    stream._on_execution = None
+    stream._on_account = None
+    stream._handle_payload(_event("FILLED", "1.0", "1.0", 9))
+    stream._handle_payload(_event("FILLED", "1.0", "1.0", 9))
+
+    order, trades = registry.wait(None, "entry-1", timeout=0.0)
+    assert order["orderId"] == 42
+    assert len(trades) == 1
+    assert FillWaiterRegistry.is_complete(order, trades)
+
+
+def test_disconnected_stream_falls_back_to_polling(exchange):
+    polled = []
+
+    def _query_order(symbol, order_id=None, client_order_id=None):
+        polled.append(order_id)
+        return {"orderId": order_id, "status": "FILLED", "executedQty": "1.0", "avgPrice": "100"}
+
+    exchange.query_order = _query_order
+    exchange.get_user_trades = lambda symbol, order_id=None: [{"id": 1, "qty": "1.0", "price": "100"}]
+
+    order, trades = exchange.await_order_fill(
+        "BTCUSDT", {"orderId": 5, "status": "NEW"}, timeout=1.0, poll_interval=0.01
+    )
+    assert polled == [5]
+    assert order["status"] == "FILLED"
+    assert trades[0]["id"] == 1
@@ -0,0 +1,55 @@
+import hashlib
+import hmac
+import os
+import sys
+from urllib.parse import urlencode
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import http_client
+from brackets_guard import _LiteExchange
+
+
+def test_shared_session_is_pooled_and_reused():
+    first = http_client.session()
+    assert http_client.session() is first
+    adapter = first.get_adapter("https://fapi.asterdex.com")
+    assert adapter._pool_maxsize == http_client.HTTP_POOL_MAXSIZE
+    assert adapter.max_retries.total == 0
+
+
+def test_signed_query_matches_sorted_hmac_signature():
+    params = {"timestamp": 1700000000000, "symbol": "BTCUSDT", "recvWindow": 5000}
+    query = http_client.signed_query(params, "secret")
+    expected_qs = urlencode(sorted(params.items()), doseq=True)
+    expected_sig = hmac.new(b"secret", expected_qs.encode(), hashlib.sha256).hexdigest()
+    assert query == f"{expected_qs}&signature={expected_sig}"
+    assert http_client.api_headers("key") == {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "X-MBX-APIKEY": "key",
+    }
+
+
+def test_lite_exchange_goes_through_shared_session(monkeypatch):
+    calls = []
+
+    class _Response:
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return {"orderId": 1}
+
+    def fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        return _Response()
+
+    monkeypatch.setattr(http_client.session(), "request", fake_request)
+    ex = _LiteExchange("https://fapi.example.com/", "key", "secret", timeout_sec=4)
+    assert ex.place_order(symbol="BTCUSDT", side="SELL", type="STOP_MARKET") == {"orderId": 1}
+
+    method, url, kwargs = calls[0]
+    assert (method, url) == ("POST", "https://fapi.example.com/fapi/v1/order")
+    assert kwargs["timeout"] == 4
+    assert kwargs["headers"] == {"X-MBX-APIKEY": "key"}
+    assert "signature" in kwargs["params"]
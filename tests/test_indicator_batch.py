@@ -0,0 +1,110 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot
+import indicators
+from aster_multi_bot import HTF_INTERVAL, INTERVAL, Strategy
+from indicators import IndicatorSnapshot, KlineFrame
+
+
+def _frame(n: int, seed: int, step: int = 300_000) -> KlineFrame:
+    rng = np.random.default_rng(seed)
+    closes = 20.0 * np.exp(np.cumsum(rng.normal(0.0, 0.015, n)))
+    opens = np.r_[closes[:1], closes[:-1]]
+    highs = np.maximum(opens, closes) * (1.0 + np.abs(rng.normal(0.0, 0.004, n)))
+    lows = np.minimum(opens, closes) * (1.0 - np.abs(rng.normal(0.0, 0.004, n)))
+    times = np.arange(n, dtype=float) * step
+    return KlineFrame(np.vstack([times, opens, highs, lows, closes, np.ones(n), np.ones(n)]))
+
+
+@pytest.mark.parametrize("mode", ["legacy", "wilder"])
+def test_batch_matches_single_windows(mode):
+    windows = [_frame(n, seed) for seed, n in enumerate([360, 360, 360, 200, 200, 61, 12, 1])]
+    batch = indicators.batch_snapshots(windows, adx_mode=mode, history=10)
+    for window, snap in zip(windows, batch):
+        single = indicators.window_snapshot(window, adx_mode=mode, history=10)
+        for name in IndicatorSnapshot.__slots__:
+            np.testing.assert_allclose(getattr(snap, name), getattr(single, name), rtol=1e-9, atol=1e-9, err_msg=name)
+        assert type(snap.run_up) is int and type(snap.atr) is float
+
+
+def test_supertrend_batch_equals_per_series():
+    windows = [_frame(300, seed) for seed in range(6)]
+    high, low, close = (np.stack([getattr(w, name) for w in windows]) for name in ("high", "low", "close"))
+    lines, dirs = indicators.supertrend(high, low, close, 10, 3.0)
+    for row, window in enumerate(windows):
+        line, direction = indicators.supertrend(window.high, window.low, window.close, 10, 3.0)
+        assert np.array_equal(lines[row], line) and np.array_equal(dirs[row], direction)
+
+
+class _SeriesExchange:
+    def __init__(self) -> None:
+        self.frames = {}
+
+    def get_klines(self, symbol, interval, limit, *, start_time=None, end_time=None):
+        return self.frames[(symbol, interval)].tail(limit)
+
+
+def test_primed_snapshot_is_served_until_the_window_changes(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(aster_multi_bot.time, "time", lambda: 1_000.0)
+    exchange = _SeriesExchange()
+    for seed, symbol in enumerate(["AAAUSDT", "BBBUSDT"]):
+        exchange.frames[(symbol, INTERVAL)] = _frame(500, seed)
+        exchange.frames[(symbol, HTF_INTERVAL)] = _frame(300, seed + 10, step=1_800_000)
+    strategy = Strategy(exchange=exchange)
+    for symbol in ("AAAUSDT", "BBBUSDT"):
+        strategy._klines_cached(symbol, INTERVAL, 480)
+        strategy._klines_cached(symbol, HTF_INTERVAL, 300)
+
+    assert strategy.prime_indicator_batch(["AAAUSDT", "BBBUSDT", "AAAUSDT"]) == 4
+    primed = strategy._indicator_batch[("AAAUSDT", INTERVAL)][1]
+    # compute_signal asks the store for the same window the batch peeked at
+    window = strategy._klines_cached("AAAUSDT", INTERVAL, strategy.kline_limits("AAAUSDT")[0])
+    assert strategy._indicator_snapshot("AAAUSDT", INTERVAL, window) is primed
+    assert strategy.indicator_batch_stats["hits"] == 1
+    assert ("AAAUSDT", INTERVAL) not in strategy._indicator_states
+
+    # A refreshed tail is a different window and goes through the per-series path.
+    moved = window[1:]
+    assert strategy._indicator_snapshot("AAAUSDT", INTERVAL, moved) is not primed
+    strategy._indicator_snapshot("AAAUSDT", INTERVAL, moved)
+    assert ("AAAUSDT", INTERVAL) in strategy._indicator_states
+
+
+def _assert_same(left: IndicatorSnapshot, right: IndicatorSnapshot) -> None:
+    for name in IndicatorSnapshot.__slots__:
+        np.testing.assert_allclose(getattr(left, name), getattr(right, name), rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+def test_batch_and_per_series_paths_agree_on_a_sliding_window(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(aster_multi_bot.time, "time", lambda: 1_000.0)
+    series = _frame(800, 3, step=1_800_000)
+    exchange = _SeriesExchange()
+    strategy = Strategy(exchange=exchange)
+    limit = 90
+    history = strategy._indicator_history
+    served = []
+    for end in range(400, 430):
+        window = series[end - limit : end]
+        if end % 3 == 0:
+            # Batch hit: primed from exactly this window.
+            snaps = indicators.batch_snapshots([window], history=history, adx_mode=aster_multi_bot.ADX_MODE)
+            strategy._indicator_batch = {("AAAUSDT", HTF_INTERVAL): (window.signature(), snaps[0])}
+        else:
+            strategy._indicator_batch = {}
+        # Two reads per bar, the second one with the open bar refreshed.
+        for close_bump in (1.0, 1.001):
+            live = window.data.copy()
+            live[4, -1] *= close_bump
+            live[2, -1] = max(live[2, -1], live[4, -1])
+            frame = KlineFrame(live)
+            got = strategy._indicator_snapshot("AAAUSDT", HTF_INTERVAL, frame)
+            _assert_same(got, indicators.window_snapshot(frame, history=history, adx_mode=aster_multi_bot.ADX_MODE))
+            served.append(got.run_down)
+    assert strategy.indicator_batch_stats["hits"] == 10
+    assert max(served) <= limit
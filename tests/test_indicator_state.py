@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import indicators
+from aster_multi_bot import Strategy
+from indicators import IndicatorSnapshot, IndicatorState
+
+
+def _bars(n: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    closes = 50.0 * np.exp(np.cumsum(rng.normal(0.0, 0.012, n)))
+    opens = np.r_[closes[:1], closes[:-1]]
+    highs = np.maximum(opens, closes) * (1.0 + np.abs(rng.normal(0.0, 0.004, n)))
+    lows = np.minimum(opens, closes) * (1.0 - np.abs(rng.normal(0.0, 0.004, n)))
+    return tuple(
+        (float(i * 300_000), o, h, l, c, 10.0, 1000.0) for i, (o, h, l, c) in enumerate(zip(opens, highs, lows, closes))
+    )
+
+
+def _assert_same(left: IndicatorSnapshot, right: IndicatorSnapshot) -> None:
+    for name in IndicatorSnapshot.__slots__:
+        np.testing.assert_allclose(getattr(left, name), getattr(right, name), rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+class _DummyExchange:
+    pass
+
+
+@pytest.mark.parametrize("mode", ["legacy", "wilder"])
+@pytest.mark.parametrize("n", [30, 61, 250])
+def test_streaming_state_matches_window_batch(n, mode):
+    rows = _bars(n)
+    state = IndicatorState(adx_mode=mode)
+    state.extend(rows[:-1])
+    _assert_same(state.preview(rows[-1]), indicators.window_snapshot(rows, adx_mode=mode))
+    # preview must not commit the open bar
+    assert state.bars == n - 1
+    assert state.last_open == rows[-2][0]
+
+
+def test_strategy_folds_new_closed_bars_while_the_window_head_holds():
+    rows = _bars(320)
+    strategy = Strategy(exchange=_DummyExchange())
+    history = strategy._indicator_history
+    key = ("BTCUSDT", "5m")
+
+    # First sight of a window head: computed from the window, no state yet.
+    _assert_same(strategy._indicator_snapshot(*key, rows[:300]), indicators.window_snapshot(rows[:300], history=history))
+    assert key not in strategy._indicator_states
+    # Same closed bars again (open bar refreshed): the state is built from the window head.
+    strategy._indicator_snapshot(*key, rows[:300])
+    state = strategy._indicator_states[key]
+    assert state.bars == 299 and state.first_open == rows[0][0]
+
+    snap = strategy._indicator_snapshot(*key, rows[:303])
+    assert strategy._indicator_states[key] is state
+    assert state.bars == 302
+    _assert_same(snap, indicators.window_snapshot(rows[:303], history=history))
+
+
+def test_moved_window_head_drops_the_state():
+    rows = _bars(320)
+    strategy = Strategy(exchange=_DummyExchange())
+    history = strategy._indicator_history
+    key = ("ETHUSDT", "5m")
+    strategy._indicator_snapshot(*key, rows[:300])
+    strategy._indicator_snapshot(*key, rows[:300])
+    assert key in strategy._indicator_states
+
+    for window in (rows[3:303], rows[3:303], rows[120:200]):
+        _assert_same(strategy._indicator_snapshot(*key, window), indicators.window_snapshot(window, history=history))
+    assert key not in strategy._indicator_states
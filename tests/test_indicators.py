@@ -0,0 +1,102 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot as bot
+import indicators
+
+
+def _bars(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    opens = np.r_[closes[:1], closes[:-1]]
+    highs = np.maximum(opens, closes) * (1.0 + np.abs(rng.normal(0.0, 0.003, n)))
+    lows = np.minimum(opens, closes) * (1.0 - np.abs(rng.normal(0.0, 0.003, n)))
+    return [(float(i * 300_000), o, h, l, c, 10.0, 1000.0) for i, (o, h, l, c) in enumerate(zip(opens, highs, lows, closes))]
+
+
+def _close(actual, expected):
+    actual = np.asarray(actual, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("n", [0, 1, 14, 15, 16, 64, 65, 300, 1500])
+def test_numpy_indicators_match_list_versions(n):
+    kl = _bars(n)
+    bars = indicators.columns(kl)
+    closes = [row[4] for row in kl]
+    high, low, close = bars[:, 2], bars[:, 3], bars[:, 4]
+
+    _close(indicators.ema(close, 21), bot.ema(closes, 21))
+    _close(indicators.sma_series(close, 20), bot._sma_series(closes, 20))
+    _close(indicators.rolling_std(close, 20), bot._rolling_std(closes, 20))
+    for got, want in zip(indicators.bollinger_bands(close, 20, 2.0), bot.bollinger_bands(closes, 20, 2.0)):
+        _close(got, want)
+    _close(indicators.rsi(close, 14), bot.rsi(closes, 14))
+    for got, want in zip(indicators.stoch_rsi(close, 14, 3, 3), bot.stoch_rsi(closes, 14, 3, 3)):
+        _close(got, want)
+    for got, want in zip(indicators.supertrend(high, low, close, 10, 3.0), bot.supertrend_indicator(kl, 10, 3.0)):
+        _close(got, want)
+    assert indicators.atr_abs(high, low, close, 14) == pytest.approx(bot.atr_abs_from_klines(kl, 14), rel=1e-12)
+    assert indicators.adx_latest(high, low, close, 14) == pytest.approx(bot.adx_latest(kl, 14), rel=1e-9, abs=1e-9)
+
+
+def test_flat_series_keeps_warmup_defaults():
+    kl = [(0.0, 5.0, 5.0, 5.0, 5.0, 0.0, 0.0)] * 40
+    bars = indicators.columns(kl)
+    high, low, close = bars[:, 2], bars[:, 3], bars[:, 4]
+
+    assert indicators.adx_latest(high, low, close) == bot.adx_latest(kl)
+    assert np.all(indicators.rolling_std(close, 20) == 0.0)
+    _close(indicators.stoch_rsi(close)[0], bot.stoch_rsi([5.0] * 40)[0])
+
+
+def test_stoch_rsi_reuses_precomputed_rsi():
+    close = indicators.columns(_bars(200))[:, 4]
+    rsi_vals = indicators.rsi(close, 14)
+    for got, want in zip(indicators.stoch_rsi(close, rsi_vals=rsi_vals), indicators.stoch_rsi(close)):
+        _close(got, want)
+
+
+def _wilder_reference(kl, period=14):
+    tr, plus, minus = [], [], []
+    for prev, row in zip(kl, kl[1:]):
+        up, down = row[2] - prev[2], prev[3] - row[3]
+        plus.append(up if up > down and up > 0 else 0.0)
+        minus.append(down if down > up and down > 0 else 0.0)
+        tr.append(max(row[2] - row[3], abs(row[2] - prev[4]), abs(row[3] - prev[4])))
+    sums = [sum(tr[:period]), sum(plus[:period]), sum(minus[:period])]
+    dx, di = [], None
+    for j in range(period - 1, len(tr)):
+        if j >= period:
+            sums = [s - s / period + x for s, x in zip(sums, (tr[j], plus[j], minus[j]))]
+        di = (100.0 * sums[1] / sums[0], 100.0 * sums[2] / sums[0])
+        dx.append(100.0 * abs(di[0] - di[1]) / (di[0] + di[1]))
+    adx = [sum(dx[:period]) / period]
+    for value in dx[period:]:
+        adx.append((adx[-1] * (period - 1) + value) / period)
+    return adx[-1], adx[-1] - adx[-1 - period], di[0], di[1]
+
+
+def test_wilder_adx_matches_textbook_smoothing():
+    kl = _bars(400, seed=3)
+    bars = indicators.columns(kl)
+    reading = indicators.adx_wilder(bars[:, 2], bars[:, 3], bars[:, 4], 14)
+    assert tuple(reading) == pytest.approx(_wilder_reference(kl), rel=1e-9)
+    assert indicators.adx_latest(bars[:, 2], bars[:, 3], bars[:, 4], mode="wilder") == (reading.adx, reading.delta)
+
+
+def test_legacy_adx_exposes_last_window_directional_indices():
+    kl = _bars(120, seed=5)
+    bars = indicators.columns(kl)
+    reading = indicators.adx_legacy(bars[:, 2], bars[:, 3], bars[:, 4], 14)
+    tr, plus, minus = indicators.directional_movement(bars[:, 2], bars[:, 3], bars[:, 4])
+    assert reading.plus_di == pytest.approx(100.0 * plus[-14:].sum() / tr[-14:].sum())
+    assert reading.minus_di == pytest.approx(100.0 * minus[-14:].sum() / tr[-14:].sum())
+    assert indicators.adx_legacy(bars[:10, 2], bars[:10, 3], bars[:10, 4]) == (25.0, 0.0, 0.0, 0.0)
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot
+import indicators
+from indicators import KlineFrame
+
+
+def _payload(n: int):
+    # /fapi/v1/klines: open_time, o, h, l, c, v, close_time, quote_volume, trades, ...
+    return [
+        [i * 300_000, f"{100 + i}.5", f"{101 + i}", f"{99 + i}", f"{100 + i}.25", "12.5", i * 300_000 + 299_999, "1250.0", 42]
+        for i in range(n)
+    ]
+
+
+def test_payload_parses_into_contiguous_read_only_columns():
+    frame = KlineFrame.from_payload(_payload(50))
+
+    assert len(frame) == 50
+    assert frame[3] == (900_000.0, 103.5, 104.0, 102.0, 103.25, 12.5, 1250.0)
+    for name in indicators.KLINE_FIELDS:
+        column = getattr(frame, name)
+        assert column.flags.c_contiguous and not column.flags.writeable
+    with pytest.raises(ValueError):
+        frame.close[0] = 1.0
+    assert KlineFrame.from_rows(list(frame)).data.tolist() == frame.data.tolist()
+
+
+def test_slices_are_views_and_rows_keep_tuple_layout():
+    frame = KlineFrame.from_payload(_payload(100))
+    tail = frame.tail(30)
+
+    assert len(tail) == 30 and tail[0] == frame[70]
+    assert np.shares_memory(tail.close, frame.close)
+    assert tail.close.flags.c_contiguous
+    assert list(tail)[-1] == frame[-1]
+    assert indicators.columns(tail).shape == (30, 7)
+    assert len(frame.tail(0)) == 0 and len(frame.tail(500)) == 100
+
+
+def test_exchange_get_klines_returns_frame(monkeypatch: pytest.MonkeyPatch):
+    exchange = aster_multi_bot.Exchange("https://fapi.example.com", api_key="", api_secret="")
+    monkeypatch.setattr(exchange, "get", lambda path, params=None: _payload(5))
+
+    frame = exchange.get_klines("BTCUSDT", "5m", 5)
+    assert isinstance(frame, KlineFrame)
+    assert frame.quote_volume.tolist() == [1250.0] * 5
+
+
+def test_frame_is_several_times_smaller_than_row_tuples():
+    frame = KlineFrame.from_payload(_payload(1500))
+    tuple_bytes = sum(sys.getsizeof(row) + sum(sys.getsizeof(x) for x in row) for row in frame)
+
+    assert frame.nbytes == 1500 * 7 * 8
+    assert frame.nbytes * 4 < tuple_bytes
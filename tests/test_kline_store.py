@@ -0,0 +1,300 @@
+import os
+import sys
+from typing import List, Optional
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot
+from aster_multi_bot import KlineStore
+
+STEP = 300_000  # 5m
+
+
+def _bar(open_time: int) -> List[float]:
+    price = 100.0 + (open_time // STEP) % 17
+    return [float(open_time), price, price + 1.0, price - 1.0, price + 0.5, 10.0, 1000.0]
+
+
+class _KlineExchange:
+    def __init__(self, now_ms: int) -> None:
+        self.now_ms = now_ms
+        self.calls: List[dict] = []
+        self.skip: set = set()
+        self.listed_at = 0
+
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        *,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[List[float]]:
+        self.calls.append({"limit": limit, "start": start_time, "end": end_time})
+        current = self.now_ms - self.now_ms % STEP
+        if start_time is None:
+            newest = current if end_time is None else min(current, end_time - end_time % STEP)
+            opens = [newest - STEP * i for i in range(limit) if newest - STEP * i >= self.listed_at][::-1]
+        else:
+            opens = []
+            t = start_time
+            while t <= current and len(opens) < limit:
+                if end_time is None or t <= end_time:
+                    opens.append(t)
+                t += STEP
+        return [_bar(t) for t in opens if t not in self.skip]
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch):
+    state = {"now": 1_700_000_000.0}
+    monkeypatch.setattr(aster_multi_bot.time, "time", lambda: state["now"])
+    return state
+
+
+def test_refresh_only_requests_new_bars(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0)
+
+    first = store.get("BTCUSDT", "5m", 360)
+    assert len(first) == 360
+    assert exchange.calls[-1] == {"limit": 360, "start": None, "end": None}
+
+    clock["now"] += 2 * 300
+    exchange.now_ms = int(clock["now"] * 1000)
+    refreshed = store.get("BTCUSDT", "5m", 360)
+
+    assert exchange.calls[-1]["start"] == int(first[-1][0])
+    assert exchange.calls[-1]["limit"] <= 4
+    assert len(refreshed) == 360
+    assert refreshed[-1][0] == first[-1][0] + 2 * STEP
+    opens = [row[0] for row in refreshed]
+    assert all(b - a == STEP for a, b in zip(opens, opens[1:]))
+
+
+def test_cached_series_is_served_within_ttl(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0)
+    store.get("BTCUSDT", "5m", 120)
+    clock["now"] += 1.0
+    store.get("BTCUSDT", "5m", 120)
+    assert len(exchange.calls) == 1
+    assert store.hits == 1
+
+
+def test_gap_in_incremental_fetch_is_backfilled(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0)
+    first = store.get("ETHUSDT", "5m", 100)
+    last_open = int(first[-1][0])
+
+    clock["now"] += 5 * 300
+    exchange.now_ms = int(clock["now"] * 1000)
+    # Exchange drops the first bars of the incremental response.
+    exchange.skip = {last_open, last_open + STEP, last_open + 2 * STEP}
+    original = exchange.get_klines
+
+    def _patched(symbol, interval, limit, *, start_time=None, end_time=None):
+        if end_time is not None:
+            exchange.skip = set()
+        return original(symbol, interval, limit, start_time=start_time, end_time=end_time)
+
+    exchange.get_klines = _patched  # type: ignore[assignment]
+    series = store.get("ETHUSDT", "5m", 100)
+
+    assert store.backfills == 1
+    opens = [row[0] for row in series]
+    assert all(b - a == STEP for a, b in zip(opens, opens[1:]))
+    assert opens[-1] == last_open + 5 * STEP
+
+
+def test_stream_kline_updates_open_bar_and_appends(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0)
+    series = store.get("BTCUSDT", "5m", 50)
+    last_open = int(series[-1][0])
+
+    event = {"e": "kline", "s": "BTCUSDT", "k": {"t": last_open, "i": "5m", "o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "9", "q": "90"}}
+    assert store.apply_stream_kline(event) is True
+    assert store.peek("BTCUSDT", "5m")[-1][4] == pytest.approx(1.5)
+
+    event["k"] = dict(event["k"], t=last_open + STEP, c="1.7")
+    assert store.apply_stream_kline(event) is True
+    updated = store.peek("BTCUSDT", "5m")
+    assert len(updated) == 50
+    assert updated[-1][0] == last_open + STEP
+
+    event["k"] = dict(event["k"], t=last_open + 5 * STEP)
+    assert store.apply_stream_kline(event) is False
+
+
+def test_shorter_limit_is_a_tail_view_of_the_cached_series(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0)
+    full = store.get("BTCUSDT", "5m", 300)
+    short = store.get("BTCUSDT", "5m", 60)
+
+    assert len(exchange.calls) == 1
+    assert len(short) == 60
+    assert list(short) == list(full[-60:])
+    assert np.shares_memory(short.close, full.close)
+    assert len(short[-20:]) == 20 and short[-20:][-1] == full[-1]
+
+
+def test_larger_limit_only_fetches_older_bars(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0)
+    first = store.get("BTCUSDT", "5m", 100)
+    oldest = int(first[0][0])
+
+    clock["now"] += 1.0
+    wider = store.get("BTCUSDT", "5m", 250)
+
+    assert exchange.calls[-1] == {"limit": 150, "start": None, "end": oldest - 1}
+    assert store.extensions == 1
+    assert len(wider) == 250
+    opens = [row[0] for row in wider]
+    assert all(b - a == STEP for a, b in zip(opens, opens[1:]))
+    assert opens[-1] == first[-1][0]
+
+
+def test_extension_capped_per_request_keeps_extending(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0)
+    store.MAX_REQUEST = 60
+    store.get("BTCUSDT", "5m", 100)
+
+    clock["now"] += 1.0
+    assert len(store.get("BTCUSDT", "5m", 250)) == 160
+    clock["now"] += 1.0
+    assert len(store.get("BTCUSDT", "5m", 250)) == 220
+    assert store.extensions == 2
+
+
+def test_young_listing_stops_extending_back(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    current = exchange.now_ms - exchange.now_ms % STEP
+    exchange.listed_at = current - 150 * STEP
+    store = KlineStore(exchange, ttl=5.0)
+    store.get("NEWUSDT", "5m", 100)
+
+    assert len(store.get("NEWUSDT", "5m", 300)) == 151
+    calls = len(exchange.calls)
+    assert len(store.get("NEWUSDT", "5m", 300)) == 151
+    assert len(exchange.calls) == calls
+
+
+def test_series_expires_at_its_own_bar_close(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0, close_grace=1.0)
+    series = store.get("BTCUSDT", "5m", 100, tail_ttl=3600.0)
+    close_at = (series[-1][0] + STEP) / 1000.0
+
+    clock["now"] = close_at - 2.0
+    store.get("BTCUSDT", "5m", 100, tail_ttl=3600.0)
+    assert len(exchange.calls) == 1
+
+    clock["now"] = close_at + 1.5
+    exchange.now_ms = int(clock["now"] * 1000)
+    refreshed = store.get("BTCUSDT", "5m", 100, tail_ttl=3600.0)
+    assert len(exchange.calls) == 2
+    assert exchange.calls[-1]["start"] == int(series[-1][0])
+    assert refreshed[-1][0] == series[-1][0] + STEP
+
+
+def test_open_tail_refresh_follows_caller_tail_ttl(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0, close_grace=1.0)
+    store.get("BTCUSDT", "1h", 100)
+    clock["now"] += 6.0
+    store.get("BTCUSDT", "1h", 100, tail_ttl=60.0)
+    assert len(exchange.calls) == 1
+    store.get("BTCUSDT", "1h", 100)
+    assert len(exchange.calls) == 2
+
+
+def test_tail_stats_are_cached_per_stored_series(clock, monkeypatch: pytest.MonkeyPatch):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0)
+    series = store.get("BTCUSDT", "5m", 300)
+    calls = []
+    original = aster_multi_bot.indicators.atr_abs
+    monkeypatch.setattr(aster_multi_bot.indicators, "atr_abs", lambda *a, **kw: calls.append(1) or original(*a, **kw))
+
+    stats = store.tail_stats("BTCUSDT", "5m")
+    tail = [list(row) for row in series[-120:]]
+    closes = [row[4] for row in tail]
+    assert stats.bars == 120 and stats.price == closes[-1]
+    assert stats.atr_ratio == pytest.approx(aster_multi_bot.atr_abs_from_klines(tail, 14) / closes[-1])
+    assert stats.momentum == pytest.approx((closes[-1] - closes[-48]) / closes[-48])
+    assert store.tail_stats("BTCUSDT", "5m") is stats
+    assert len(calls) == 1
+
+    event = {"e": "kline", "s": "BTCUSDT", "k": {"t": int(series[-1][0]), "i": "5m", "o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "9", "q": "90"}}
+    store.apply_stream_kline(event)
+    assert store.tail_stats("BTCUSDT", "5m").price == 1.5
+    assert len(calls) == 2
+    assert store.tail_stats("ETHUSDT", "5m") is None
+
+
+def test_byte_budget_evicts_least_recently_used_series(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    series_bytes = 7 * 8 * 100
+    store = KlineStore(exchange, ttl=5.0, max_bytes=2 * series_bytes, idle_ttl=0)
+    store.get("BTCUSDT", "5m", 100)
+    store.get("ETHUSDT", "5m", 100)
+    store.get("BTCUSDT", "5m", 100)  # refreshes BTC's recency
+    store.get("SOLUSDT", "5m", 100)
+
+    assert not len(store.peek("ETHUSDT", "5m"))
+    assert len(store.peek("BTCUSDT", "5m")) == 100
+    assert store.nbytes() == 2 * series_bytes
+    metrics = store.metrics()
+    assert metrics["evictions"] == 1 and metrics["series"] == 2
+    assert metrics["hits"] == 1 and metrics["misses"] == 3 and metrics["hit_rate"] == 0.25
+    assert metrics["per_interval"] == {"5m": {"series": 2, "bars": 200, "bytes": 2 * series_bytes}}
+
+    # A single window larger than the budget is still kept and served.
+    assert len(store.get("XRPUSDT", "5m", 300)) == 300
+    assert store.metrics()["series"] == 1
+
+
+def test_series_evicted_during_a_fetch_is_reinserted_with_correct_bytes(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0, max_bytes=0, idle_ttl=0)
+    store.get("BTCUSDT", "5m", 100)
+    store.get("ETHUSDT", "5m", 100)
+    fetch = exchange.get_klines
+
+    def _evicting_fetch(symbol, interval, limit, **kwargs):
+        store._drop(("BTCUSDT", "5m"))  # e.g. another thread's budget pass
+        return fetch(symbol, interval, limit, **kwargs)
+
+    exchange.get_klines = _evicting_fetch
+    clock["now"] += 1.0
+    assert len(store.get("BTCUSDT", "5m", 250)) == 250
+
+    assert len(store.peek("BTCUSDT", "5m")) == 250
+    assert store.nbytes() == sum(entry["nbytes"] for entry in store._series.values())
+
+
+def test_idle_series_expire(clock):
+    exchange = _KlineExchange(int(clock["now"] * 1000))
+    store = KlineStore(exchange, ttl=5.0, max_bytes=0, idle_ttl=600.0)
+    store.get("BTCUSDT", "5m", 50)
+    store.get("ETHUSDT", "1h", 50)
+    clock["now"] += 400.0
+    exchange.now_ms = int(clock["now"] * 1000)
+    store.get("ETHUSDT", "1h", 50)
+    clock["now"] += 300.0
+    exchange.now_ms = int(clock["now"] * 1000)
+    store.get("SOLUSDT", "5m", 50)
+
+    assert not len(store.peek("BTCUSDT", "5m"))
+    assert len(store.peek("ETHUSDT", "1h")) == 50
+    assert store.metrics()["expired"] == 1
+    assert store.nbytes() == sum(store.peek(*key).nbytes for key in (("ETHUSDT", "1h"), ("SOLUSDT", "5m")))
@@ -0,0 +1,57 @@
+import json
+import math
+
+import numpy as np
+
+from ml_policy import LinUCB
+
+
+def _reference_ucb(model: LinUCB, x: np.ndarray) -> float:
+    A_inv = np.linalg.inv(model.A)
+    theta = A_inv @ model.b
+    return float((theta.T @ x)[0, 0]) + model.alpha * math.sqrt(float((x.T @ A_inv @ x)[0, 0]))
+
+
+def _samples(rng, d, n):
+    for _ in range(n):
+        x = rng.normal(0.0, 1.0, (d, 1)) * rng.choice([0.1, 1.0, 10.0])
+        x[rng.random(d) < 0.5] = 0.0
+        yield x, float(rng.normal())
+
+
+def test_incremental_inverse_matches_full_inversion():
+    rng = np.random.default_rng(1)
+    model = LinUCB(alpha=1.6, d=20)
+    for step, (x, reward) in enumerate(_samples(rng, model.d, 3 * LinUCB.REFRESH_EVERY + 5)):
+        model.learn(x, reward)
+        if step % 17 == 0:
+            probe = rng.normal(0.0, 1.0, (model.d, 1))
+            assert math.isclose(model.predict_ucb(probe), _reference_ucb(model, probe), rel_tol=1e-9, abs_tol=1e-9)
+    assert model.updates_since_refresh == 5
+    np.testing.assert_allclose(model.A_inv @ model.A, np.eye(model.d), atol=1e-8)
+
+
+def test_cached_inverse_survives_round_trip():
+    rng = np.random.default_rng(2)
+    model = LinUCB(alpha=0.8, d=12)
+    for x, reward in _samples(rng, model.d, 30):
+        model.learn(x, reward)
+    restored = LinUCB.from_dict(json.loads(json.dumps(model.to_dict())), target_dim=12)
+    assert restored._A_inv is not None
+    assert restored.updates_since_refresh == model.updates_since_refresh
+    probe = rng.normal(0.0, 1.0, (12, 1))
+    assert restored.predict_ucb(probe) == model.predict_ucb(probe)
+
+    # Padding to a new feature count drops the stored inverse and rebuilds it from A.
+    grown = LinUCB.from_dict(model.to_dict(), target_dim=14)
+    probe = rng.normal(0.0, 1.0, (14, 1))
+    assert math.isclose(grown.predict_ucb(probe), _reference_ucb(grown, probe), rel_tol=1e-9)
+
+
+def test_assigning_matrices_invalidates_the_cache():
+    model = LinUCB(alpha=1.0, d=4)
+    probe = np.ones((4, 1))
+    model.predict_ucb(probe)
+    model.A = np.eye(4) * 2.0
+    model.b = np.full((4, 1), 2.0)
+    assert math.isclose(model.predict_ucb(probe), _reference_ucb(model, probe), rel_tol=1e-12)
@@ -0,0 +1,160 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot as bot
+
+
+@pytest.fixture(autouse=True)
+def _reset_ws_env(monkeypatch):
+    monkeypatch.delenv("ASTER_WS_BASE", raising=False)
+    monkeypatch.delenv("ASTER_WS_MARKET_PATH", raising=False)
+
+
+def _make_exchange() -> bot.Exchange:
+    return bot.Exchange("https://fapi.asterdex.com", api_key="", api_secret="")
+
+
+def _book_event(symbol: str, bid: str, ask: str) -> dict:
+    return {
+        "stream": "!bookTicker",
+        "data": {"e": "bookTicker", "s": symbol, "b": bid, "B": "3", "a": ask, "A": "4", "u": 7, "T": 1},
+    }
+
+
+def test_market_stream_url_combines_all_market_streams():
+    stream = bot.MarketDataStream(_make_exchange())
+    assert stream._build_url() == (
+        "wss://fstream.asterdex.com/stream?streams=!bookTicker/!miniTicker@arr/!markPrice@arr@1s"
+    )
+
+
+def test_market_stream_records_rest_shaped_payloads():
+    stream = bot.MarketDataStream(_make_exchange())
+    stream._handle_payload(_book_event("BTCUSDT", "100.0", "100.5"))
+    stream._handle_payload(
+        {
+            "stream": "!miniTicker@arr",
+            "data": [{"e": "24hrMiniTicker", "s": "BTCUSDT", "c": "110", "o": "100", "h": "111", "l": "99", "v": "5", "q": "550"}],
+        }
+    )
+    stream._handle_payload(
+        {
+            "stream": "!markPrice@arr@1s",
+            "data": [{"e": "markPriceUpdate", "s": "BTCUSDT", "p": "100.2", "i": "100.1", "r": "0.0001", "T": 5}],
+        }
+    )
+
+    book = stream.book_ticker("btcusdt")
+    assert book["bidPrice"] == "100.0"
+    assert book["askQty"] == "4"
+    ticker = stream.ticker_24hr("BTCUSDT")
+    assert ticker["quoteVolume"] == "550"
+    assert float(ticker["priceChangePercent"]) == pytest.approx(10.0)
+    mark = stream.premium_index("BTCUSDT")
+    assert mark["markPrice"] == "100.2"
+    assert mark["lastFundingRate"] == "0.0001"
+
+
+def test_exchange_prefers_live_stream_over_rest(monkeypatch):
+    exchange = _make_exchange()
+    stream = bot.MarketDataStream(exchange)
+    exchange.market_stream = stream
+    stream._handle_payload(_book_event("ETHUSDT", "10", "11"))
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("REST should not be used while the stream is live")
+
+    monkeypatch.setattr(exchange, "_raw_get_book_ticker", _fail)
+    monkeypatch.setattr(exchange, "get", _fail)
+    stream.seed("book", [{"symbol": "BTCUSDT", "bidPrice": "99", "askPrice": "100"}], 0.0)
+
+    assert exchange.get_book_ticker("ETHUSDT")["askPrice"] == "11"
+    bulk = exchange.get_book_ticker()
+    assert sorted(entry["symbol"] for entry in bulk) == ["BTCUSDT", "ETHUSDT"]
+
+
+def test_partial_stream_table_is_completed_from_rest_once(monkeypatch):
+    exchange = _make_exchange()
+    stream = bot.MarketDataStream(exchange)
+    exchange.market_stream = stream
+    clock = {"now": 1.0}
+    monkeypatch.setattr("aster_multi_bot.time.time", lambda: clock["now"])
+    stream._handle_payload(_book_event("ETHUSDT", "10", "11"))
+    clock["now"] = 2.0
+    calls = []
+
+    def _rest(path, params=None):
+        calls.append(path)
+        return [
+            {"symbol": "ETHUSDT", "bidPrice": "9", "askPrice": "12"},
+            {"symbol": "BTCUSDT", "bidPrice": "99", "askPrice": "100"},
+        ]
+
+    monkeypatch.setattr(exchange, "get", _rest)
+
+    # The stream has only seen ETHUSDT so far: the whole-table read must not be partial.
+    first = exchange.get_book_ticker()
+    assert sorted(entry["symbol"] for entry in first) == ["BTCUSDT", "ETHUSDT"]
+    merged = {entry["symbol"]: entry for entry in exchange.get_book_ticker()}
+    assert calls == ["/fapi/v1/ticker/bookTicker"]
+    assert merged["ETHUSDT"]["askPrice"] == "12"
+    assert merged["BTCUSDT"]["askPrice"] == "100"
+
+    clock["now"] = 3.0
+    stream._handle_payload(_book_event("ETHUSDT", "12", "13"))
+    stream.seed("book", [{"symbol": "ETHUSDT", "bidPrice": "9", "askPrice": "12"}], 2.5)
+    assert stream.book_ticker("ETHUSDT")["askPrice"] == "13"
+
+
+def test_exchange_falls_back_to_rest_when_stream_is_stale(monkeypatch):
+    exchange = _make_exchange()
+    stream = bot.MarketDataStream(exchange, stale_after=5.0)
+    exchange.market_stream = stream
+    now = 1_000_000.0
+    monkeypatch.setattr("aster_multi_bot.time.time", lambda: now)
+    stream._handle_payload(_book_event("ETHUSDT", "10", "11"))
+
+    calls = []
+
+    def _rest(symbol):
+        calls.append(symbol)
+        return {"symbol": symbol, "bidPrice": "9", "askPrice": "12"}
+
+    monkeypatch.setattr(exchange, "_raw_get_book_ticker", _rest)
+    monkeypatch.setattr("aster_multi_bot.time.time", lambda: now + 30.0)
+
+    assert stream.is_live("book") is False
+    assert exchange.get_book_ticker("ETHUSDT")["bidPrice"] == "9"
+    assert calls == ["ETHUSDT"]
+
+
+def test_kline_streams_follow_evaluated_symbols_and_feed_the_store():
+    exchange = _make_exchange()
+    stream = bot.MarketDataStream(exchange)
+    sent = []
+    stream._ws_app = type("_App", (), {"send": lambda _self, message: sent.append(json.loads(message))})()
+    stream._connected.set()
+
+    stream.watch_klines(["BTCUSDT", "ETHUSDT"], ("1m",))
+    stream.watch_klines(["ETHUSDT", "SOLUSDT"], ("1m",))
+    assert sent[0]["method"] == "SUBSCRIBE"
+    assert sent[0]["params"] == ["btcusdt@kline_1m", "ethusdt@kline_1m"]
+    assert (sent[1]["method"], sent[1]["params"]) == ("UNSUBSCRIBE", ["btcusdt@kline_1m"])
+    assert (sent[2]["method"], sent[2]["params"]) == ("SUBSCRIBE", ["solusdt@kline_1m"])
+
+    class _Klines:
+        def get_klines(self, symbol, interval, limit, **_kwargs):
+            return [[60_000.0 * i, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(limit)]
+
+    store = bot.KlineStore(_Klines())
+    store.get("ETHUSDT", "1m", 5)
+    stream.on_kline = store.apply_stream_kline
+    bar = {"s": "ETHUSDT", "i": "1m", "t": 240_000, "o": "1", "h": "2", "l": "1", "c": "1.5", "v": "3", "q": "4"}
+    stream._handle_payload({"stream": "ethusdt@kline_1m", "data": {"e": "kline", "s": "ETHUSDT", "k": bar}})
+    assert store.peek("ETHUSDT", "1m").close[-1] == 1.5
+    assert store.stream_updates == 1
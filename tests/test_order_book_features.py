@@ -0,0 +1,119 @@
+import os
+import statistics
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import indicators
+from aster_multi_bot import Strategy
+
+
+def _clamp(value, lower, upper):
+    return max(lower, min(upper, value))
+
+
+def _reference(bids, asks):
+    """The former per-level implementation of Strategy._order_book_features."""
+
+    def _sum(levels, depth, notional=False):
+        return sum(p * q if notional else q for p, q in levels[:depth])
+
+    def _gap(levels, side):
+        if len(levels) < 3:
+            return 0.0
+        diffs = []
+        for idx in range(1, min(len(levels), 12)):
+            gap = levels[idx - 1][0] - levels[idx][0] if side == "bid" else levels[idx][0] - levels[idx - 1][0]
+            if gap > 0:
+                diffs.append(gap)
+        if not diffs:
+            return 0.0
+        avg = sum(diffs) / len(diffs)
+        return _clamp(max(diffs) / avg - 1.0, 0.0, 5.0) if avg > 0 else 0.0
+
+    def _wall(levels):
+        qtys = sorted(q for _, q in levels[:10] if q > 0)
+        if len(qtys) < 3:
+            return 0.0
+        median = statistics.median(qtys)
+        return _clamp(max(qtys) / median - 1.0, 0.0, 5.0) if median > 0 else 0.0
+
+    b5, a5, b10, a10 = _sum(bids, 5), _sum(asks, 5), _sum(bids, 10), _sum(asks, 10)
+    bn, an = _sum(bids, 10, True), _sum(asks, 10, True)
+    gb, ga, wb, wa = _gap(bids, "bid"), _gap(asks, "ask"), _wall(bids), _wall(asks)
+    return {
+        "lob_imbalance_5": _clamp((b5 - a5) / max(b5 + a5, 1e-9), -1.0, 1.0),
+        "lob_imbalance_10": _clamp((b10 - a10) / max(b10 + a10, 1e-9), -1.0, 1.0),
+        "lob_depth_ratio": _clamp(bn / max(an, 1e-9), 0.0, 5.0),
+        "lob_gap_score": max(gb, ga),
+        "lob_gap_bid": gb,
+        "lob_gap_ask": ga,
+        "lob_wall_score": max(wb, wa),
+        "lob_wall_bid": wb,
+        "lob_wall_ask": wa,
+        "lob_bid_notional_10": bn,
+        "lob_ask_notional_10": an,
+        "lob_levels": float(min(len(bids), len(asks))),
+    }
+
+
+def _payload(rng, n_bids, n_asks):
+    mid = rng.uniform(0.01, 5000.0)
+    tick = mid * 1e-4
+
+    def _side(n, sign):
+        levels = []
+        for k in range(n):
+            skip = rng.integers(0, 3) * k if rng.random() < 0.3 else 0
+            qty = 0.0 if rng.random() < 0.05 else float(rng.choice([rng.uniform(0.001, 10.0), rng.integers(1, 4)]))
+            levels.append([str(mid + sign * tick * (k + 1 + skip)), str(qty)])
+        return levels
+
+    return {"bids": _side(n_bids, -1), "asks": _side(n_asks, 1), "lastUpdateId": 1}
+
+
+class _DummyExchange:
+    pass
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_vectorized_features_match_per_level_reference(seed):
+    rng = np.random.default_rng(seed)
+    strategy = Strategy(exchange=_DummyExchange())
+    books = {}
+    for idx, (n_bids, n_asks) in enumerate([(1, 1), (2, 5), (3, 3), (5, 12), (11, 4), (40, 40), (120, 90), (9, 15)]):
+        book = strategy._normalize_order_book(_payload(rng, n_bids, n_asks))
+        if book is None:
+            continue
+        bids = [tuple(level) for level in book["bids"].tolist()]
+        asks = [tuple(level) for level in book["asks"].tolist()]
+        assert bids == sorted(bids, key=lambda level: level[0], reverse=True)
+        assert asks == sorted(asks, key=lambda level: level[0])
+        expected = _reference(bids, asks)
+        assert indicators.order_book_features(book["bids"], book["asks"]) == expected
+        books[f"S{idx}"] = (book, expected)
+
+    batch = indicators.order_book_features_batch([(book["bids"], book["asks"]) for book, _ in books.values()])
+    assert batch == [expected for _, expected in books.values()]
+
+
+def test_primed_features_are_reused_for_the_same_book():
+    strategy = Strategy(exchange=_DummyExchange())
+    book = strategy._normalize_order_book(
+        {"bids": [["99", "1"], ["100", "2"], ["98", "4"]], "asks": [["101", "3"], ["102", "1"]], "lastUpdateId": 5}
+    )
+    assert book["bids"][:, 0].tolist() == [100.0, 99.0, 98.0]
+    assert strategy.prime_order_book_features({"btcusdt": book}) == 1
+    cached = strategy._orderbook_features["BTCUSDT"][2]
+
+    features = strategy._order_book_features(
+        "BTCUSDT", book_ticker={"bidPrice": "100", "askPrice": "101"}, order_book=book
+    )
+    assert {key: features[key] for key in cached} == cached
+    assert features["lob_bias"] == cached["lob_imbalance_10"]
+    assert features["lob_bid_support"] == pytest.approx(cached["lob_bid_notional_10"] / 100.5)
+    assert "lob_bias" not in cached
+    assert strategy._order_book_features("BTCUSDT", order_book={"bids": book["bids"][:0], "asks": book["asks"]}) == {}
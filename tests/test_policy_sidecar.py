@@ -0,0 +1,107 @@
+import json
+
+import numpy as np
+
+import aster_multi_bot as bot
+import ml_policy
+from ml_policy import FEATURES, BanditPolicy
+
+
+def _trained_policy(trades: int = 12) -> BanditPolicy:
+    rng = np.random.default_rng(7)
+    policy = BanditPolicy(alpha_enabled=True)
+    for _ in range(trades):
+        _learn(policy, rng)
+    return policy
+
+
+def _learn(policy: BanditPolicy, rng) -> None:
+    ctx = {name: float(rng.normal()) for name in FEATURES}
+    policy.note_entry("BTCUSDT", ctx=ctx, size_bucket="M")
+    policy.note_exit("BTCUSDT", ctx=ctx, size_bucket="M", pnl_r=float(rng.normal()))
+
+
+def test_state_keeps_reference_and_sidecar_restores_matrices(tmp_path):
+    policy = _trained_policy()
+    path = str(tmp_path / "state.policy.npz")
+
+    state = json.loads(json.dumps(policy.to_state(path)))
+    assert "A" not in state["gate"] and "weights" not in state["alpha"]
+    assert state["arrays"]["file"] == "state.policy.npz"
+    assert state["arrays"]["version"] == ml_policy.POLICY_FILE_VERSION
+    assert len(json.dumps(state)) < len(json.dumps(policy.to_dict())) / 20
+
+    restored = BanditPolicy.from_state(state, path, alpha_enabled=True)
+    for key, arr in policy.arrays().items():
+        np.testing.assert_array_equal(restored.arrays()[key], arr, err_msg=key)
+    assert restored.n_trades == policy.n_trades
+    assert restored.learn_count == policy.learn_count
+
+
+def test_sidecar_is_rewritten_only_after_learning(tmp_path):
+    policy = _trained_policy()
+    path = str(tmp_path / "state.policy.npz")
+    first = policy.to_state(path)["arrays"]
+    assert policy.to_state(path)["arrays"] == first
+
+    restored = BanditPolicy.from_state(json.loads(json.dumps(policy.to_state(path))), path, alpha_enabled=True)
+    assert restored.to_state(path)["arrays"]["saved_at"] == first["saved_at"]
+
+    _learn(restored, np.random.default_rng(1))
+    second = restored.to_state(path)["arrays"]
+    assert second["checksum"] != first["checksum"]
+    assert second["learn_count"] == first["learn_count"] + 1
+
+
+def test_corrupt_sidecar_is_ignored(tmp_path):
+    policy = _trained_policy()
+    path = str(tmp_path / "state.policy.npz")
+    state = policy.to_state(path)
+    arrays = dict(policy.arrays())
+    header = json.dumps({"format": ml_policy.POLICY_FILE_FORMAT, "version": ml_policy.POLICY_FILE_VERSION,
+                         "checksum": state["arrays"]["checksum"]})
+    arrays["gate.b"] = arrays["gate.b"] + 1.0
+    with open(path, "wb") as fh:
+        np.savez(fh, __header__=np.array(header), **arrays)
+
+    restored = BanditPolicy.from_state(state, path, alpha_enabled=True)
+    assert not restored.gate.b.any()
+    # Empty matrices must not count as past warmup.
+    assert restored.sidecar_missing
+    assert restored.n_trades == 0 and restored.learn_count == 0
+
+
+def test_missing_sidecar_triggers_warm_start(tmp_path, monkeypatch):
+    policy = _trained_policy()
+    state = {"policy": json.loads(json.dumps(policy.to_state(str(tmp_path / "live.policy.npz"))))}
+    monkeypatch.setattr(bot, "_POLICY_FILE_ENV", str(tmp_path / "copy.policy.npz"))
+
+    restored = bot._build_policy(state["policy"])
+    assert restored.sidecar_missing and restored.n_trades == 0
+    assert bot._policy_needs_warm_start(restored, state["policy"])
+
+    monkeypatch.setattr(bot, "_POLICY_FILE_ENV", str(tmp_path / "live.policy.npz"))
+    intact = bot._build_policy(state["policy"])
+    assert not intact.sidecar_missing and intact.n_trades == policy.n_trades
+    assert not bot._policy_needs_warm_start(intact, state["policy"])
+
+
+def test_newer_sidecar_wins_over_stale_state_reference(tmp_path):
+    policy = _trained_policy()
+    path = str(tmp_path / "state.policy.npz")
+    stale = json.loads(json.dumps(policy.to_state(path)))
+    _learn(policy, np.random.default_rng(3))
+    policy.to_state(path)  # Absturz vor dem JSON-Schreiben simuliert
+
+    restored = BanditPolicy.from_state(stale, path, alpha_enabled=True)
+    for key, arr in policy.arrays().items():
+        np.testing.assert_array_equal(restored.arrays()[key], arr, err_msg=key)
+    assert restored.learn_count == policy.learn_count
+    assert restored.to_state(path)["arrays"]["checksum"] == policy.to_state(path)["arrays"]["checksum"]
+
+
+def test_inline_state_from_older_versions_still_loads():
+    policy = _trained_policy()
+    restored = BanditPolicy.from_state(json.loads(json.dumps(policy.to_dict())), "unused.npz", alpha_enabled=True)
+    np.testing.assert_allclose(restored.gate.A, policy.gate.A)
+    np.testing.assert_allclose(restored.alpha.weights, policy.alpha.weights)
@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot as bot
+from ml_policy import FEATURES, AlphaModel, BanditPolicy, LinUCB, training_samples
+
+
+def _history(n: int, seed: int = 4):
+    rng = np.random.default_rng(seed)
+    history = []
+    for i in range(n):
+        ctx = {name: float(rng.normal()) for name in FEATURES if rng.random() < 0.7}
+        edge = ctx.get("adx", 0.0) - ctx.get("rsi", 0.0)
+        history.append(
+            {
+                "symbol": "BTCUSDT",
+                "pnl_r": float(np.clip(edge + rng.normal(0.0, 0.5), -3.0, 3.0)),
+                "bucket": ("S", "M", "L", None)[i % 4],
+                "context": ctx,
+            }
+        )
+    history.append({"symbol": "ETHUSDT", "pnl_r": 1.0, "context": {}})
+    history.append({"symbol": "ETHUSDT", "pnl_r": None, "context": {"adx": 1.0}})
+    return history
+
+
+def test_linucb_fit_matches_sequential_learning():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(300, 9))
+    r = rng.normal(size=300)
+    online = LinUCB(alpha=1.2, d=9)
+    for x, reward in zip(X, r):
+        online.learn(x.reshape(-1, 1), float(reward))
+    batch = LinUCB(alpha=1.2, d=9)
+    batch.fit(X, r)
+
+    np.testing.assert_allclose(batch.A, online.A, rtol=1e-10)
+    np.testing.assert_allclose(batch.b, online.b, rtol=1e-10, atol=1e-12)
+    probe = rng.normal(size=(9, 1))
+    assert batch.predict_ucb(probe) == pytest.approx(online.predict_ucb(probe), rel=1e-8)
+
+
+@pytest.mark.parametrize("margin", [0.05, 0.0])
+def test_alpha_targets_follow_online_rules(margin):
+    model = AlphaModel(reward_margin=margin)
+    rewards = np.array([2.0, 0.3, 0.05, 0.02, 0.0, -0.01, -0.05, -0.4, -5.0])
+    target, weight, keep = model.targets(rewards)
+    for reward, t, w, k in zip(rewards, target, weight, keep):
+        probe = AlphaModel(reward_margin=margin, lr=1.0, l2=0.0)
+        probe.learn({}, float(reward))
+        assert bool(k) == (probe.train_count > 0)
+        if k:
+            assert probe.train_count == pytest.approx(w)
+            # one step from zero weights: bias moves by -(0.5 - target) * weight
+            assert probe.weights[-1] == pytest.approx(-(0.5 - t) * w)
+
+
+def test_alpha_fit_learns_the_signal():
+    ctxs, rewards, _ = training_samples(_history(1500))
+    model = AlphaModel()
+    used = model.fit(np.array([[c.get(k, 0.0) for k in FEATURES] for c in ctxs]), rewards)
+    assert used == len(ctxs)
+    good = model.predict({"adx": 2.0, "rsi": -2.0})[0]
+    bad = model.predict({"adx": -2.0, "rsi": 2.0})[0]
+    assert good > 0.8 and bad < 0.2
+
+
+def test_warm_start_rebuilds_gate_and_size_like_live_learning():
+    history = _history(400)
+    live = BanditPolicy(alpha_enabled=True)
+    for rec in history[:-2]:
+        live.note_exit(rec["symbol"], ctx=rec["context"], size_bucket=rec["bucket"], pnl_r=rec["pnl_r"])
+
+    policy = BanditPolicy(alpha_enabled=True)
+    summary = policy.warm_start(*training_samples(history))
+
+    assert summary["samples"] == 400 and summary["size_samples"] == 300
+    np.testing.assert_allclose(policy.gate.A, live.gate.A, rtol=1e-10)
+    np.testing.assert_allclose(policy.gate.b, live.gate.b, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(policy.size.A, live.size.A, rtol=1e-10)
+    assert policy.n_trades == 400 and policy.learn_count == 1
+    assert policy.alpha.train_count > 0
+    assert summary["dropped"] == 0 and summary["non_finite"] == []
+    assert "adx" in summary["missing"]
+
+
+def test_warm_start_names_features_of_dropped_rows():
+    ctxs = [{"adx": 1.0}, {"adx": float("nan")}, {"rsi": float("inf")}]
+    summary = BanditPolicy().warm_start(ctxs, [1.0, 0.5, -0.5])
+    assert summary["samples"] == 1 and summary["dropped"] == 2
+    assert summary["non_finite"] == ["adx", "rsi"]
+
+
+def test_retrain_policy_writes_state_and_sidecar(tmp_path, monkeypatch):
+    state_path = tmp_path / "state.json"
+    state_path.write_text(json.dumps({"trade_history": _history(200)}))
+    monkeypatch.setattr(bot, "STATE_FILE", state_path)
+    monkeypatch.setattr(bot, "_POLICY_FILE_ENV", "")
+
+    summary = bot.retrain_policy()
+    assert summary["samples"] == 200
+
+    state = json.loads(state_path.read_text())
+    assert state["policy"]["arrays"]["file"] == "state.policy.npz"
+    restored = bot._build_policy(state["policy"])
+    assert restored.n_trades == 200
+    assert restored.gate.b.any()
@@ -0,0 +1,121 @@
+import os
+import sys
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot
+from aster_multi_bot import RateLimitDeferred, RequestWeightGovernor
+
+
+class _Response:
+    def __init__(self, status_code: int = 200, headers: Dict[str, str] = None, payload: Any = None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._payload = payload if payload is not None else []
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise aster_multi_bot.requests.HTTPError(str(self.status_code))
+
+    def json(self) -> Any:
+        return self._payload
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch):
+    state = {"now": 1_700_000_010.0}
+    monkeypatch.setattr(aster_multi_bot.time, "time", lambda: state["now"])
+    return state
+
+
+def test_endpoint_weights_follow_parameters():
+    governor = RequestWeightGovernor()
+    assert governor.weight_for("/fapi/v1/ticker/24hr", {}) == 40
+    assert governor.weight_for("/fapi/v1/ticker/24hr", {"symbol": "BTCUSDT"}) == 1
+    assert governor.weight_for("/fapi/v1/klines", {"limit": 720}) == 5
+    assert governor.weight_for("/fapi/v1/depth", {"limit": 20}) == 2
+    assert governor.weight_for("/fapi/v1/unknown") == 1
+
+
+def test_market_data_is_deferred_at_soft_limit_but_orders_pass(clock):
+    governor = RequestWeightGovernor(weight_limit=100, soft_ratio=0.5, max_wait=0.0)
+    governor.observe(_Response(headers={"X-MBX-USED-WEIGHT-1M": "48"}))
+    assert governor.headroom() == 2
+    assert governor.headroom(critical=True) == 52
+
+    with pytest.raises(RateLimitDeferred):
+        governor.acquire("/fapi/v1/klines", {"limit": 500})
+    assert governor.acquire("/fapi/v1/order", {"symbol": "BTCUSDT"}, critical=True, order=True) == 1
+    assert governor.orders_10s == 1
+
+    clock["now"] += 60.0
+    assert governor.headroom() == 50
+    assert governor.acquire("/fapi/v1/klines", {"limit": 500}) == 5
+
+
+def test_rate_limit_response_blocks_until_retry_after(clock):
+    governor = RequestWeightGovernor(max_wait=0.0)
+    governor.observe(_Response(status_code=429, headers={"Retry-After": "7"}))
+    assert governor.headroom() == 0
+    with pytest.raises(RateLimitDeferred):
+        governor.acquire("/fapi/v1/depth", {"limit": 50})
+    clock["now"] += 8.0
+    assert governor.headroom() > 0
+
+
+def test_exchange_charges_public_requests_and_syncs_headers(clock):
+    exchange = aster_multi_bot.Exchange("https://fapi.example.com", api_key="", api_secret="")
+    exchange.governor = RequestWeightGovernor(max_wait=0.0)
+    seen: List[Dict[str, Any]] = []
+
+    def _fake_get(url, params=None, timeout=None):
+        seen.append({"url": url, "params": params})
+        return _Response(headers={"X-MBX-USED-WEIGHT-1M": "120"}, payload=[])
+
+    exchange.s.get = _fake_get  # type: ignore[assignment]
+    exchange.get_klines("BTCUSDT", "5m", 3)
+    assert exchange.governor.used_weight == 120
+    assert exchange.weight_headroom() == exchange.governor.soft_limit - 120
+    assert seen[0]["url"].endswith("/fapi/v1/klines")
+
+
+def test_critical_calls_wait_out_an_active_ban(clock):
+    governor = RequestWeightGovernor(max_wait=1.0)
+    waits: List[float] = []
+
+    def _fake_wait(timeout=None):
+        waits.append(timeout)
+        clock["now"] += timeout
+
+    governor._cond.wait = _fake_wait  # type: ignore[assignment]
+    governor.observe(_Response(status_code=429, headers={"Retry-After": "7"}))
+    banned_until = governor.banned_until
+
+    assert governor.acquire("/fapi/v2/account", critical=True) == 5
+    assert clock["now"] >= banned_until
+    assert sum(waits) == pytest.approx(7.0)
+
+    # Past a soft-cap wait (no ban) critical traffic still goes out after max_wait.
+    waits.clear()
+    governor.observe(_Response(headers={"X-MBX-USED-WEIGHT-1M": str(governor.weight_limit)}))
+    assert governor.acquire("/fapi/v1/order", critical=True, order=True) == 1
+    assert sum(waits) == pytest.approx(1.0)
+
+
+def test_retried_rate_limit_response_is_closed(clock):
+    exchange = aster_multi_bot.Exchange("https://fapi.example.com", api_key="", api_secret="")
+    exchange.governor = RequestWeightGovernor(max_wait=0.0)
+    exchange.governor.observe = lambda response: None  # keep the test free of bans
+    closed: List[int] = []
+
+    class _Closable(_Response):
+        def close(self) -> None:
+            closed.append(self.status_code)
+
+    replies = iter([_Closable(status_code=429), _Closable(payload=[])])
+    exchange.s.get = lambda url, params=None, timeout=None: next(replies)  # type: ignore[assignment]
+    assert exchange.get("/fapi/v1/time") == []
+    assert closed == [429]
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from aster_multi_bot import Bot, ReturnCorrelationCache
+from indicators import KlineFrame
+
+
+def _frame(closes) -> KlineFrame:
+    closes = np.asarray(closes, dtype=float)
+    n = closes.size
+    return KlineFrame(np.vstack([np.arange(n) * 300_000.0, closes, closes, closes, closes, np.ones(n), np.ones(n)]))
+
+
+def _series(seed: int, n: int = 80, common=None) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(0.0, 0.01, n)
+    if common is not None:
+        shocks = 0.8 * common + 0.2 * shocks
+    return 100.0 * np.exp(np.cumsum(shocks))
+
+
+def _returns(closes, lookback=60):
+    tail = np.asarray(closes)[-(lookback + 1) :]
+    return np.diff(tail) / tail[:-1]
+
+
+def test_matrix_matches_pairwise_correlation_and_loads_each_symbol_once():
+    common = np.random.default_rng(99).normal(0.0, 0.01, 80)
+    closes = {f"S{i}USDT": _series(i, common=common if i < 3 else None) for i in range(6)}
+    loads = []
+
+    def loader(symbol):
+        loads.append(symbol)
+        return _frame(closes[symbol])
+
+    cache = ReturnCorrelationCache(loader, lookback=60)
+    cache.prepare(closes)
+    assert cache.stats["products"] == 1
+    for a in closes:
+        for b in closes:
+            if a == b:
+                continue
+            expected = np.corrcoef(_returns(closes[a]), _returns(closes[b]))[0, 1]
+            assert cache.get(a, b) == pytest.approx(expected, rel=1e-9)
+    assert sorted(loads) == sorted(closes)
+    assert cache.stats["products"] == 1 and cache.stats["pairwise"] == 0
+    assert cache.get("S0USDT", "S1USDT") > 0.7 > cache.get("S0USDT", "S4USDT")
+
+    cache.begin_cycle()
+    cache.get("S0USDT", "S1USDT")
+    assert loads[-2:] == ["S0USDT", "S1USDT"]
+
+
+def test_short_and_flat_histories_fall_back_to_common_tail():
+    closes = {"OLD": _series(1), "NEW": _series(2, n=20), "FLAT": np.full(80, 5.0)}
+    cache = ReturnCorrelationCache(lambda symbol: _frame(closes[symbol]), lookback=60)
+
+    expected = np.corrcoef(_returns(closes["OLD"])[-19:], _returns(closes["NEW"]))[0, 1]
+    assert cache.get("OLD", "NEW") == pytest.approx(expected, rel=1e-9)
+    assert cache.stats["pairwise"] == 1
+    assert cache.get("OLD", "FLAT") is None
+    assert cache.get("OLD", "OLD") is None
+
+
+class _Strategy:
+    def __init__(self, closes):
+        self.closes = closes
+        self.calls = 0
+
+    def _klines_cached(self, symbol, interval, limit):
+        self.calls += 1
+        return _frame(self.closes[symbol]).tail(limit)
+
+
+def test_short_cluster_guard_uses_one_load_per_symbol():
+    common = np.random.default_rng(5).normal(0.0, 0.01, 80)
+    closes = {sym: _series(i, common=common) for i, sym in enumerate(["AUSDT", "BUSDT", "CUSDT"])}
+    bot = Bot.__new__(Bot)  # type: ignore
+    bot.state = {"live_trades": {"BUSDT": {"bucket": "A"}, "CUSDT": {"bucket": "B"}}}
+    bot._strategy = _Strategy(closes)
+
+    guard = bot._short_cluster_guard("AUSDT", "C", {"BUSDT": -1.0, "CUSDT": -2.0})
+    assert guard["blocked"] and guard["reason"] == "correlation"
+    assert {sym for sym, _ in guard["conflicts"]} == {"BUSDT", "CUSDT"}
+    bot._short_cluster_guard("AUSDT", "C", {"BUSDT": -1.0, "CUSDT": -2.0})
+    assert bot._strategy.calls == 3
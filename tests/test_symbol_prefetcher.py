@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+from typing import List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import aster_multi_bot
+from aster_multi_bot import HTF_INTERVAL, INTERVAL, Strategy, SymbolPrefetcher
+
+
+class _PrefetchExchange:
+    def __init__(self) -> None:
+        self.calls: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        *,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> List[List[float]]:
+        with self._lock:
+            self.calls.append(("klines", symbol, interval))
+        step = aster_multi_bot._interval_ms(interval)
+        now = 1_700_000_000_000 - 1_700_000_000_000 % step
+        return [[float(now - step * i), 1.0, 1.1, 0.9, 1.0, 5.0, 5.0] for i in range(limit)][::-1]
+
+    def get_order_book(self, symbol: str, limit: int = 100) -> dict:
+        with self._lock:
+            self.calls.append(("depth", symbol, limit))
+        return {"bids": [["0.99", "5"]], "asks": [["1.01", "5"]], "lastUpdateId": 1}
+
+
+def test_prefetch_fills_strategy_caches_in_queue_order():
+    exchange = _PrefetchExchange()
+    strategy = Strategy(exchange=exchange)
+    strategy.reset_orderbook_budget(1)
+    prefetcher = SymbolPrefetcher(strategy, workers=2, lookahead=3, weight_budget=1000)
+    try:
+        prefetcher.begin_cycle()
+        assert prefetcher.schedule(["AAAUSDT", "BBBUSDT", "CCCUSDT", "DDDUSDT"]) == 3
+        for sym in ("AAAUSDT", "BBBUSDT", "CCCUSDT"):
+            prefetcher.wait(sym)
+            assert strategy._kl_cache.peek(sym, INTERVAL)
+            assert strategy._kl_cache.peek(sym, HTF_INTERVAL)
+            assert strategy.get_cached_order_book(sym) is not None
+        assert not strategy._kl_cache.peek("DDDUSDT", INTERVAL)
+        assert prefetcher.stats["submitted"] == 3
+        # Prefetched depth is paid from the prefetch weight budget, not the on-demand one.
+        assert strategy.ensure_order_book("DDDUSDT") is not None
+    finally:
+        prefetcher.shutdown()
+
+
+def test_prefetch_stops_at_weight_budget_without_reordering():
+    exchange = _PrefetchExchange()
+    strategy = Strategy(exchange=exchange)
+    prefetcher = SymbolPrefetcher(strategy, workers=2, lookahead=10, weight_budget=1000)
+    try:
+        per_symbol = prefetcher.estimate_weight("AAAUSDT")
+        assert per_symbol > 0
+        prefetcher.begin_cycle(weight_budget=per_symbol * 2 + 1)
+        assert prefetcher.schedule(["AAAUSDT", "BBBUSDT", "CCCUSDT"]) == 2
+        assert prefetcher.schedule(["CCCUSDT"]) == 0
+        assert prefetcher.stats["deferred"] == 1
+        prefetcher.wait("AAAUSDT")
+        prefetcher.wait("BBBUSDT")
+        prefetcher.begin_cycle(weight_budget=per_symbol * 2 + 1)
+        # Series cached last cycle only cost an incremental refresh.
+        assert prefetcher.estimate_weight("AAAUSDT") < per_symbol
+    finally:
+        prefetcher.shutdown()